@@ -0,0 +1,91 @@
+"""Measure the throughput of the batched `compute_reward` of every goal environment family, as used for HER relabeling.
+
+Usage:
+    python benchmarks/compute_reward.py --batch-size 4096 --repeats 20
+"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector.utils import concatenate, create_empty_array
+
+import gymnasium_robotics
+
+gym.register_envs(gymnasium_robotics)
+
+ENV_FAMILIES = {
+    "Fetch": "FetchPickAndPlace-v4",
+    "HandReach": "HandReach-v3",
+    "HandManipulate": "HandManipulateBlock-v1",
+    "HandManipulateIgnoreZ": "HandManipulateBlockRotateParallel-v1",
+    "PointMaze": "PointMaze_UMaze-v3",
+    "AntMaze": "AntMaze_UMaze-v5",
+    "FrankaKitchen": "FrankaKitchen-v1",
+}
+
+
+def measure_rewards_per_second(
+    env_id: str, batch_size: int, repeats: int, seed: int = 0
+) -> float:
+    """Return the number of goals per second for which `compute_reward` is evaluated in batches of ``batch_size``."""
+    env = gym.make(env_id).unwrapped
+    env.reset(seed=seed)
+    env.action_space.seed(seed)
+    goals = []
+    for _ in range(64):
+        obs, *_ = env.step(env.action_space.sample())
+        goals.append(obs["achieved_goal"])
+
+    space = env.observation_space["achieved_goal"]
+    achieved_goal = concatenate(
+        space,
+        [goals[i % len(goals)] for i in range(batch_size)],
+        create_empty_array(space, n=batch_size, fn=np.zeros),
+    )
+    desired_goal = concatenate(
+        space,
+        [goals[(i * 7) % len(goals)] for i in range(batch_size)],
+        create_empty_array(space, n=batch_size, fn=np.zeros),
+    )
+
+    env.compute_reward(achieved_goal, desired_goal, {})
+    start = time.perf_counter()
+    for _ in range(repeats):
+        env.compute_reward(achieved_goal, desired_goal, {})
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    return batch_size * repeats / elapsed
+
+
+def main():
+    """Run the benchmark and print the rewards per second of every environment family."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument(
+        "--families", nargs="+", default=list(ENV_FAMILIES), choices=ENV_FAMILIES
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for family in args.families:
+        env_id = ENV_FAMILIES[family]
+        try:
+            results[family] = measure_rewards_per_second(
+                env_id, args.batch_size, args.repeats
+            )
+        except Exception as e:  # e.g. missing optional assets
+            print(f"{family:>22} ({env_id}): skipped, {type(e).__name__}: {e}")
+            continue
+        print(
+            f"{family:>22} ({env_id}): {results[family] / 1e6:10.3f} M rewards/s "
+            f"(batch_size={args.batch_size})"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()
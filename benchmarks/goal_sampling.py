@@ -0,0 +1,82 @@
+"""Compare the cost of sampling the goals one by one and in blocks with ``goal_block_size``.
+
+Usage:
+    python benchmarks/goal_sampling.py --env-id FetchPickAndPlace-v4 HandManipulateBlock-v1 --num-goals 20000
+"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_robotics
+
+gym.register_envs(gymnasium_robotics)
+
+
+def measure_goals_per_second(env_id: str, num_goals: int, block_size: int):
+    """Return the number of goals per second served on reset and drawn with `sample_goals`.
+
+    Returns:
+        reset_goals (float): goals per second of the per-reset sampling, one by one or from the blocks of ``block_size`` goals, excluding the reset of the simulation.
+        batch_goals (float): goals per second of a single call to ``sample_goals(num_goals)``.
+    """
+    env = gym.make(env_id, goal_block_size=block_size).unwrapped
+    env.reset(seed=0)
+    if env.goal_sampler is None:
+        sample_goal = env._sample_goal
+    else:
+
+        def sample_goal():
+            components = env.goal_sampler.next(env.np_random)
+            return env._goals_from_components(components)[0]
+
+    start = time.perf_counter()
+    for _ in range(num_goals):
+        sample_goal()
+    reset_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    env.sample_goals(num_goals, rng)
+    batch_seconds = time.perf_counter() - start
+    env.close()
+
+    return num_goals / reset_seconds, num_goals / batch_seconds
+
+
+def main():
+    """Run the benchmark and print the goals per second of every environment."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--env-id",
+        nargs="+",
+        default=[
+            "FetchPickAndPlace-v4",
+            "HandReach-v3",
+            "HandManipulateBlock-v1",
+            "HandManipulateBlockRotateParallel-v1",
+        ],
+    )
+    parser.add_argument("--num-goals", type=int, default=20000)
+    parser.add_argument("--block-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    results = {}
+    for env_id in args.env_id:
+        for block_size in (0, args.block_size):
+            reset_goals, batch_goals = measure_goals_per_second(
+                env_id, args.num_goals, block_size
+            )
+            results[(env_id, block_size)] = reset_goals
+            print(
+                f"{env_id} goal_block_size={block_size}: "
+                f"{reset_goals / 1e3:10.1f} k goals/s on reset, "
+                f"{batch_goals / 1e6:8.2f} M goals/s with sample_goals"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare the cost of the batched `compute_reward` of the maze environments with the dense and geodesic rewards.
+
+The goals are drawn uniformly from the goal and reset cells of the maze, with the position noise of the environments,
+so that the batches mix goals that are near and far along the shortest paths, as in HER relabeling.
+
+Usage:
+    python benchmarks/maze_rewards.py --env-id PointMaze_Large-v3 AntMaze_Large-v5 --batch-size 256 4096
+"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_robotics
+
+gym.register_envs(gymnasium_robotics)
+
+
+def measure_rewards_per_second(
+    env_id: str, reward_type: str, batch_size: int, repeats: int, seed: int = 0
+) -> float:
+    """Return the number of goals per second for which `compute_reward` is evaluated in batches of ``batch_size``."""
+    env = gym.make(env_id, reward_type=reward_type).unwrapped
+    env.reset(seed=seed)
+    maze = env.maze
+    rng = np.random.default_rng(seed)
+    locations = np.concatenate(
+        [maze.unique_goal_locations, maze.unique_reset_locations]
+    )
+    noise = env.position_noise_range * maze.maze_size_scaling
+
+    def draw_goals():
+        goals = locations[rng.integers(len(locations), size=batch_size)]
+        return goals + rng.uniform(-noise, noise, size=goals.shape)
+
+    achieved_goal, desired_goal = draw_goals(), draw_goals()
+
+    env.compute_reward(achieved_goal, desired_goal, {})
+    start = time.perf_counter()
+    for _ in range(repeats):
+        env.compute_reward(achieved_goal, desired_goal, {})
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    return batch_size * repeats / elapsed
+
+
+def main():
+    """Run the benchmark and print the rewards per second of every environment and reward type."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--env-id",
+        nargs="+",
+        default=["PointMaze_Medium-v3", "PointMaze_Large-v3", "AntMaze_Large-v5"],
+    )
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[256, 4096])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    for env_id in args.env_id:
+        for batch_size in args.batch_size:
+            for reward_type in ("dense", "geodesic"):
+                rewards = measure_rewards_per_second(
+                    env_id, reward_type, batch_size, args.repeats
+                )
+                results[(env_id, reward_type, batch_size)] = rewards
+                print(
+                    f"{env_id} reward_type={reward_type:<8} batch_size={batch_size:<6}: "
+                    f"{rewards / 1e6:8.3f} M rewards/s"
+                )
+    return results
+
+
+if __name__ == "__main__":
+    main()
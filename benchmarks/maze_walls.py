@@ -0,0 +1,144 @@
+"""Compare the simulation cost of the maze environments with one box per wall cell and with merged wall boxes.
+
+Both wall models are stepped with the same actions, and the number of contacts with the walls after every step is
+compared: the merged boxes have the same outer boundary, but the contacts near the seams of the wall cells can differ.
+
+Usage:
+    python benchmarks/maze_walls.py --env-id PointMaze_UMaze-v3 AntMaze_UMaze-v5 --num-steps 2000
+"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import mujoco
+import numpy as np
+
+import gymnasium_robotics
+from gymnasium_robotics.envs.maze import maps
+
+gym.register_envs(gymnasium_robotics)
+
+LAYOUTS = [
+    "U_MAZE",
+    "OPEN",
+    "MEDIUM_MAZE",
+    "LARGE_MAZE",
+    "RANDOM_50x50",
+]
+
+
+def random_maze(size: int, seed: int = 0) -> list:
+    """Return a ``size x size`` maze map carved with a randomized depth-first search, with a reset and a goal cell."""
+    rng = np.random.default_rng(seed)
+    maze_map = [[1] * size for _ in range(size)]
+    stack = [(1, 1)]
+    maze_map[1][1] = 0
+    while stack:
+        i, j = stack[-1]
+        neighbors = [
+            (i + di, j + dj)
+            for di, dj in ((2, 0), (-2, 0), (0, 2), (0, -2))
+            if 0 < i + di < size - 1
+            and 0 < j + dj < size - 1
+            and maze_map[i + di][j + dj] == 1
+        ]
+        if not neighbors:
+            stack.pop()
+            continue
+        ni, nj = neighbors[rng.integers(len(neighbors))]
+        maze_map[(i + ni) // 2][(j + nj) // 2] = 0
+        maze_map[ni][nj] = 0
+        stack.append((ni, nj))
+    maze_map[1][1] = maps.RESET
+    last = size - 2 if size % 2 == 1 else size - 3
+    maze_map[last][last] = maps.GOAL
+    return maze_map
+
+
+def get_layout(name: str) -> list:
+    """Return the maze map of a bundled layout of `maps.py` or of a ``RANDOM_<size>x<size>`` maze."""
+    if name.startswith("RANDOM_"):
+        return random_maze(int(name[len("RANDOM_") :].split("x")[0]))
+    return getattr(maps, name)
+
+
+def measure_steps(env_id: str, maze_map: list, merge_walls: bool, num_steps: int):
+    """Step the environment with random actions, the same for both wall models.
+
+    Returns:
+        ngeom (integer): number of geoms of the model.
+        steps_per_second (float): number of environment steps per second.
+        wall_contacts (np.ndarray): number of contacts with the walls after each step.
+    """
+    env = gym.make(env_id, maze_map=maze_map, merge_walls=merge_walls).unwrapped
+    agent_env = getattr(env, "point_env", None) or env.ant_env
+    model, data = agent_env.model, agent_env.data
+    wall_geoms = [
+        geom_id
+        for geom_id in range(model.ngeom)
+        if (
+            mujoco.mj_id2name(model, mujoco.mjtObj.mjOBJ_GEOM, geom_id) or ""
+        ).startswith("block_")
+    ]
+    env.reset(seed=0)
+    env.action_space.seed(0)
+    actions = [env.action_space.sample() for _ in range(64)]
+
+    ncon = np.zeros(num_steps, dtype=np.int64)
+    start = time.perf_counter()
+    for step in range(num_steps):
+        env.step(actions[step % len(actions)])
+        ncon[step] = data.ncon
+    seconds = time.perf_counter() - start
+
+    # Count the wall contacts in a second rollout, outside of the timed loop
+    env.reset(seed=0)
+    wall_contacts = np.zeros(num_steps, dtype=np.int64)
+    for step in range(num_steps):
+        env.step(actions[step % len(actions)])
+        contact = data.contact[: data.ncon]
+        wall_contacts[step] = np.count_nonzero(
+            np.isin(contact.geom1, wall_geoms) | np.isin(contact.geom2, wall_geoms)
+        )
+    ngeom = model.ngeom
+    env.close()
+
+    return ngeom, num_steps / seconds, wall_contacts
+
+
+def main():
+    """Run the benchmark and print the geoms, steps per second and wall contacts of every layout."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--env-id", nargs="+", default=["PointMaze_UMaze-v3", "AntMaze_UMaze-v5"]
+    )
+    parser.add_argument("--layouts", nargs="+", default=LAYOUTS)
+    parser.add_argument("--num-steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = {}
+    for env_id in args.env_id:
+        for layout in args.layouts:
+            maze_map = get_layout(layout)
+            wall_contacts = {}
+            for merge_walls in (False, True):
+                ngeom, steps_per_second, wall_contacts[merge_walls] = measure_steps(
+                    env_id, maze_map, merge_walls, args.num_steps
+                )
+                results[(env_id, layout, merge_walls)] = steps_per_second
+                print(
+                    f"{env_id} {layout:>14} merge_walls={merge_walls!s:>5}: "
+                    f"{ngeom:5d} geoms, {steps_per_second:9.0f} steps/s, "
+                    f"{wall_contacts[merge_walls].mean():6.3f} wall contacts/step"
+                )
+            different = np.count_nonzero(wall_contacts[False] != wall_contacts[True])
+            print(
+                f"{env_id} {layout:>14} steps with a different number of wall contacts: "
+                f"{different}/{args.num_steps}"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare the observation allocations of the robot environments with and without ``reuse_obs_buffers``.
+
+Usage:
+    python benchmarks/obs_buffers.py --env-id FetchPush-v4 HandManipulateBlock-v1 --num-steps 2000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_robotics
+
+gym.register_envs(gymnasium_robotics)
+
+
+def measure_observations(env_id: str, reuse_obs_buffers: bool, num_steps: int):
+    """Step the environment and measure the memory allocated for its observations.
+
+    Returns:
+        new_arrays (integer): number of observation arrays returned by the steps that were not returned by the previous step.
+        new_bytes (integer): size in bytes of these arrays.
+        peak_bytes (float): mean peak of the memory traced by ``tracemalloc`` during one call to ``_get_obs``.
+        seconds (float): duration of the steps.
+    """
+    env = gym.make(env_id, reuse_obs_buffers=reuse_obs_buffers).unwrapped
+    obs, _ = env.reset(seed=0)
+    env.action_space.seed(0)
+    actions = [env.action_space.sample() for _ in range(16)]
+
+    new_arrays = new_bytes = 0
+    start = time.perf_counter()
+    for step in range(num_steps):
+        previous = {key: value.ctypes.data for key, value in obs.items()}
+        obs, *_ = env.step(actions[step % len(actions)])
+        for key, value in obs.items():
+            if value.ctypes.data != previous[key]:
+                new_arrays += 1
+                new_bytes += value.nbytes
+    seconds = time.perf_counter() - start
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(min(num_steps, 1000)):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        obs = env._get_obs()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    env.close()
+
+    return new_arrays, new_bytes, float(np.mean(peaks)), seconds
+
+
+def main():
+    """Run the benchmark and print the observation allocations per million steps."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--env-id", nargs="+", default=["FetchPush-v4", "HandManipulateBlock-v1"]
+    )
+    parser.add_argument("--num-steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    scale = 1_000_000 / args.num_steps
+    results = {}
+    for env_id in args.env_id:
+        for reuse_obs_buffers in (False, True):
+            new_arrays, new_bytes, peak_bytes, seconds = measure_observations(
+                env_id, reuse_obs_buffers, args.num_steps
+            )
+            results[(env_id, reuse_obs_buffers)] = new_arrays
+            print(
+                f"{env_id} reuse_obs_buffers={reuse_obs_buffers}: "
+                f"{new_arrays * scale:12.0f} new observation arrays / 1M steps "
+                f"({new_bytes * scale / 2**20:8.1f} MiB), "
+                f"{peak_bytes:8.0f} B peak traced memory per _get_obs, "
+                f"{seconds * scale:8.1f} s / 1M steps"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    main()
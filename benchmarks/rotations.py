@@ -0,0 +1,377 @@
+"""Benchmark every conversion of `gymnasium_robotics.utils.rotations` and check the timings against a baseline.
+
+Every conversion is measured in two call forms: ``scalar`` converts a single rotation without batch dimension, e.g.
+a quaternion of shape (4,) as done on every step of an environment, and ``batched`` converts ``batch_size`` rotations
+in one call, e.g. the goals of a HER batch. The results can be written to a JSON file, which can then be used as the
+baseline of a later run: the run fails if a timing is more than ``--max-slowdown`` times the baseline timing.
+
+The baseline timings are first scaled by the speed of the machine relative to the baseline machine, measured with a
+fixed reference workload of small numpy calls. The cases that look slower are measured again ``--retries`` times
+before being reported, so that a noisy run does not fail the gate.
+
+``--baseline`` without a path uses the reference baseline committed in ``benchmarks/rotations_baseline.json``, which
+is checked by the CI. ``--output`` without a path writes to ``benchmarks/baselines/rotations.json``, which is ignored
+by git, to compare the runs of a change to a baseline recorded on the same machine. After an intended change of the
+timings, record the reference baseline again with ``--output benchmarks/rotations_baseline.json`` and the batch sizes
+of the CI.
+
+Usage:
+    python benchmarks/rotations.py --baseline --batch-sizes 1 100 10000
+    python benchmarks/rotations.py --output
+    python benchmarks/rotations.py --baseline benchmarks/baselines/rotations.json --max-slowdown 1.3
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from gymnasium_robotics.utils import rotations
+
+# Committed reference baseline, checked by the CI
+REFERENCE_BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "rotations_baseline.json"
+)
+# Git-ignored path of the baseline of this machine
+DEFAULT_OUTPUT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baselines", "rotations.json"
+)
+
+
+def random_quats(batch_size: int, dtype=np.float64, seed: int = 0) -> np.ndarray:
+    """Return ``batch_size`` unit quaternions of uniformly distributed rotations."""
+    quats = np.random.default_rng(seed).normal(size=(batch_size, 4))
+    quats /= np.linalg.norm(quats, axis=-1, keepdims=True)
+    return quats.astype(dtype)
+
+
+def random_eulers(batch_size: int, dtype=np.float64, seed: int = 0) -> np.ndarray:
+    """Return ``batch_size`` Euler angles in [-pi, pi]."""
+    eulers = np.random.default_rng(seed).uniform(-np.pi, np.pi, size=(batch_size, 3))
+    return eulers.astype(dtype)
+
+
+def random_rotation_matrices(batch_size: int, dtype=np.float64, seed: int = 0):
+    """Return ``batch_size`` rotation matrices of uniformly distributed rotations."""
+    return rotations.quat2mat(random_quats(batch_size, dtype, seed))
+
+
+def _composite_quat_diff_angle(quat_a, quat_b):
+    """The angle between quaternions as computed by the hand environments before `quat_diff_angle`."""
+    quat_diff = rotations.quat_mul(quat_a, rotations.quat_conjugate(quat_b))
+    return 2 * np.arccos(np.clip(quat_diff[..., 0], -1.0, 1.0))
+
+
+def _composite_quat_diff_angle_ignore_z(quat_a, quat_b):
+    """The angle ignoring the Z rotation as computed by the hand environments before `quat_diff_angle`."""
+    euler_a = rotations.quat2euler(quat_a)
+    euler_a[..., 2] = rotations.quat2euler(quat_b)[..., 2]
+    return _composite_quat_diff_angle(rotations.euler2quat(euler_a), quat_b)
+
+
+def _two_quats(n, d):
+    return random_quats(n, d), random_quats(n, d, seed=1)
+
+
+# name: (conversion, input factory, output shape of a single rotation or None if there is no `out` argument)
+CONVERSIONS = {
+    "euler2mat": (rotations.euler2mat, lambda n, d: (random_eulers(n, d),), (3, 3)),
+    "euler2quat": (rotations.euler2quat, lambda n, d: (random_eulers(n, d),), (4,)),
+    "mat2euler": (
+        rotations.mat2euler,
+        lambda n, d: (random_rotation_matrices(n, d),),
+        (3,),
+    ),
+    "mat2quat": (
+        rotations.mat2quat,
+        lambda n, d: (random_rotation_matrices(n, d),),
+        (4,),
+    ),
+    "quat2euler": (rotations.quat2euler, lambda n, d: (random_quats(n, d),), (3,)),
+    "quat2mat": (rotations.quat2mat, lambda n, d: (random_quats(n, d),), (3, 3)),
+    "subtract_euler": (
+        rotations.subtract_euler,
+        lambda n, d: (random_eulers(n, d), random_eulers(n, d, seed=1)),
+        (3,),
+    ),
+    "quat_conjugate": (
+        rotations.quat_conjugate,
+        lambda n, d: (random_quats(n, d),),
+        (4,),
+    ),
+    "quat_mul": (rotations.quat_mul, _two_quats, (4,)),
+    "quat_diff_angle": (rotations.quat_diff_angle, _two_quats, ()),
+    "quat_diff_angle_ignore_z": (
+        lambda q0, q1, out=None: rotations.quat_diff_angle(
+            q0, q1, ignore_z=True, out=out
+        ),
+        _two_quats,
+        (),
+    ),
+    "quat_slerp": (
+        rotations.quat_slerp,
+        lambda n, d: _two_quats(n, d) + (np.linspace(0.0, 1.0, n, dtype=d),),
+        (4,),
+    ),
+    "unit_vector": (
+        lambda quat, out=None: rotations.unit_vector(quat, axis=-1, out=out),
+        lambda n, d: (random_quats(n, d),),
+        (4,),
+    ),
+    # Compositions replaced by the fused conversions, for reference
+    "quat2mat+mat2euler": (
+        lambda quat: rotations.mat2euler(rotations.quat2mat(quat)),
+        lambda n, d: (random_quats(n, d),),
+        None,
+    ),
+    "quat_mul+conjugate": (_composite_quat_diff_angle, _two_quats, None),
+    "euler_roundtrip+quat_mul": (
+        _composite_quat_diff_angle_ignore_z,
+        _two_quats,
+        None,
+    ),
+}
+
+
+def _reference_workload(small=np.ones(4), large=np.ones(1000)):
+    np.sin(small)
+    np.add(small, small)
+    np.sqrt(large)
+
+
+def time_call(function, args, kwargs, min_time: float, rounds: int) -> float:
+    """Return the best time in seconds of one call, over ``rounds`` rounds of at least ``min_time`` seconds."""
+    function(*args, **kwargs)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    best = elapsed / number
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function(*args, **kwargs)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def measure_conversion(
+    name: str,
+    form: str,
+    batch_size: int,
+    dtype: str,
+    use_out: bool,
+    min_time: float = 0.02,
+    rounds: int = 5,
+) -> Dict[str, Any]:
+    """Measure one conversion and return its result record.
+
+    Args:
+        name (string): key of the conversion in ``CONVERSIONS``.
+        form (string): ``"scalar"`` for a single rotation without batch dimension, or ``"batched"``.
+        batch_size (integer): number of rotations of the batched form, 1 for the scalar form.
+        dtype (string): ``"float64"`` or ``"float32"``.
+        use_out (boolean): whether the output is written to a preallocated array.
+        min_time (float): minimum duration in seconds of a round of calls.
+        rounds (integer): number of rounds, the fastest round is kept.
+
+    Returns:
+        Dictionary with the parameters of the measure, the ``seconds_per_call`` and the ``rotations_per_second``.
+    """
+    conversion, make_inputs, out_shape = CONVERSIONS[name]
+    args = make_inputs(batch_size, np.dtype(dtype))
+    batch_shape = (batch_size,)
+    if form == "scalar":
+        args = tuple(arg[0] for arg in args)
+        batch_shape = ()
+    kwargs = {"out": np.empty(batch_shape + out_shape, dtype=dtype)} if use_out else {}
+
+    seconds = time_call(conversion, args, kwargs, min_time, rounds)
+    return {
+        "conversion": name,
+        "form": form,
+        "batch_size": batch_size,
+        "dtype": dtype,
+        "out": use_out,
+        "seconds_per_call": seconds,
+        "rotations_per_second": batch_size / seconds,
+    }
+
+
+def _key(record: Dict[str, Any]):
+    return tuple(
+        record[field] for field in ("conversion", "form", "batch_size", "dtype", "out")
+    )
+
+
+def reference_seconds(min_time: float = 0.02, rounds: int = 5) -> float:
+    """Return the time in seconds of a fixed workload of small numpy calls, to compare the speed of machines."""
+    return time_call(_reference_workload, (), {}, min_time, rounds)
+
+
+def find_regressions(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    max_slowdown: float,
+    speed_ratio: float = 1.0,
+) -> List[Dict[str, Any]]:
+    """Return the results whose ``seconds_per_call`` is more than ``max_slowdown`` times the matching baseline result.
+
+    Results without a matching baseline result (same conversion, form, batch size, dtype and ``out``) are ignored.
+
+    Args:
+        results (list): result records of the run.
+        baseline (list): result records of the baseline run.
+        max_slowdown (float): largest accepted ratio of the timings of the run and of the baseline.
+        speed_ratio (float): ratio of the reference timings of the run and of the baseline, by which the baseline
+            timings are scaled.
+
+    Returns:
+        The regressed result records, with their ``slowdown`` ratio.
+    """
+    baseline_seconds = {_key(record): record["seconds_per_call"] for record in baseline}
+    regressions = []
+    for record in results:
+        reference = baseline_seconds.get(_key(record))
+        if reference is None:
+            continue
+        slowdown = record["seconds_per_call"] / (reference * speed_ratio)
+        if slowdown > max_slowdown:
+            regressions.append(dict(record, slowdown=slowdown))
+    return regressions
+
+
+def run(
+    conversions: List[str],
+    batch_sizes: List[int],
+    dtypes: List[str],
+    min_time: float,
+    rounds: int,
+    verbose: bool = True,
+) -> List[Dict[str, Any]]:
+    """Measure the scalar form and the batched forms of the conversions, with and without ``out``."""
+    results = []
+    for name in conversions:
+        out_options = (False, True) if CONVERSIONS[name][2] is not None else (False,)
+        cases = [("scalar", 1)] + [
+            ("batched", batch_size) for batch_size in batch_sizes
+        ]
+        for dtype in dtypes:
+            for form, batch_size in cases:
+                for use_out in out_options:
+                    record = measure_conversion(
+                        name, form, batch_size, dtype, use_out, min_time, rounds
+                    )
+                    results.append(record)
+                    if verbose:
+                        print(
+                            f"{name:>18} {form:>7} {dtype} batch_size={batch_size:>8} out={use_out!s:>5}: "
+                            f"{record['seconds_per_call'] * 1e6:12.2f} us/call "
+                            f"{record['rotations_per_second'] / 1e6:10.3f} M rotations/s"
+                        )
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the benchmark, optionally write the results and check them against a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--conversions", nargs="+", default=list(CONVERSIONS), choices=CONVERSIONS
+    )
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--dtypes",
+        nargs="+",
+        default=["float64", "float32"],
+        choices=["float64", "float32"],
+    )
+    parser.add_argument("--min-time", type=float, default=0.02)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--output",
+        nargs="?",
+        const=DEFAULT_OUTPUT_PATH,
+        help=f"JSON file to write the results to, {DEFAULT_OUTPUT_PATH} if no path is given.",
+    )
+    parser.add_argument(
+        "--baseline",
+        nargs="?",
+        const=REFERENCE_BASELINE_PATH,
+        help=f"JSON file of a previous run to compare the results to, {REFERENCE_BASELINE_PATH} if no path is given.",
+    )
+    parser.add_argument("--max-slowdown", type=float, default=1.5)
+    parser.add_argument("--retries", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    reference = reference_seconds(args.min_time, args.rounds)
+
+    results = run(
+        args.conversions, args.batch_sizes, args.dtypes, args.min_time, args.rounds
+    )
+
+    if args.output is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "machine": {
+                        "platform": platform.platform(),
+                        "processor": platform.processor(),
+                        "python": platform.python_version(),
+                        "numpy": np.__version__,
+                        "reference_seconds": reference,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=1,
+            )
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        speed_ratio = reference / baseline["machine"]["reference_seconds"]
+        print(
+            f"This machine takes {speed_ratio:.2f}x the time of the baseline machine."
+        )
+        regressions = find_regressions(
+            results, baseline["results"], args.max_slowdown, speed_ratio
+        )
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            remeasured = [
+                measure_conversion(*_key(record), args.min_time, args.rounds)
+                for record in regressions
+            ]
+            regressions = find_regressions(
+                remeasured, baseline["results"], args.max_slowdown, speed_ratio
+            )
+        for record in regressions:
+            print(
+                f"REGRESSION {record['conversion']} {record['form']} {record['dtype']} "
+                f"batch_size={record['batch_size']} out={record['out']}: "
+                f"{record['slowdown']:.2f}x slower than the baseline",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"No regression larger than {args.max_slowdown}x the baseline.")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare the throughput of the sync, async and thread vector environments.
+
+Usage:
+    python benchmarks/vector_envs.py --env-id FetchPush-v4 --num-envs 16 --num-steps 1000
+"""
+
+import argparse
+import os
+import time
+
+import gymnasium as gym
+
+import gymnasium_robotics
+from gymnasium_robotics.vector import ThreadVectorEnv
+
+gym.register_envs(gymnasium_robotics)
+
+
+def measure_steps_per_second(envs, num_steps: int, seed: int = 0) -> float:
+    """Return the number of sub-environment steps per second of a vector environment."""
+    envs.reset(seed=seed)
+    envs.action_space.seed(seed)
+    actions = [envs.action_space.sample() for _ in range(16)]
+
+    start = time.perf_counter()
+    for step in range(num_steps):
+        envs.step(actions[step % len(actions)])
+    elapsed = time.perf_counter() - start
+    envs.close()
+
+    return num_steps * envs.num_envs / elapsed
+
+
+def main():
+    """Run the benchmark and print the steps per second of every vector environment."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--env-id", default="FetchPush-v4")
+    parser.add_argument("--num-envs", type=int, default=os.cpu_count())
+    parser.add_argument("--num-workers", type=int, default=None)
+    parser.add_argument("--num-steps", type=int, default=500)
+    args = parser.parse_args()
+
+    env_fns = [lambda: gym.make(args.env_id) for _ in range(args.num_envs)]
+    results = {
+        "sync": measure_steps_per_second(
+            gym.vector.SyncVectorEnv(env_fns), args.num_steps
+        ),
+        "async": measure_steps_per_second(
+            gym.vector.AsyncVectorEnv(env_fns), args.num_steps
+        ),
+        "thread": measure_steps_per_second(
+            ThreadVectorEnv(env_fns, num_workers=args.num_workers), args.num_steps
+        ),
+    }
+
+    print(
+        f"{args.env_id}: num_envs={args.num_envs}, cpu_count={os.cpu_count()}, num_steps={args.num_steps}"
+    )
+    for name, steps_per_second in results.items():
+        print(
+            f"{name:>8}: {steps_per_second:12.1f} steps/s "
+            f"(x{steps_per_second / results['sync']:.2f} sync, x{steps_per_second / results['async']:.2f} async)"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()
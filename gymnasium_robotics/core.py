@@ -2,7 +2,9 @@ from abc import abstractmethod
 from typing import Optional
 
 import gymnasium as gym
+import numpy as np
 from gymnasium import error
+from gymnasium.vector.utils import concatenate, create_empty_array
 
 
 class GoalEnv(gym.Env):
@@ -16,6 +18,7 @@ class GoalEnv(gym.Env):
     - :meth:`compute_reward` - Externalizes the reward function by taking the achieved and desired goal, as well as extra information. Returns reward.
     - :meth:`compute_terminated` - Returns boolean termination depending on the achieved and desired goal, as well as extra information.
     - :meth:`compute_truncated` - Returns boolean truncation depending on the achieved and desired goal, as well as extra information.
+    - :meth:`step_many` - Runs several control steps with one call and returns their stacked outputs.
     """
 
     def reset(
@@ -42,6 +45,60 @@ class GoalEnv(gym.Env):
                     )
                 )
 
+    def step_many(self, actions):
+        """Run one control step for each action of ``actions`` and stop after the first terminated or truncated step.
+
+        This method is called on the environment itself, the wrappers of the environment (e.g. ``TimeLimit``) are not
+        applied to the individual steps.
+
+        Args:
+            actions (np.ndarray): actions of shape ``(K,) + action_space.shape``.
+
+        Returns:
+            observations (dictionary): the observations of the ``k <= K`` executed steps, stacked along a first axis of size ``k``.
+            rewards (np.ndarray): rewards of shape ``(k,)``.
+            terminated (np.ndarray): boolean termination flags of shape ``(k,)``, only the last one can be ``True``.
+            truncated (np.ndarray): boolean truncation flags of shape ``(k,)``, only the last one can be ``True``.
+            info (dictionary): the boolean ``"is_success"`` flags of shape ``(k,)`` and the ``"step_infos"`` list with the info of every step.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim != len(self.action_space.shape) + 1:
+            raise ValueError("Action dimension mismatch")
+
+        observations, rewards, terminated, truncated, infos = [], [], [], [], []
+        for action in actions:
+            obs, reward, step_terminated, step_truncated, info = self.step(action)
+            observations.append(obs)
+            rewards.append(reward)
+            terminated.append(step_terminated)
+            truncated.append(step_truncated)
+            infos.append(info)
+            if step_terminated or step_truncated:
+                break
+
+        stacked_observations = create_empty_array(
+            self.observation_space, n=len(observations), fn=np.zeros
+        )
+        if observations:
+            concatenate(self.observation_space, observations, stacked_observations)
+        info = {
+            "is_success": np.array(
+                [self._is_step_success(info) for info in infos], dtype=np.bool_
+            ),
+            "step_infos": infos,
+        }
+        return (
+            stacked_observations,
+            np.array(rewards, dtype=np.float64),
+            np.array(terminated, dtype=np.bool_),
+            np.array(truncated, dtype=np.bool_),
+            info,
+        )
+
+    def _is_step_success(self, info) -> bool:
+        """Return whether the step that returned ``info`` achieved the goal, used by :meth:`step_many`."""
+        return bool(info.get("is_success", info.get("success", False)))
+
     @abstractmethod
     def compute_reward(self, achieved_goal, desired_goal, info):
         """Compute the step reward. This externalizes the reward function and makes it dependent on a desired goal and the one that was achieved.
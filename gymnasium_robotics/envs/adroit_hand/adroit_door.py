@@ -18,7 +18,7 @@ from gymnasium import spaces
 from gymnasium.envs.mujoco.mujoco_env import MujocoEnv
 from gymnasium.utils.ezpickle import EzPickle
 
-from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames
+from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames, SimStateMixin
 
 DEFAULT_CAMERA_CONFIG = {
     "distance": 1.5,
@@ -26,7 +26,7 @@ DEFAULT_CAMERA_CONFIG = {
 }
 
 
-class AdroitHandDoorEnv(MujocoEnv, EzPickle):
+class AdroitHandDoorEnv(MujocoEnv, SimStateMixin, EzPickle):
     """
     ## Description
 
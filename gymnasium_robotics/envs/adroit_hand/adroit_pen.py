@@ -18,7 +18,7 @@ from gymnasium import spaces
 from gymnasium.envs.mujoco.mujoco_env import MujocoEnv
 from gymnasium.utils.ezpickle import EzPickle
 
-from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames
+from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames, SimStateMixin
 from gymnasium_robotics.utils.rotations import euler2quat
 
 DEFAULT_CAMERA_CONFIG = {
@@ -27,7 +27,7 @@ DEFAULT_CAMERA_CONFIG = {
 }
 
 
-class AdroitHandPenEnv(MujocoEnv, EzPickle):
+class AdroitHandPenEnv(MujocoEnv, SimStateMixin, EzPickle):
     """
     ## Description
 
@@ -1,9 +1,10 @@
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 
 from gymnasium_robotics.envs.robot_env import MujocoPyRobotEnv, MujocoRobotEnv
 from gymnasium_robotics.utils import rotations
+from gymnasium_robotics.utils.goal_sampler import GoalSampler
 
 DEFAULT_CAMERA_CONFIG = {
     "distance": 2.5,
@@ -13,11 +14,57 @@ DEFAULT_CAMERA_CONFIG = {
 }
 
 
+# Minimum horizontal distance between the initial positions of the object and of the gripper
+OBJECT_MIN_DISTANCE = 0.1
+
+
 def goal_distance(goal_a, goal_b):
     assert goal_a.shape == goal_b.shape
     return np.linalg.norm(goal_a - goal_b, axis=-1)
 
 
+def sample_object_xpos(
+    np_random: np.random.Generator,
+    n: int,
+    center: np.ndarray,
+    obj_range: float,
+    min_distance: float = OBJECT_MIN_DISTANCE,
+) -> np.ndarray:
+    """Sample ``n`` horizontal object positions uniformly in a square around ``center``, away from ``center``.
+
+    The positions follow the distribution of the rejection loop of the Fetch resets: uniform in the square of
+    half-side ``obj_range`` centered on ``center``, excluding the disk of radius ``min_distance``. The candidates are
+    drawn and rejected in batches sized with the acceptance rate of the region, usually in a single round.
+
+    Args:
+        np_random (np.random.Generator): random number generator used to draw the positions.
+        n (integer): number of positions.
+        center (np.ndarray): horizontal position of the center of the square, usually the initial gripper position.
+        obj_range (float): half-side of the square.
+        min_distance (float): minimum distance between the positions and ``center``. Defaults to 0.1.
+
+    Returns:
+        Array of shape ``(n, 2)`` with the positions.
+    """
+    if min_distance >= obj_range * np.sqrt(2):
+        raise ValueError(
+            f"No position of the square of half-side {obj_range} is at a distance of {min_distance} from its center."
+        )
+    # Fraction of the square outside of the disk, bounded when the disk overlaps the sides of the square
+    acceptance = max(1.0 - np.pi * min_distance**2 / (2.0 * obj_range) ** 2, 0.05)
+
+    offsets = np.empty((n, 2))
+    count = 0
+    while count < n:
+        num_candidates = int(np.ceil(1.1 * (n - count) / acceptance)) + 8
+        candidates = np_random.uniform(-obj_range, obj_range, size=(num_candidates, 2))
+        valid = candidates[np.linalg.norm(candidates, axis=-1) >= min_distance]
+        valid = valid[: n - count]
+        offsets[count : count + len(valid)] = valid
+        count += len(valid)
+    return center[:2] + offsets
+
+
 def get_base_fetch_env(RobotEnvClass: Union[MujocoPyRobotEnv, MujocoRobotEnv]):
     """Factory function that returns a BaseFetchEnv class that inherits
     from MujocoPyRobotEnv or MujocoRobotEnv depending on the mujoco python bindings.
@@ -37,6 +84,7 @@ def get_base_fetch_env(RobotEnvClass: Union[MujocoPyRobotEnv, MujocoRobotEnv]):
             target_range,
             distance_threshold,
             reward_type,
+            object_block_size: int = 0,
             **kwargs,
         ):
             """Initializes a new Fetch environment.
@@ -54,6 +102,7 @@ def get_base_fetch_env(RobotEnvClass: Union[MujocoPyRobotEnv, MujocoRobotEnv]):
                 distance_threshold (float): the threshold after which a goal is considered achieved
                 initial_qpos (dict): a dictionary of joint names and values that define the initial configuration
                 reward_type ('sparse' or 'dense'): the reward type, i.e. sparse or dense
+                object_block_size (int): if positive, the initial object positions are drawn from `np_random` in blocks of `object_block_size` positions by a `GoalSampler` and served one by one on reset, instead of with a rejection loop on every reset. The positions follow the same distribution but not the same sequence. Defaults to 0.
             """
 
             self.gripper_extra_height = gripper_extra_height
@@ -65,9 +114,20 @@ def get_base_fetch_env(RobotEnvClass: Union[MujocoPyRobotEnv, MujocoRobotEnv]):
             self.target_range = target_range
             self.distance_threshold = distance_threshold
             self.reward_type = reward_type
+            self.object_sampler = (
+                GoalSampler(self._draw_object_components, object_block_size)
+                if object_block_size > 0
+                else None
+            )
 
             super().__init__(n_actions=4, **kwargs)
 
+        def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+            if self.object_sampler is not None and seed is not None:
+                # The positions left in the block were drawn before `np_random` was seeded again
+                self.object_sampler.clear()
+            return super().reset(seed=seed, options=options)
+
         # GoalEnv methods
         # ----------------------------
 
@@ -118,11 +178,11 @@ def get_base_fetch_env(RobotEnvClass: Union[MujocoPyRobotEnv, MujocoRobotEnv]):
             ) = self.generate_mujoco_observations()
 
             if not self.has_object:
-                achieved_goal = grip_pos.copy()
+                achieved_goal = grip_pos
             else:
-                achieved_goal = np.squeeze(object_pos.copy())
+                achieved_goal = object_pos
 
-            obs = np.concatenate(
+            return self._make_obs(
                 [
                     grip_pos,
                     object_pos.ravel(),
@@ -133,15 +193,10 @@ def get_base_fetch_env(RobotEnvClass: Union[MujocoPyRobotEnv, MujocoRobotEnv]):
                     object_velr.ravel(),
                     grip_velp,
                     gripper_vel,
-                ]
+                ],
+                achieved_goal,
             )
 
-            return {
-                "observation": obs.copy(),
-                "achieved_goal": achieved_goal.copy(),
-                "desired_goal": self.goal.copy(),
-            }
-
         def generate_mujoco_observations(self):
 
             raise NotImplementedError
@@ -165,6 +220,59 @@ def get_base_fetch_env(RobotEnvClass: Union[MujocoPyRobotEnv, MujocoRobotEnv]):
                 )
             return goal.copy()
 
+        def _draw_goal_components(self, np_random, n):
+            # The goals only depend on the initial configuration, they are built entirely in the block
+            goals = self.initial_gripper_xpos[:3] + np_random.uniform(
+                -self.target_range, self.target_range, size=(n, 3)
+            )
+            if self.has_object:
+                goals += self.target_offset
+                goals[:, 2] = self.height_offset
+                if self.target_in_the_air:
+                    in_the_air = np_random.uniform(size=n) < 0.5
+                    goals[:, 2] += np.where(
+                        in_the_air, np_random.uniform(0, 0.45, size=n), 0.0
+                    )
+            return {"goal": goals}
+
+        def _goals_from_components(self, components):
+            return components["goal"].copy()
+
+        def sample_object_positions(
+            self, n: int, np_random: Optional[np.random.Generator] = None
+        ) -> np.ndarray:
+            """Sample ``n`` initial horizontal positions of the object with the distribution of the resets.
+
+            Args:
+                n (integer): number of positions.
+                np_random (optional np.random.Generator): random number generator used to draw the positions. Defaults to the `np_random` of the environment.
+
+            Returns:
+                Array of shape ``(n, 2)`` with the positions.
+            """
+            if np_random is None:
+                np_random = self.np_random
+            return sample_object_xpos(
+                np_random, n, self.initial_gripper_xpos, self.obj_range
+            )
+
+        def _draw_object_components(self, np_random, n):
+            return {"xpos": self.sample_object_positions(n, np_random)}
+
+        def _sample_object_xpos(self):
+            """Samples the initial horizontal position of the object, from the block of the `object_sampler` if it is enabled."""
+            if self.object_sampler is not None:
+                return self.object_sampler.next(self.np_random)["xpos"][0]
+            object_xpos = self.initial_gripper_xpos[:2]
+            while (
+                np.linalg.norm(object_xpos - self.initial_gripper_xpos[:2])
+                < OBJECT_MIN_DISTANCE
+            ):
+                object_xpos = self.initial_gripper_xpos[:2] + self.np_random.uniform(
+                    -self.obj_range, self.obj_range, size=2
+                )
+            return object_xpos
+
         def _is_success(self, achieved_goal, desired_goal):
             d = goal_distance(achieved_goal, desired_goal)
             return (d < self.distance_threshold).astype(np.float32)
@@ -253,11 +361,7 @@ class MujocoPyFetchEnv(get_base_fetch_env(MujocoPyRobotEnv)):
 
         # Randomize start position of object.
         if self.has_object:
-            object_xpos = self.initial_gripper_xpos[:2]
-            while np.linalg.norm(object_xpos - self.initial_gripper_xpos[:2]) < 0.1:
-                object_xpos = self.initial_gripper_xpos[:2] + self.np_random.uniform(
-                    -self.obj_range, self.obj_range, size=2
-                )
+            object_xpos = self._sample_object_xpos()
             object_qpos = self.sim.data.get_joint_qpos("object0:joint")
             assert object_qpos.shape == (7,)
             object_qpos[:2] = object_xpos
@@ -294,46 +398,30 @@ class MujocoFetchEnv(get_base_fetch_env(MujocoRobotEnv)):
 
     def _step_callback(self):
         if self.block_gripper:
-            self._utils.set_joint_qpos(
-                self.model, self.data, "robot0:l_gripper_finger_joint", 0.0
-            )
-            self._utils.set_joint_qpos(
-                self.model, self.data, "robot0:r_gripper_finger_joint", 0.0
-            )
+            self._gripper_finger_joints.set_qpos(self.data, 0.0)
             self._mujoco.mj_forward(self.model, self.data)
 
     def _set_action(self, action):
         action = super()._set_action(action)
 
         # Apply action to simulation.
-        self._utils.ctrl_set_action(self.model, self.data, action)
-        self._utils.mocap_set_action(self.model, self.data, action)
+        self._action_plan.apply(self.data, action, self._mocap_body_poses)
 
     def generate_mujoco_observations(self):
         # positions
-        grip_pos = self._utils.get_site_xpos(self.model, self.data, "robot0:grip")
+        grip_pos = self._grip_site.xpos(self.data)
 
         dt = self.n_substeps * self.model.opt.timestep
-        grip_velp = (
-            self._utils.get_site_xvelp(self.model, self.data, "robot0:grip") * dt
-        )
+        grip_velp = self._grip_site.xvelp(self.model, self.data) * dt
 
-        robot_qpos, robot_qvel = self._utils.robot_get_obs(
-            self.model, self.data, self._model_names.joint_names
-        )
+        robot_qpos, robot_qvel = self._robot_joints.get_obs(self.data)
         if self.has_object:
-            object_pos = self._utils.get_site_xpos(self.model, self.data, "object0")
+            object_pos = self._object_site.xpos(self.data)
             # rotations
-            object_rot = rotations.mat2euler(
-                self._utils.get_site_xmat(self.model, self.data, "object0")
-            )
+            object_rot = rotations.mat2euler(self._object_site.xmat(self.data))
             # velocities
-            object_velp = (
-                self._utils.get_site_xvelp(self.model, self.data, "object0") * dt
-            )
-            object_velr = (
-                self._utils.get_site_xvelr(self.model, self.data, "object0") * dt
-            )
+            object_velp = self._object_site.xvelp(self.model, self.data) * dt
+            object_velr = self._object_site.xvelr(self.model, self.data) * dt
             # gripper state
             object_rel_pos = object_pos - grip_pos
             object_velp -= grip_velp
@@ -360,21 +448,18 @@ class MujocoFetchEnv(get_base_fetch_env(MujocoRobotEnv)):
         )
 
     def _get_gripper_xpos(self):
-        body_id = self._model_names.body_name2id["robot0:gripper_link"]
-        return self.data.xpos[body_id]
+        return self._gripper_body.xpos(self.data)
 
     def _render_callback(self):
         # Visualize target.
         sites_offset = (self.data.site_xpos - self.model.site_pos).copy()
-        site_id = self._mujoco.mj_name2id(
-            self.model, self._mujoco.mjtObj.mjOBJ_SITE, "target0"
-        )
-        self.model.site_pos[site_id] = self.goal - sites_offset[0]
+        self.model.site_pos[self._target_site.id] = self.goal - sites_offset[0]
         self._mujoco.mj_forward(self.model, self.data)
 
     def _reset_sim(self):
         # Reset buffers for joint states, actuators, warm-start, control buffers etc.
         self._mujoco.mj_resetData(self.model, self.data)
+        self._mocap_body_poses = None
 
         self.data.time = self.initial_time
         self.data.qpos[:] = np.copy(self.initial_qpos)
@@ -384,24 +469,46 @@ class MujocoFetchEnv(get_base_fetch_env(MujocoRobotEnv)):
 
         # Randomize start position of object.
         if self.has_object:
-            object_xpos = self.initial_gripper_xpos[:2]
-            while np.linalg.norm(object_xpos - self.initial_gripper_xpos[:2]) < 0.1:
-                object_xpos = self.initial_gripper_xpos[:2] + self.np_random.uniform(
-                    -self.obj_range, self.obj_range, size=2
-                )
-            object_qpos = self._utils.get_joint_qpos(
-                self.model, self.data, "object0:joint"
-            )
+            object_xpos = self._sample_object_xpos()
+            object_qpos = self._object_joint.qpos(self.data)
             assert object_qpos.shape == (7,)
             object_qpos[:2] = object_xpos
-            self._utils.set_joint_qpos(
-                self.model, self.data, "object0:joint", object_qpos
-            )
+            self._object_joint.set_qpos(self.data, object_qpos)
 
         self._mujoco.mj_forward(self.model, self.data)
         return True
 
     def _env_setup(self, initial_qpos):
+        # Resolve the names of the objects used at every step once.
+        self._grip_site = self._utils.SiteAccessor(
+            self.model, self._model_names, "robot0:grip"
+        )
+        self._target_site = self._utils.SiteAccessor(
+            self.model, self._model_names, "target0"
+        )
+        self._gripper_body = self._utils.BodyAccessor(
+            self.model, self._model_names, "robot0:gripper_link"
+        )
+        self._gripper_finger_joints = self._utils.JointAccessor(
+            self.model,
+            self._model_names,
+            ["robot0:l_gripper_finger_joint", "robot0:r_gripper_finger_joint"],
+        )
+        self._mocap = self._utils.MocapAccessor(
+            self.model, self._model_names, "robot0:mocap"
+        )
+        self._action_plan = self._utils.ActionPlan(self.model)
+        self._robot_joints = self._utils.RobotJointAccessor(
+            self.model, self._model_names
+        )
+        if self.has_object:
+            self._object_site = self._utils.SiteAccessor(
+                self.model, self._model_names, "object0"
+            )
+            self._object_joint = self._utils.JointAccessor(
+                self.model, self._model_names, "object0:joint"
+            )
+
         for name, value in initial_qpos.items():
             self._utils.set_joint_qpos(self.model, self.data, name, value)
         self._utils.reset_mocap_welds(self.model, self.data)
@@ -410,19 +517,13 @@ class MujocoFetchEnv(get_base_fetch_env(MujocoRobotEnv)):
         # Move end effector into position.
         gripper_target = np.array(
             [-0.498, 0.005, -0.431 + self.gripper_extra_height]
-        ) + self._utils.get_site_xpos(self.model, self.data, "robot0:grip")
+        ) + self._grip_site.xpos(self.data)
         gripper_rotation = np.array([1.0, 0.0, 1.0, 0.0])
-        self._utils.set_mocap_pos(self.model, self.data, "robot0:mocap", gripper_target)
-        self._utils.set_mocap_quat(
-            self.model, self.data, "robot0:mocap", gripper_rotation
-        )
+        self._mocap.set_pos(self.data, gripper_target)
+        self._mocap.set_quat(self.data, gripper_rotation)
         for _ in range(10):
             self._mujoco.mj_step(self.model, self.data, nstep=self.n_substeps)
         # Extract information for sampling goals.
-        self.initial_gripper_xpos = self._utils.get_site_xpos(
-            self.model, self.data, "robot0:grip"
-        ).copy()
+        self.initial_gripper_xpos = self._grip_site.xpos(self.data).copy()
         if self.has_object:
-            self.height_offset = self._utils.get_site_xpos(
-                self.model, self.data, "object0"
-            )[2]
+            self.height_offset = self._object_site.xpos(self.data)[2]
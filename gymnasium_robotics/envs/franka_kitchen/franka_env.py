@@ -25,7 +25,7 @@ from gymnasium_robotics.envs.franka_kitchen.utils import (
     get_config_root_node,
     read_config_from_node,
 )
-from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames, robot_get_obs
+from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames, RobotJointAccessor
 
 MAX_CARTESIAN_DISPLACEMENT = 0.2
 MAX_ROTATION_DISPLACEMENT = 0.5
@@ -88,6 +88,7 @@ class FrankaRobot(MujocoEnv):
         self.action_space = spaces.Box(low=-1.0, high=1.0, shape=(9,), dtype=np.float64)
         self._read_specs_from_config(config_path)
         self.model_names = MujocoModelNames(self.model)
+        self.robot_joints = RobotJointAccessor(self.model, self.model_names)
 
     def step(self, action):
         action = np.clip(action, -1.0, 1.0)
@@ -111,9 +112,7 @@ class FrankaRobot(MujocoEnv):
 
     def _get_obs(self):
         # Gather simulated observation
-        robot_qpos, robot_qvel = robot_get_obs(
-            self.model, self.data, self.model_names.joint_names
-        )
+        robot_qpos, robot_qvel = self.robot_joints.get_obs(self.data)
         # Simulate observation noise
         robot_qpos += (
             self.robot_noise_ratio
@@ -23,6 +23,7 @@ from gymnasium.utils.ezpickle import EzPickle
 
 from gymnasium_robotics.core import GoalEnv
 from gymnasium_robotics.envs.franka_kitchen.franka_env import FrankaRobot
+from gymnasium_robotics.utils.mujoco_utils import SimStateMixin
 
 OBS_ELEMENT_INDICES = {
     "bottom burner": np.array([11, 12]),
@@ -45,7 +46,7 @@ OBS_ELEMENT_GOALS = {
 BONUS_THRESH = 0.3
 
 
-class KitchenEnv(GoalEnv, EzPickle):
+class KitchenEnv(GoalEnv, SimStateMixin, EzPickle):
     """
     ## Description
 
@@ -359,14 +360,55 @@ class KitchenEnv(GoalEnv, EzPickle):
         desired_goal: "dict[str, np.ndarray]",
         info: "dict[str, Any]",
     ):
-        self.step_task_completions.clear()
-        for task in self.tasks_to_complete:
-            distance = np.linalg.norm(achieved_goal[task] - desired_goal[task])
-            complete = distance < BONUS_THRESH
-            if complete:
-                self.step_task_completions.append(task)
+        # Number of remaining tasks completed by the achieved goal, also for batches of goals
+        completions = self._task_completions(
+            achieved_goal, desired_goal, self.tasks_to_complete
+        )
+        return self._completions_reward(completions)
 
-        return float(len(self.step_task_completions))
+    def compute_terminated(
+        self,
+        achieved_goal: "dict[str, np.ndarray]",
+        desired_goal: "dict[str, np.ndarray]",
+        info: "dict[str, Any]",
+    ):
+        # `step` also counts the tasks completed earlier in the episode
+        if not self.terminate_on_tasks_completed:
+            return False
+        return self._is_success(achieved_goal, desired_goal)
+
+    def compute_truncated(
+        self,
+        achieved_goal: "dict[str, np.ndarray]",
+        desired_goal: "dict[str, np.ndarray]",
+        info: "dict[str, Any]",
+    ):
+        return False
+
+    def _is_success(
+        self,
+        achieved_goal: "dict[str, np.ndarray]",
+        desired_goal: "dict[str, np.ndarray]",
+    ):
+        completions = self._task_completions(
+            achieved_goal, desired_goal, self.goal.keys()
+        )
+        success = np.logical_and.reduce(list(completions.values()))
+        return bool(success) if np.ndim(success) == 0 else success
+
+    def _task_completions(self, achieved_goal, desired_goal, tasks):
+        return {
+            task: np.linalg.norm(achieved_goal[task] - desired_goal[task], axis=-1)
+            < BONUS_THRESH
+            for task in tasks
+        }
+
+    def _completions_reward(self, completions):
+        reward = sum(completions.values(), np.float64(0.0))
+        return float(reward) if np.ndim(reward) == 0 else reward
+
+    def _is_step_success(self, info) -> bool:
+        return len(info["episode_task_completions"]) == len(self.goal)
 
     def _get_obs(self, robot_obs):
         obj_qpos = self.data.qpos[9:].copy()
@@ -400,7 +442,14 @@ class KitchenEnv(GoalEnv, EzPickle):
         robot_obs, _, terminated, truncated, info = self.robot_env.step(action)
         obs = self._get_obs(robot_obs)
 
-        reward = self.compute_reward(obs["achieved_goal"], self.goal, info)
+        completions = self._task_completions(
+            obs["achieved_goal"], self.goal, self.tasks_to_complete
+        )
+        reward = self._completions_reward(completions)
+        self.step_task_completions.clear()
+        self.step_task_completions.extend(
+            task for task, complete in completions.items() if complete
+        )
 
         if self.remove_task_when_completed:
             # When the task is accomplished remove from the list of tasks to be completed
@@ -9,10 +9,10 @@ from gymnasium.utils.ezpickle import EzPickle
 
 from gymnasium_robotics.envs.maze.maps import U_MAZE
 from gymnasium_robotics.envs.maze.maze import MazeEnv
-from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames
+from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames, SimStateMixin
 
 
-class AntMazeEnv(MazeEnv, EzPickle):
+class AntMazeEnv(MazeEnv, SimStateMixin, EzPickle):
     metadata = {
         "render_modes": [
             "human",
@@ -92,6 +92,8 @@ class AntMazeEnv(MazeEnv, EzPickle):
         obs = self._get_obs(ant_obs)
 
         terminated = self.compute_terminated(obs["achieved_goal"], self.goal, info)
+        # In v3 the goal is updated before the reward is computed
+        self.update_goal(obs["achieved_goal"])
         truncated = self.compute_truncated(obs["achieved_goal"], self.goal, info)
 
         reward = self.compute_reward(obs["achieved_goal"], self.goal, info)
@@ -22,10 +22,18 @@ from gymnasium.utils.ezpickle import EzPickle
 
 from gymnasium_robotics.envs.maze.maps import U_MAZE
 from gymnasium_robotics.envs.maze.maze_v4 import MazeEnv
-from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames
+from gymnasium_robotics.utils.mujoco_utils import (
+    CompiledModelMixin,
+    MujocoModelNames,
+    SimStateMixin,
+)
 
 
-class AntMazeEnv(MazeEnv, EzPickle):
+class MazeAntEnv(CompiledModelMixin, AntEnv):
+    """Gymnasium Ant v4 environment simulating the compiled model of the maze passed as ``model``."""
+
+
+class AntMazeEnv(MazeEnv, SimStateMixin, EzPickle):
     metadata = {
         "render_modes": [
             "human",
@@ -42,6 +50,8 @@ class AntMazeEnv(MazeEnv, EzPickle):
         reward_type: str = "sparse",
         continuing_task: bool = True,
         reset_target: bool = False,
+        merge_walls: bool = False,
+        single_draw_reset: bool = False,
         **kwargs,
     ):
         # Get the ant.xml path from the Gymnasium package
@@ -56,11 +66,14 @@ class AntMazeEnv(MazeEnv, EzPickle):
             reward_type=reward_type,
             continuing_task=continuing_task,
             reset_target=reset_target,
+            merge_walls=merge_walls,
+            single_draw_reset=single_draw_reset,
             **kwargs,
         )
         # Create the MuJoCo environment, include position observation of the Ant for GoalEnv
-        self.ant_env = AntEnv(
-            xml_file=self.tmp_xml_file_path,
+        self.ant_env = MazeAntEnv(
+            model=self.maze_model,
+            xml_file=self.agent_xml_path,
             exclude_current_positions_from_observation=False,
             render_mode=render_mode,
             reset_noise_scale=0.0,
@@ -89,6 +102,8 @@ class AntMazeEnv(MazeEnv, EzPickle):
             reward_type,
             continuing_task,
             reset_target,
+            merge_walls=merge_walls,
+            single_draw_reset=single_draw_reset,
             **kwargs,
         )
 
@@ -99,9 +114,7 @@ class AntMazeEnv(MazeEnv, EzPickle):
 
         obs, info = self.ant_env.reset(seed=seed)
         obs_dict = self._get_obs(obs)
-        info["success"] = bool(
-            np.linalg.norm(obs_dict["achieved_goal"] - self.goal) <= 0.45
-        )
+        info["success"] = self._is_success(obs_dict["achieved_goal"], self.goal)
 
         return obs_dict, info
 
@@ -112,7 +125,7 @@ class AntMazeEnv(MazeEnv, EzPickle):
         reward = self.compute_reward(obs["achieved_goal"], self.goal, info)
         terminated = self.compute_terminated(obs["achieved_goal"], self.goal, info)
         truncated = self.compute_truncated(obs["achieved_goal"], self.goal, info)
-        info["success"] = bool(np.linalg.norm(obs["achieved_goal"] - self.goal) <= 0.45)
+        info["success"] = self._is_success(obs["achieved_goal"], self.goal)
 
         if self.render_mode == "human":
             self.render()
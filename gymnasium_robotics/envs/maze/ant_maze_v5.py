@@ -22,10 +22,18 @@ from gymnasium.utils.ezpickle import EzPickle
 
 from gymnasium_robotics.envs.maze.maps import U_MAZE
 from gymnasium_robotics.envs.maze.maze_v4 import MazeEnv
-from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames
+from gymnasium_robotics.utils.mujoco_utils import (
+    CompiledModelMixin,
+    MujocoModelNames,
+    SimStateMixin,
+)
 
 
-class AntMazeEnv(MazeEnv, EzPickle):
+class MazeAntEnv(CompiledModelMixin, AntEnv):
+    """Gymnasium Ant v5 environment simulating the compiled model of the maze passed as ``model``."""
+
+
+class AntMazeEnv(MazeEnv, SimStateMixin, EzPickle):
     """
     ### Description
 
@@ -149,7 +157,7 @@ class AntMazeEnv(MazeEnv, EzPickle):
 
     ### Rewards
 
-    The reward can be initialized as `sparse` or `dense`:
+    The reward can be initialized as `sparse`, `dense` or `geodesic`:
     - *sparse*: the returned reward can have two values: `0` if the ant hasn't reached its final target position, and `1` if the ant is in the final target position (the ant is considered to have reached the goal if the Euclidean distance between both is lower than 0.5 m).
     - *dense*: the returned reward is the negative Euclidean distance between the achieved goal position and the desired goal.
 
@@ -165,6 +173,11 @@ class AntMazeEnv(MazeEnv, EzPickle):
     env = gym.make('AntMaze_UMaze-v5')
     ```
 
+    The `dense` reward can also be computed with the length of the shortest path through the maze instead of the Euclidean distance, which does not reward the ant for getting closer to the goal through a wall:
+    - *geodesic*: the returned reward is the exponential negative length of the shortest path between the achieved goal position and the desired goal, moving between adjacent non-wall cells (see `Maze.geodesic_distance`).
+
+    This reward is selected with the `reward_type` argument, e.g. `gym.make('AntMaze_MediumDense-v5', reward_type="geodesic")`.
+
     ### Starting State
     The goal and initial placement of the ant in the maze follows the same structure for all environments. A discrete cell `(i,j)` is selected for the goal and agent's initial position as previously menitoned in the **Maze** section.
     Then this cell index is converted to its cell center as an `(x,y)` continuous Cartesian coordinates in the MuJoCo simulation. Finally, a sampled noise from a uniform distribution with range `[-0.25,0.25]m` is added to the
@@ -185,6 +198,8 @@ class AntMazeEnv(MazeEnv, EzPickle):
     * `maze_map` - Optional argument to initialize the environment with a custom maze map.
     * `continuing_task` - If set to `True` the episode won't be terminated when reaching the goal, instead a new goal location will be generated (unless `reset_target` argument is `True`). If `False` the environment is terminated when the ant reaches the final goal.
     * `reset_target` - If set to `True` and the argument `continuing_task` is also `True`, when the ant reaches the target goal the location of the goal will be kept the same and no new goal location will be generated. If `False` a new goal will be generated when reached.
+    * `merge_walls` - If set to `True` the contiguous wall cells of the maze are merged into the minimum number of boxes, which reduces the number of geoms and speeds up the collision detection of large mazes. The outer boundary of the walls is the same, but the contacts near the seams between former wall cells can differ, e.g. an agent sliding along a wall no longer hits the edges of the cell boxes. Default to `False`, one box per wall cell.
+    * `single_draw_reset` - If set to `True` the reset position of the agent is drawn with a single draw among the reset locations that are not close to the goal, instead of drawing among all the reset locations until one is not close to the goal. Both follow the same distribution, but the seeded reset positions differ. Default to `False`, the reset positions of the previous versions.
     * `xml_file` - Optional argument to Path of robot model.
     * Optionally any other [Gymnasium/MuJoCo/Ant](https://gymnasium.farama.org/environments/mujoco/ant/#arguments/) argument such `ctrl_cost_weight`.
 
@@ -223,6 +238,8 @@ class AntMazeEnv(MazeEnv, EzPickle):
         reward_type: str = "sparse",
         continuing_task: bool = True,
         reset_target: bool = False,
+        merge_walls: bool = False,
+        single_draw_reset: bool = False,
         xml_file: Union[str, None] = None,
         **kwargs,
     ):
@@ -241,11 +258,14 @@ class AntMazeEnv(MazeEnv, EzPickle):
             reward_type=reward_type,
             continuing_task=continuing_task,
             reset_target=reset_target,
+            merge_walls=merge_walls,
+            single_draw_reset=single_draw_reset,
             **kwargs,
         )
         # Create the MuJoCo environment, include position observation of the Ant for GoalEnv
-        self.ant_env = AntEnv(
-            xml_file=self.tmp_xml_file_path,
+        self.ant_env = MazeAntEnv(
+            model=self.maze_model,
+            xml_file=self.agent_xml_path,
             exclude_current_positions_from_observation=False,
             render_mode=render_mode,
             reset_noise_scale=0.0,
@@ -274,6 +294,8 @@ class AntMazeEnv(MazeEnv, EzPickle):
             reward_type,
             continuing_task,
             reset_target,
+            merge_walls=merge_walls,
+            single_draw_reset=single_draw_reset,
             **kwargs,
         )
 
@@ -284,9 +306,7 @@ class AntMazeEnv(MazeEnv, EzPickle):
 
         obs, info = self.ant_env.reset(seed=seed)
         obs_dict = self._get_obs(obs)
-        info["success"] = bool(
-            np.linalg.norm(obs_dict["achieved_goal"] - self.goal) <= 0.45
-        )
+        info["success"] = self._is_success(obs_dict["achieved_goal"], self.goal)
 
         return obs_dict, info
 
@@ -297,7 +317,7 @@ class AntMazeEnv(MazeEnv, EzPickle):
         reward = self.compute_reward(obs["achieved_goal"], self.goal, info)
         terminated = self.compute_terminated(obs["achieved_goal"], self.goal, info)
         truncated = self.compute_truncated(obs["achieved_goal"], self.goal, info)
-        info["success"] = bool(np.linalg.norm(obs["achieved_goal"] - self.goal) <= 0.45)
+        info["success"] = self._is_success(obs["achieved_goal"], self.goal)
 
         if self.render_mode == "human":
             self.render()
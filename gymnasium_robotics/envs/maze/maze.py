@@ -285,22 +285,30 @@ class MazeEnv(GoalEnv):
     ) -> bool:
         if not self.continuing_task:
             # If task is episodic terminate the episode when the goal is reached
-            return bool(np.linalg.norm(achieved_goal - desired_goal) <= 0.45)
+            return self._is_success(achieved_goal, desired_goal)
         else:
             # Continuing tasks don't terminate, episode will be truncated when time limit is reached (`max_episode_steps`)
-            if (
-                bool(np.linalg.norm(achieved_goal - desired_goal) <= 0.45)
-                and len(self.maze.unique_goal_locations) > 1
-            ):
-                # Generate another goal
-                goal = self.generate_target_goal()
-                # Add noise to goal position
-                self.goal = self.add_xy_position_noise(goal)
-                # Update the position of the target site for visualization
-                self.update_target_site_pos()
-
             return False
 
+    def update_goal(self, achieved_goal: np.ndarray) -> None:
+        """Generate a new goal if the task is continuing and the goal is reached."""
+        if (
+            self.continuing_task
+            and bool(np.linalg.norm(achieved_goal - self.goal) <= 0.45)
+            and len(self.maze.unique_goal_locations) > 1
+        ):
+            # Generate another goal
+            goal = self.generate_target_goal()
+            # Add noise to goal position
+            self.goal = self.add_xy_position_noise(goal)
+            # Update the position of the target site for visualization
+            self.update_target_site_pos()
+
+    def _is_success(self, achieved_goal: np.ndarray, desired_goal: np.ndarray):
+        """Whether the achieved goals are within the goal radius 0.45 of the desired goals, also for batches of goals."""
+        success = np.linalg.norm(achieved_goal - desired_goal, axis=-1) <= 0.45
+        return bool(success) if success.ndim == 0 else success
+
     def compute_truncated(
         self, achieved_goal: np.ndarray, desired_goal: np.ndarray, info
     ) -> bool:
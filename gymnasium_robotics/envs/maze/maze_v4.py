@@ -11,18 +11,37 @@ As well as adding support for the Gymnasium API.
 This project is covered by the Apache 2.0 License.
 """
 
+import copy
+import hashlib
+import json
 import math
 import tempfile
-import time
 import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
 from os import path
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
+import mujoco
 import numpy as np
+from gymnasium import logger
 
 from gymnasium_robotics.core import GoalEnv
 from gymnasium_robotics.envs.maze.maps import COMBINED, GOAL, RESET, U_MAZE
 
+# Largest maze, in number of cells, for which the geodesic reward precomputes the shortest paths between all the cells
+GEODESIC_ALL_PAIRS_MAX_CELLS = 1024
+
+# Maximum number of mazes kept with their compiled models by `Maze.load_maze_model`
+MAZE_CACHE_MAX_SIZE = 32
+
+# Process-wide cache of the mazes and their compiled models, least recently used first, see `Maze.load_maze_model`
+_MAZE_CACHE: "OrderedDict[str, Tuple[Maze, str, mujoco.MjModel]]" = OrderedDict()
+
+
+def clear_maze_cache():
+    """Release the mazes and compiled models cached by :meth:`Maze.load_maze_model`."""
+    _MAZE_CACHE.clear()
+
 
 class Maze:
     r"""This class creates and holds information about the maze in the MuJoCo simulation.
@@ -31,9 +50,9 @@ class Maze:
     - :attr:`maze_map` - The maze discrete data structure.
     - :attr:`maze_size_scaling` - The maze scaling for the continuous coordinates in the MuJoCo simulation.
     - :attr:`maze_height` - The height of the walls in the MuJoCo simulation.
-    - :attr:`unique_goal_locations` - All the `(i,j)` possible cell indices for goal locations.
-    - :attr:`unique_reset_locations` - All the `(i,j)` possible cell indices for agent initialization locations.
-    - :attr:`combined_locations` - All the `(i,j)` possible cell indices for goal and agent initialization locations.
+    - :attr:`unique_goal_locations` - The `(x,y)` coordinates of the centers of all the possible goal cells, with shape `(N,2)`.
+    - :attr:`unique_reset_locations` - The `(x,y)` coordinates of the centers of all the possible agent initialization cells, with shape `(N,2)`.
+    - :attr:`combined_locations` - The `(x,y)` coordinates of the centers of all the possible goal and agent initialization cells, with shape `(N,2)`.
     - :attr:`map_length` - Maximum value of j cell index
     - :attr:`map_width` - Mazimum value of i cell index
     - :attr:`x_map_center` - The x coordinate of the map's center
@@ -42,6 +61,13 @@ class Maze:
     The Maze class also presents a method to convert from cell indices to `(x,y)` coordinates in the MuJoCo simulation:
     - :meth:`cell_rowcol_to_xy` - Convert from `(i,j)` to `(x,y)`
 
+    And methods to query the shortest paths between the cells of the maze, moving between adjacent non-wall cells:
+    - :meth:`geodesic_distance_map` - The shortest path distances from all the cells to a goal cell `(i,j)`
+    - :meth:`geodesic_cell_distance` - The shortest path distances between the cells of batches of `(x,y)` coordinates
+    - :meth:`geodesic_next_cell` - The next cell on the shortest paths between batches of `(x,y)` coordinates
+    - :meth:`geodesic_distance` - The lengths of the shortest paths between batches of `(x,y)` coordinates
+    - :meth:`precompute_geodesic_distances` - Compute the shortest paths between all the pairs of cells at once
+
     ### Version History
     * v4: Refactor compute_terminated into a pure function compute_terminated and a new function update_goal which resets the goal position. Bug fix: missing maze_size_scaling factor added in generate_reset_pos() -- only affects AntMaze.
     * v3: refactor version of the D4RL environment, also create dependency on newest [mujoco python bindings](https://mujoco.readthedocs.io/en/latest/python.html) maintained by the MuJoCo team in Deepmind.
@@ -59,9 +85,9 @@ class Maze:
         self._maze_size_scaling = maze_size_scaling
         self._maze_height = maze_height
 
-        self._unique_goal_locations = []
-        self._unique_reset_locations = []
-        self._combined_locations = []
+        self._unique_goal_locations = np.zeros((0, 2))
+        self._unique_reset_locations = np.zeros((0, 2))
+        self._combined_locations = np.zeros((0, 2))
 
         # Get the center cell Cartesian position of the maze. This will be the origin
         self._map_length = len(maze_map)
@@ -69,6 +95,9 @@ class Maze:
         self._x_map_center = self.map_width / 2 * maze_size_scaling
         self._y_map_center = self.map_length / 2 * maze_size_scaling
 
+        # Shortest paths between the cells, computed lazily and shared by the copies of the maze
+        self._geodesic_tables = _GeodesicTables(maze_map)
+
     @property
     def maze_map(self) -> List[List[Union[str, int]]]:
         """Returns the list[list] data structure of the maze."""
@@ -89,23 +118,23 @@ class Maze:
         return self._maze_height
 
     @property
-    def unique_goal_locations(self) -> List[np.ndarray]:
-        """Returns all the possible goal locations in discrete cell
-        coordinates (i,j)
+    def unique_goal_locations(self) -> np.ndarray:
+        """Returns all the possible goal locations as an array of the `(x,y)`
+        coordinates of the cell centers, with shape `(N,2)`.
         """
         return self._unique_goal_locations
 
     @property
-    def unique_reset_locations(self) -> List[np.ndarray]:
-        """Returns all the possible reset locations for the agent in
-        discrete cell coordinates (i,j)
+    def unique_reset_locations(self) -> np.ndarray:
+        """Returns all the possible reset locations for the agent as an array
+        of the `(x,y)` coordinates of the cell centers, with shape `(N,2)`.
         """
         return self._unique_reset_locations
 
     @property
-    def combined_locations(self) -> List[np.ndarray]:
-        """Returns all the possible goal/reset locations in discrete cell
-        coordinates (i,j)
+    def combined_locations(self) -> np.ndarray:
+        """Returns all the possible goal/reset locations as an array of the
+        `(x,y)` coordinates of the cell centers, with shape `(N,2)`.
         """
         return self._combined_locations
 
@@ -134,17 +163,137 @@ class Maze:
         return self._y_map_center
 
     def cell_rowcol_to_xy(self, rowcol_pos: np.ndarray) -> np.ndarray:
-        """Converts a cell index `(i,j)` to x and y coordinates in the MuJoCo simulation"""
-        x = (rowcol_pos[1] + 0.5) * self.maze_size_scaling - self.x_map_center
-        y = self.y_map_center - (rowcol_pos[0] + 0.5) * self.maze_size_scaling
+        """Converts cell indices `(i,j)` to the x and y coordinates of the cell centers in the MuJoCo simulation,
+        for a single `(2,)` cell or a batch of `(N,2)` cells.
+        """
+        rowcol_pos = np.asarray(rowcol_pos)
+        x = (rowcol_pos[..., 1] + 0.5) * self.maze_size_scaling - self.x_map_center
+        y = self.y_map_center - (rowcol_pos[..., 0] + 0.5) * self.maze_size_scaling
 
-        return np.array([x, y])
+        return np.stack([x, y], axis=-1)
 
     def cell_xy_to_rowcol(self, xy_pos: np.ndarray) -> np.ndarray:
-        """Converts a cell x and y coordinates to `(i,j)`"""
-        i = math.floor((self.y_map_center - xy_pos[1]) / self.maze_size_scaling)
-        j = math.floor((xy_pos[0] + self.x_map_center) / self.maze_size_scaling)
-        return np.array([i, j])
+        """Converts x and y coordinates to the indices `(i,j)` of their cells, for a single `(2,)` coordinate or a batch
+        of `(N,2)` coordinates.
+        """
+        xy_pos = np.asarray(xy_pos)
+        i = np.floor((self.y_map_center - xy_pos[..., 1]) / self.maze_size_scaling)
+        j = np.floor((xy_pos[..., 0] + self.x_map_center) / self.maze_size_scaling)
+        return np.stack([i, j], axis=-1).astype(int)
+
+    def geodesic_distance_map(self, goal_cell: np.ndarray) -> np.ndarray:
+        """Returns the number of moves between adjacent non-wall cells on the shortest paths from every cell `(i,j)` of
+        the maze to the cell `goal_cell`, with shape `(map_length, map_width)`.
+
+        The distance is `inf` for the wall cells and the cells that cannot reach the goal cell.
+        """
+        i, j = int(goal_cell[0]), int(goal_cell[1])
+        assert 0 <= i < self.map_length and 0 <= j < self.map_width
+        distance, _ = self._geodesic_tables.goal_table(i * self.map_width + j)
+        return distance.reshape(self.map_length, self.map_width)
+
+    def geodesic_cell_distance(
+        self, xy_pos: np.ndarray, goal_xy_pos: np.ndarray
+    ) -> np.ndarray:
+        """Returns the number of moves between adjacent non-wall cells on the shortest paths from the cells of the
+        `(x,y)` coordinates `xy_pos` to the cells of the `(x,y)` coordinates `goal_xy_pos`.
+
+        The coordinates are broadcast against each other along their leading axes, e.g. `(N,2)` positions and a single
+        `(2,)` goal, and the distances have their broadcast leading shape. The distance is `inf` if one of the
+        coordinates is in a wall cell or outside the maze, or if the cells are not connected.
+        """
+        distance, _, shape = self._geodesic_lookup(xy_pos, goal_xy_pos)
+        return distance.reshape(shape)
+
+    def geodesic_next_cell(
+        self, xy_pos: np.ndarray, goal_xy_pos: np.ndarray
+    ) -> np.ndarray:
+        """Returns the `(x,y)` coordinates of the center of the next cell on the shortest paths from the cells of the
+        `(x,y)` coordinates `xy_pos` to the cells of the `(x,y)` coordinates `goal_xy_pos`.
+
+        The coordinates are broadcast as in :meth:`geodesic_cell_distance`. The next cell of a coordinate in the goal
+        cell is the goal cell, and the next cell is `nan` when the distance is `inf`.
+        """
+        _, next_cell, shape = self._geodesic_lookup(xy_pos, goal_xy_pos)
+        next_xy = self._cell_index_to_xy(next_cell)
+        next_xy[next_cell < 0] = np.nan
+        return next_xy.reshape(shape + (2,))
+
+    def geodesic_distance(
+        self, xy_pos: np.ndarray, goal_xy_pos: np.ndarray
+    ) -> np.ndarray:
+        """Returns the length of the shortest paths through the maze from the `(x,y)` coordinates `xy_pos` to the
+        `(x,y)` coordinates `goal_xy_pos`, broadcast as in :meth:`geodesic_cell_distance`.
+
+        The length is interpolated from the shortest paths between the cells: within the same or adjacent cells it
+        is the Euclidean distance, and otherwise it is the length of the path from `xy_pos` to the center of the next
+        cell, through the centers of the cells of a shortest path, and from the center of the cell before the goal
+        cell to `goal_xy_pos`. The length is `inf` if the cells are walls, outside the maze or not connected.
+        """
+        xy_pos, goal_xy_pos = np.broadcast_arrays(
+            np.asarray(xy_pos, dtype=np.float64), np.asarray(goal_xy_pos)
+        )
+        shape = xy_pos.shape[:-1]
+        xy_pos, goal_xy_pos = xy_pos.reshape(-1, 2), goal_xy_pos.reshape(-1, 2)
+        cells = self._xy_to_cell_index(xy_pos)
+        goals = self._xy_to_cell_index(goal_xy_pos)
+        cell_distance, next_cell = self._geodesic_tables.lookup(cells, goals)
+
+        distance = np.linalg.norm(xy_pos - goal_xy_pos, axis=-1)
+        distance[np.isinf(cell_distance)] = math.inf
+        far = np.flatnonzero((cell_distance >= 2) & np.isfinite(cell_distance))
+        if len(far) > 0:
+            # The cell before the goal cell on a shortest path from the next cell, `cell_distance - 2` moves away
+            _, goal_side_cell = self._geodesic_tables.lookup(goals[far], next_cell[far])
+            distance[far] = (
+                np.linalg.norm(
+                    xy_pos[far] - self._cell_index_to_xy(next_cell[far]), axis=-1
+                )
+                + (cell_distance[far] - 2) * self.maze_size_scaling
+                + np.linalg.norm(
+                    goal_xy_pos[far] - self._cell_index_to_xy(goal_side_cell),
+                    axis=-1,
+                )
+            )
+        return distance.reshape(shape)
+
+    def precompute_geodesic_distances(self):
+        """Computes the shortest paths between all the pairs of cells, so that the queries of batches with many
+        different goal cells are plain array lookups.
+
+        Otherwise, the shortest paths to a goal cell are computed the first time the cell is queried. The tables hold
+        `(map_length * map_width)**2` distances and next cells, and are shared by the copies of the maze.
+        """
+        self._geodesic_tables.compute_all_pairs()
+
+    def _geodesic_lookup(
+        self, xy_pos: np.ndarray, goal_xy_pos: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, Tuple[int, ...]]:
+        """Returns the flat distances and next cell indices between the cells of the broadcast coordinates, and their
+        leading shape."""
+        xy_pos, goal_xy_pos = np.broadcast_arrays(
+            np.asarray(xy_pos, dtype=np.float64), np.asarray(goal_xy_pos)
+        )
+        shape = xy_pos.shape[:-1]
+        return (
+            *self._geodesic_tables.lookup(
+                self._xy_to_cell_index(xy_pos.reshape(-1, 2)),
+                self._xy_to_cell_index(goal_xy_pos.reshape(-1, 2)),
+            ),
+            shape,
+        )
+
+    def _cell_index_to_xy(self, cell: np.ndarray) -> np.ndarray:
+        """Converts the flat indices `i * map_width + j` of cells to the `(N,2)` x and y coordinates of their centers."""
+        return self.cell_rowcol_to_xy(
+            np.stack(np.divmod(cell, self.map_width), axis=-1)
+        )
+
+    def _xy_to_cell_index(self, xy_pos: np.ndarray) -> np.ndarray:
+        """Converts `(N,2)` x and y coordinates to the flat indices `i * map_width + j` of their cells, -1 outside the maze."""
+        i, j = self.cell_xy_to_rowcol(xy_pos).T
+        inside = (0 <= i) & (i < self.map_length) & (0 <= j) & (j < self.map_width)
+        return np.where(inside, i * self.map_width + j, -1).astype(np.intp)
 
     @classmethod
     def make_maze(
@@ -157,51 +306,100 @@ class Maze:
         """Class method that returns an instance of Maze with a decoded maze information and the temporal
            path to the new MJCF (xml) file for the MuJoCo simulation.
 
+        Deprecated: this method writes a new file for each call, which is owned by the caller and must be deleted by
+        it. Use :meth:`load_maze_model` for the compiled model or :meth:`make_maze_xml` for the MJCF (xml) string.
+
         Args:
-            agent_xml_path (str): the goal that was achieved during execution
-            maze_map (list[list[str,int]]): the desired goal that we asked the agent to attempt to achieve
-            maze_size_scaling (float): an info dictionary with additional information
-            maze_height (float): an info dictionary with additional information
+            agent_xml_path (str): path to the MJCF (xml) file of the agent
+            maze_map (list[list[str,int]]): the maze discrete data structure
+            maze_size_scaling (float): the maze scaling for the continuous coordinates in the MuJoCo simulation
+            maze_height (float): the height of the walls in the MuJoCo simulation
 
         Returns:
-            Maze: The reward that corresponds to the provided achieved goal w.r.t. to the desired
-            goal. Note that the following should always hold true:
-            str: The xml temporal file to the new mjcf model with the included maze.
+            Maze: the decoded maze.
+            str: the path to the new temporary MJCF (xml) file of the model with the included maze.
+        """
+        logger.deprecation(
+            "`Maze.make_maze` is deprecated and will be removed in a future release, it writes a temporary file "
+            "that the caller must delete. Use `Maze.load_maze_model` or `Maze.make_maze_xml` instead."
+        )
+        maze, xml = cls.make_maze_xml(
+            agent_xml_path, maze_map, maze_size_scaling, maze_height
+        )
+
+        # Save new xml with maze to a temporary file
+        fd, temp_xml_path = tempfile.mkstemp(prefix="ant_maze", suffix=".xml")
+        with open(fd, "w") as f:
+            f.write(xml)
+
+        return maze, temp_xml_path
+
+    @classmethod
+    def make_maze_xml(
+        cls,
+        agent_xml_path: str,
+        maze_map: list,
+        maze_size_scaling: float,
+        maze_height: float,
+        merge_walls: bool = False,
+    ) -> Tuple["Maze", str]:
+        """Class method that returns an instance of Maze with a decoded maze information and the MJCF (xml) string
+           of the agent model with the maze walls and the target site.
+
+        The relative paths of the assets of the agent model are made absolute, so the string can be compiled from
+        any directory.
+
+        Args:
+            agent_xml_path (str): path to the MJCF (xml) file of the agent
+            maze_map (list[list[str,int]]): the maze discrete data structure
+            maze_size_scaling (float): the maze scaling for the continuous coordinates in the MuJoCo simulation
+            maze_height (float): the height of the walls in the MuJoCo simulation
+            merge_walls (bool): if True, the contiguous wall cells are merged into rectangular boxes (see :func:`merge_wall_cells`) instead of adding one box per wall cell
+
+        Returns:
+            Maze: the decoded maze.
+            str: the MJCF (xml) string of the model with the included maze.
         """
         tree = ET.parse(agent_xml_path)
+        _resolve_asset_paths(tree, path.dirname(path.realpath(agent_xml_path)))
         worldbody = tree.find(".//worldbody")
 
         maze = cls(maze_map, maze_size_scaling, maze_height)
-        empty_locations = []
+        # Cells (i, j) of the reset, goal, combined and empty locations
+        reset_cells, goal_cells, combined_cells, empty_cells = [], [], [], []
+        # Wall boxes (i, j, number of rows, number of columns) starting at the cell (i, j)
+        walls = merge_wall_cells(maze_map) if merge_walls else []
         for i in range(maze.map_length):
             for j in range(maze.map_width):
                 struct = maze_map[i][j]
-                # Store cell locations in simulation global Cartesian coordinates
-                x = (j + 0.5) * maze_size_scaling - maze.x_map_center
-                y = maze.y_map_center - (i + 0.5) * maze_size_scaling
                 if struct == 1:  # Unmovable block.
-                    # Offset all coordinates so that maze is centered.
-                    ET.SubElement(
-                        worldbody,
-                        "geom",
-                        name=f"block_{i}_{j}",
-                        pos=f"{x} {y} {maze_height / 2 * maze_size_scaling}",
-                        size=f"{0.5 * maze_size_scaling} {0.5 * maze_size_scaling} {maze_height / 2 * maze_size_scaling}",
-                        type="box",
-                        material="",
-                        contype="1",
-                        conaffinity="1",
-                        rgba="0.7 0.5 0.3 1.0",
-                    )
-
+                    if not merge_walls:
+                        walls.append((i, j, 1, 1))
                 elif struct == RESET:
-                    maze._unique_reset_locations.append(np.array([x, y]))
+                    reset_cells.append((i, j))
                 elif struct == GOAL:
-                    maze._unique_goal_locations.append(np.array([x, y]))
+                    goal_cells.append((i, j))
                 elif struct == COMBINED:
-                    maze._combined_locations.append(np.array([x, y]))
+                    combined_cells.append((i, j))
                 elif struct == 0:
-                    empty_locations.append(np.array([x, y]))
+                    empty_cells.append((i, j))
+
+        for i, j, rows, cols in walls:
+            # Offset all coordinates so that maze is centered.
+            x = (j + 0.5 * cols) * maze_size_scaling - maze.x_map_center
+            y = maze.y_map_center - (i + 0.5 * rows) * maze_size_scaling
+            ET.SubElement(
+                worldbody,
+                "geom",
+                name=f"block_{i}_{j}",
+                pos=f"{x} {y} {maze_height / 2 * maze_size_scaling}",
+                size=f"{0.5 * cols * maze_size_scaling} {0.5 * rows * maze_size_scaling} {maze_height / 2 * maze_size_scaling}",
+                type="box",
+                material="",
+                contype="1",
+                conaffinity="1",
+                rgba="0.7 0.5 0.3 1.0",
+            )
 
         # Add target site for visualization
         ET.SubElement(
@@ -215,33 +413,368 @@ class Maze:
         )
 
         # Add the combined cell locations (goal/reset) to goal and reset
-        if (
-            not maze._unique_goal_locations
-            and not maze._unique_reset_locations
-            and not maze._combined_locations
-        ):
+        if not goal_cells and not reset_cells and not combined_cells:
             # If there are no given "r", "g" or "c" cells in the maze data structure,
             # any empty cell can be a reset or goal location at initialization.
-            maze._combined_locations = empty_locations
-        elif not maze._unique_reset_locations and not maze._combined_locations:
+            combined_cells = empty_cells
+        elif not reset_cells and not combined_cells:
             # If there are no given "r" or "c" cells in the maze data structure,
             # any empty cell can be a reset location at initialization.
-            maze._unique_reset_locations = empty_locations
-        elif not maze._unique_goal_locations and not maze._combined_locations:
+            reset_cells = empty_cells
+        elif not goal_cells and not combined_cells:
             # If there are no given "g" or "c" cells in the maze data structure,
             # any empty cell can be a gaol location at initialization.
-            maze._unique_goal_locations = empty_locations
+            goal_cells = empty_cells
 
-        maze._unique_goal_locations += maze._combined_locations
-        maze._unique_reset_locations += maze._combined_locations
+        # Store cell locations in simulation global Cartesian coordinates, as (N, 2) arrays
+        maze._unique_goal_locations = maze.cell_rowcol_to_xy(
+            np.array(goal_cells + combined_cells, dtype=int).reshape(-1, 2)
+        )
+        maze._unique_reset_locations = maze.cell_rowcol_to_xy(
+            np.array(reset_cells + combined_cells, dtype=int).reshape(-1, 2)
+        )
+        maze._combined_locations = maze.cell_rowcol_to_xy(
+            np.array(combined_cells, dtype=int).reshape(-1, 2)
+        )
 
-        # Save new xml with maze to a temporary file
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            temp_xml_name = f"ant_maze{str(time.time())}.xml"
-            temp_xml_path = path.join(path.dirname(tmp_dir), temp_xml_name)
-            tree.write(temp_xml_path)
+        return maze, ET.tostring(tree.getroot(), encoding="unicode")
 
-        return maze, temp_xml_path
+    @classmethod
+    def load_maze_model(
+        cls,
+        agent_xml_path: str,
+        maze_map: list,
+        maze_size_scaling: float,
+        maze_height: float,
+        merge_walls: bool = False,
+    ) -> Tuple["Maze", mujoco.MjModel]:
+        """Class method that returns an instance of Maze with a decoded maze information and the compiled MuJoCo model of
+           the agent with the maze, without writing any file.
+
+        The maze and its model are built and compiled the first time they are loaded in the process, and cached with
+        a hash of the agent MJCF (xml) file, the maze map, the scaling and the height (see :func:`maze_cache_key`).
+        Later calls return copies of the cached maze and model, which are owned by the caller. The
+        :data:`MAZE_CACHE_MAX_SIZE` most recently loaded mazes are kept, see :func:`clear_maze_cache` to release them.
+
+        Args:
+            agent_xml_path (str): path to the MJCF (xml) file of the agent
+            maze_map (list[list[str,int]]): the maze discrete data structure
+            maze_size_scaling (float): the maze scaling for the continuous coordinates in the MuJoCo simulation
+            maze_height (float): the height of the walls in the MuJoCo simulation
+            merge_walls (bool): if True, the contiguous wall cells are merged into rectangular boxes
+
+        Returns:
+            Maze: the decoded maze.
+            mujoco.MjModel: a new copy of the compiled model with the included maze.
+        """
+        key = cls.__qualname__ + maze_cache_key(
+            agent_xml_path, maze_map, maze_size_scaling, maze_height, merge_walls
+        )
+        if key not in _MAZE_CACHE:
+            maze, xml = cls.make_maze_xml(
+                agent_xml_path, maze_map, maze_size_scaling, maze_height, merge_walls
+            )
+            _MAZE_CACHE[key] = (maze, xml, mujoco.MjModel.from_xml_string(xml))
+            while len(_MAZE_CACHE) > MAZE_CACHE_MAX_SIZE:
+                _MAZE_CACHE.popitem(last=False)
+        _MAZE_CACHE.move_to_end(key)
+        maze, _, model = _MAZE_CACHE[key]
+        return copy.deepcopy(maze), copy.copy(model)
+
+
+def maze_cache_key(
+    agent_xml_path: str,
+    maze_map: list,
+    maze_size_scaling: float,
+    maze_height: float,
+    merge_walls: bool = False,
+) -> str:
+    """Returns the SHA-256 hash of the agent MJCF (xml) file and of the maze parameters used to cache the maze models.
+
+    The real path of the agent file is part of the key since the relative paths of its assets depend on it.
+    """
+    with open(agent_xml_path, "rb") as f:
+        agent_xml = f.read()
+    maze_parameters = json.dumps(
+        [
+            path.realpath(agent_xml_path),
+            maze_map,
+            float(maze_size_scaling),
+            float(maze_height),
+            bool(merge_walls),
+        ],
+        default=repr,
+    )
+    digest = hashlib.sha256(agent_xml)
+    digest.update(maze_parameters.encode())
+    return digest.hexdigest()
+
+
+def merge_wall_cells(maze_map: list) -> List[Tuple[int, int, int, int]]:
+    """Partition the wall cells (``1``) of ``maze_map`` into the minimum number of rectangles of wall cells.
+
+    The walls are cut along the grid lines, from their concave corners: a maximum set of non-intersecting cuts joining
+    two concave corners is drawn first, each of them removing two concave corners, then every remaining concave
+    corner is removed by a cut extended from it until the boundary or another cut (Lipski et al., 1979). This partition
+    has the minimum number of rectangles. The rectangles do not overlap and their union is the set of wall cells, so
+    the boxes built from them have the same outer boundary as one box per wall cell. The contacts can still differ
+    from the ones of the cell boxes near their former seams, where no box edge remains.
+
+    Args:
+        maze_map (list[list[str,int]]): the maze discrete data structure
+
+    Returns:
+        list[tuple[int, int, int, int]]: the rectangles ``(i, j, rows, cols)`` with top left cell ``(i, j)``, in
+        row-major order of their top left cell.
+    """
+    walls = np.array([[cell == 1 for cell in row] for row in maze_map], dtype=bool)
+    length, width = walls.shape
+    # Walls padded with free cells, the vertex (r, c) of the grid is the corner between the padded cells
+    # (r, c) (top left), (r, c + 1) (top right), (r + 1, c) (bottom left) and (r + 1, c + 1) (bottom right).
+    padded = np.zeros((length + 2, width + 2), dtype=bool)
+    padded[1:-1, 1:-1] = walls
+    concave = [
+        (r, c)
+        for r in range(length + 1)
+        for c in range(width + 1)
+        if _corner_walls(padded, r, c) == 3
+    ]
+
+    # Cut grid edges: cut_h[r, c] joins the vertices (r, c) and (r, c + 1), cut_v[r, c] joins (r, c) and (r + 1, c)
+    cut_h = np.zeros((length + 1, width), dtype=bool)
+    cut_v = np.zeros((length, width + 1), dtype=bool)
+    horizontal, vertical = _max_non_intersecting_chords(padded, concave)
+    for r, c1, _, c2 in horizontal:
+        cut_h[r, c1:c2] = True
+    for r1, c, r2, _ in vertical:
+        cut_v[r1:r2, c] = True
+
+    def is_cut(r, c):
+        # Whether a cut edge ends at the vertex (r, c)
+        return bool(
+            (c < width and cut_h[r, c])
+            or (c > 0 and cut_h[r, c - 1])
+            or (r < length and cut_v[r, c])
+            or (r > 0 and cut_v[r - 1, c])
+        )
+
+    # Extend a vertical cut from every remaining concave corner until the boundary of the walls or another cut
+    for r, c in concave:
+        if is_cut(r, c):
+            continue
+        dr = 1 if _is_interior(padded, r, c, (1, 0)) else -1
+        reached_end = False
+        while not reached_end:
+            reached_end = _corner_walls(padded, r + dr, c) < 4 or is_cut(r + dr, c)
+            cut_v[min(r, r + dr), c] = True
+            r += dr
+
+    # The rectangles are the groups of wall cells that are not separated by a cut
+    grouped = np.zeros_like(walls)
+    rectangles = []
+    for i, j in zip(*np.nonzero(walls)):
+        if grouped[i, j]:
+            continue
+        cols = 1
+        while j + cols < width and walls[i, j + cols] and not cut_v[i, j + cols]:
+            cols += 1
+        rows = 1
+        while i + rows < length and walls[i + rows, j] and not cut_h[i + rows, j]:
+            rows += 1
+        assert np.all(walls[i : i + rows, j : j + cols])
+        assert not np.any(grouped[i : i + rows, j : j + cols])
+        grouped[i : i + rows, j : j + cols] = True
+        rectangles.append((int(i), int(j), rows, cols))
+    return rectangles
+
+
+def _corner_walls(padded: np.ndarray, r: int, c: int) -> int:
+    """Number of wall cells around the vertex ``(r, c)`` of the grid, see :func:`merge_wall_cells`."""
+    return int(padded[r : r + 2, c : c + 2].sum())
+
+
+def _is_interior(padded: np.ndarray, r: int, c: int, step: Tuple[int, int]) -> bool:
+    """Whether the grid edge leaving the vertex ``(r, c)`` with ``step`` has wall cells on both sides."""
+    dr, dc = step
+    if dr == 0:
+        # Horizontal edge between the cells above and below it
+        col = c + 1 if dc == 1 else c
+        return bool(padded[r, col] and padded[r + 1, col])
+    row = r + 1 if dr == 1 else r
+    return bool(padded[row, c] and padded[row, c + 1])
+
+
+def _max_non_intersecting_chords(padded: np.ndarray, concave: list):
+    """Return a maximum set of non-intersecting horizontal and vertical chords of the walls.
+
+    A chord is a straight cut through the inside of the walls joining two concave corners. Only a horizontal and a
+    vertical chord can intersect (two chords are intersecting if they share a vertex), so a maximum set of
+    non-intersecting chords is the complement of a minimum vertex cover of the bipartite intersection graph, found
+    from a maximum matching with Konig's theorem.
+
+    Returns:
+        horizontal (list): the chords ``(r, c1, r, c2)`` with ``c1 < c2``.
+        vertical (list): the chords ``(r1, c, r2, c)`` with ``r1 < r2``.
+    """
+    # The chords are found from their left or top end
+    chords = {(0, 1): [], (1, 0): []}
+    for r, c in concave:
+        for (dr, dc), found in chords.items():
+            if not _is_interior(padded, r, c, (dr, dc)):
+                continue
+            end_r, end_c = r + dr, c + dc
+            while _corner_walls(padded, end_r, end_c) == 4 and _is_interior(
+                padded, end_r, end_c, (dr, dc)
+            ):
+                end_r, end_c = end_r + dr, end_c + dc
+            if _corner_walls(padded, end_r, end_c) == 3:
+                found.append((r, c, end_r, end_c))
+    horizontal, vertical = chords[(0, 1)], chords[(1, 0)]
+    crossings = [
+        [
+            k
+            for k, (r1, c, r2, _) in enumerate(vertical)
+            if c1 <= c <= c2 and r1 <= r <= r2
+        ]
+        for r, c1, _, c2 in horizontal
+    ]
+
+    # Maximum matching with augmenting paths
+    match_of_vertical = [-1] * len(vertical)
+
+    def augment(h, visited):
+        for v in crossings[h]:
+            if v not in visited:
+                visited.add(v)
+                if match_of_vertical[v] == -1 or augment(match_of_vertical[v], visited):
+                    match_of_vertical[v] = h
+                    return True
+        return False
+
+    for h in range(len(horizontal)):
+        augment(h, set())
+
+    # The chords reached by alternating paths from the unmatched horizontal chords: the reached horizontal chords
+    # and the unreached vertical chords do not intersect.
+    reached_horizontal = set(range(len(horizontal))) - set(match_of_vertical)
+    reached_vertical = set()
+    frontier = list(reached_horizontal)
+    while frontier:
+        for v in crossings[frontier.pop()]:
+            if v not in reached_vertical:
+                reached_vertical.add(v)
+                if match_of_vertical[v] not in reached_horizontal:
+                    reached_horizontal.add(match_of_vertical[v])
+                    frontier.append(match_of_vertical[v])
+    return (
+        [horizontal[h] for h in sorted(reached_horizontal)],
+        [chord for k, chord in enumerate(vertical) if k not in reached_vertical],
+    )
+
+
+class _GeodesicTables:
+    """Shortest paths between the non-wall cells of a maze map, moving between cells that share a side.
+
+    The cells are indexed by their flat index `i * map_width + j`. The table of a goal cell holds the number of moves
+    from every cell to the goal cell, and the next cell on a shortest path to the goal cell, which is the parent of the
+    cell in a breadth-first search from the goal cell. The tables are computed once and never modified, so a deep
+    copy of the maze shares them.
+    """
+
+    def __init__(self, maze_map: list):
+        free = np.array([[cell != 1 for cell in row] for row in maze_map], dtype=bool)
+        length, width = free.shape
+        self.size = free.size
+        # Non-wall neighbours of the non-wall cells, in the order up, down, left, right
+        self.neighbours: List[List[int]] = [[] for _ in range(self.size)]
+        for i, j in zip(*np.nonzero(free)):
+            for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+                if 0 <= ni < length and 0 <= nj < width and free[ni, nj]:
+                    self.neighbours[i * width + j].append(int(ni * width + nj))
+        self.free = free.ravel()
+
+        self._goal_tables: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._all_pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def goal_table(self, goal: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the distances to the cell `goal` (`inf` if not connected) and the next cells (-1 if not connected)."""
+        if goal not in self._goal_tables:
+            distance = [math.inf] * self.size
+            next_cell = [-1] * self.size
+            if self.free[goal]:
+                distance[goal] = 0
+                next_cell[goal] = goal
+                queue = deque([goal])
+                while queue:
+                    cell = queue.popleft()
+                    for neighbour in self.neighbours[cell]:
+                        if next_cell[neighbour] < 0:
+                            distance[neighbour] = distance[cell] + 1
+                            next_cell[neighbour] = cell
+                            queue.append(neighbour)
+            table = (np.array(distance), np.array(next_cell, dtype=np.intp))
+            for array in table:
+                array.flags.writeable = False
+            self._goal_tables[goal] = table
+        return self._goal_tables[goal]
+
+    def compute_all_pairs(self):
+        """Stack the tables of all the cells into `(goal, cell)` arrays."""
+        if self._all_pairs is None:
+            tables = [self.goal_table(goal) for goal in range(self.size)]
+            self._all_pairs = tuple(
+                np.stack([table[k] for table in tables]) for k in range(2)
+            )
+            for array in self._all_pairs:
+                array.flags.writeable = False
+
+    def lookup(
+        self, cells: np.ndarray, goals: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the distances and the next cells from the flat cell indices `cells` to `goals`, -1 outside the maze."""
+        valid = (cells >= 0) & (goals >= 0)
+        cells, goals = np.where(valid, cells, 0), np.where(valid, goals, 0)
+        if self._all_pairs is not None:
+            distance = self._all_pairs[0][goals, cells]
+            next_cell = self._all_pairs[1][goals, cells]
+        else:
+            distance = np.empty(cells.shape)
+            next_cell = np.empty(cells.shape, dtype=np.intp)
+            # Look up the cells of each goal with the table of the goal
+            order = np.argsort(goals, kind="stable")
+            unique_goals, starts = np.unique(goals[order], return_index=True)
+            for goal, group in zip(unique_goals, np.split(order, starts[1:])):
+                goal_distance, goal_next_cell = self.goal_table(int(goal))
+                distance[group] = goal_distance[cells[group]]
+                next_cell[group] = goal_next_cell[cells[group]]
+        distance[~valid] = math.inf
+        next_cell[~valid] = -1
+        return distance, next_cell
+
+
+def _resolve_asset_paths(tree: ET.ElementTree, agent_dir: str):
+    """Make the relative paths of the asset files and includes of an MJCF tree absolute."""
+    compiler = tree.find(".//compiler")
+    asset_dir = meshdir = texturedir = ""
+    if compiler is not None:
+        asset_dir = compiler.get("assetdir", "")
+        meshdir = compiler.get("meshdir", asset_dir)
+        texturedir = compiler.get("texturedir", asset_dir)
+    directories = {
+        "mesh": meshdir,
+        "skin": meshdir,
+        "hfield": meshdir,
+        "texture": texturedir,
+    }
+    for element in tree.iter():
+        file = element.get("file")
+        if file is None or path.isabs(file):
+            continue
+        directory = directories.get(element.tag, "")
+        element.set("file", path.join(agent_dir, directory, file))
 
 
 class MazeEnv(GoalEnv):
@@ -255,17 +788,29 @@ class MazeEnv(GoalEnv):
         maze_size_scaling: float = 1.0,
         maze_height: float = 0.5,
         position_noise_range: float = 0.25,
+        merge_walls: bool = False,
+        single_draw_reset: bool = False,
         **kwargs,
     ):
 
         self.reward_type = reward_type
         self.continuing_task = continuing_task
         self.reset_target = reset_target
-        self.maze, self.tmp_xml_file_path = Maze.make_maze(
-            agent_xml_path, maze_map, maze_size_scaling, maze_height
+        self.agent_xml_path = agent_xml_path
+        self.maze, self.maze_model = Maze.load_maze_model(
+            agent_xml_path, maze_map, maze_size_scaling, maze_height, merge_walls
         )
 
         self.position_noise_range = position_noise_range
+        self.single_draw_reset = single_draw_reset
+
+        if (
+            reward_type == "geodesic"
+            and self.maze.map_length * self.maze.map_width
+            <= GEODESIC_ALL_PAIRS_MAX_CELLS
+        ):
+            # The batches of rewards look up the shortest paths to many different cells
+            self.maze.precompute_geodesic_distances()
 
     def generate_target_goal(self) -> np.ndarray:
         assert len(self.maze.unique_goal_locations) > 0
@@ -278,17 +823,28 @@ class MazeEnv(GoalEnv):
     def generate_reset_pos(self) -> np.ndarray:
         assert len(self.maze.unique_reset_locations) > 0
 
-        # While reset position is close to goal position
-        reset_pos = self.goal.copy()
-        while (
-            np.linalg.norm(reset_pos - self.goal) <= 0.5 * self.maze.maze_size_scaling
-        ):
-            reset_index = self.np_random.integers(
-                low=0, high=len(self.maze.unique_reset_locations)
-            )
-            reset_pos = self.maze.unique_reset_locations[reset_index].copy()
+        reset_locations = self.maze.unique_reset_locations
+        far = (
+            np.linalg.norm(reset_locations - self.goal, axis=-1)
+            > 0.5 * self.maze.maze_size_scaling
+        )
+        assert np.any(
+            far
+        ), f"All the reset locations are close to the goal position, {self.goal}"
+
+        if self.single_draw_reset:
+            # Draw uniformly among the reset locations that are not close to the goal position
+            far_indices = np.flatnonzero(far)
+            reset_index = far_indices[
+                self.np_random.integers(low=0, high=len(far_indices))
+            ]
+        else:
+            # While reset position is close to goal position
+            reset_index = self.np_random.integers(low=0, high=len(reset_locations))
+            while not far[reset_index]:
+                reset_index = self.np_random.integers(low=0, high=len(reset_locations))
 
-        return reset_pos
+        return reset_locations[reset_index].copy()
 
     def reset(
         self,
@@ -376,7 +932,11 @@ class MazeEnv(GoalEnv):
         self, achieved_goal: np.ndarray, desired_goal: np.ndarray, info
     ) -> float:
         distance = np.linalg.norm(achieved_goal - desired_goal, axis=-1)
-        if self.reward_type == "dense":
+        if self.reward_type == "geodesic":
+            # Positions pushed into a wall or out of the maze keep the Euclidean distance
+            geodesic = self.maze.geodesic_distance(achieved_goal, desired_goal)
+            return np.exp(-np.where(np.isinf(geodesic), distance, geodesic))
+        elif self.reward_type == "dense":
             return np.exp(-distance)
         elif self.reward_type == "sparse":
             return (distance <= 0.45).astype(np.float64)
@@ -386,11 +946,16 @@ class MazeEnv(GoalEnv):
     ) -> bool:
         if not self.continuing_task:
             # If task is episodic terminate the episode when the goal is reached
-            return bool(np.linalg.norm(achieved_goal - desired_goal) <= 0.45)
+            return self._is_success(achieved_goal, desired_goal)
         else:
             # Continuing tasks don't terminate, episode will be truncated when time limit is reached (`max_episode_steps`)
             return False
 
+    def _is_success(self, achieved_goal: np.ndarray, desired_goal: np.ndarray):
+        """Whether the achieved goals are within the goal radius 0.45 of the desired goals, also for batches of goals."""
+        success = np.linalg.norm(achieved_goal - desired_goal, axis=-1) <= 0.45
+        return bool(success) if success.ndim == 0 else success
+
     def update_goal(self, achieved_goal: np.ndarray) -> None:
         """Update goal position if continuing task and within goal radius."""
 
@@ -22,10 +22,18 @@ from gymnasium.utils.ezpickle import EzPickle
 from gymnasium_robotics.envs.maze.maps import U_MAZE
 from gymnasium_robotics.envs.maze.maze_v4 import MazeEnv
 from gymnasium_robotics.envs.maze.point import PointEnv
-from gymnasium_robotics.utils.mujoco_utils import MujocoModelNames
+from gymnasium_robotics.utils.mujoco_utils import (
+    CompiledModelMixin,
+    MujocoModelNames,
+    SimStateMixin,
+)
 
 
-class PointMazeEnv(MazeEnv, EzPickle):
+class MazePointEnv(CompiledModelMixin, PointEnv):
+    """Point environment simulating the compiled model of the maze passed as ``model``."""
+
+
+class PointMazeEnv(MazeEnv, SimStateMixin, EzPickle):
     """
     ### Description
 
@@ -247,7 +255,7 @@ class PointMazeEnv(MazeEnv, EzPickle):
 
     ### Rewards
 
-    The reward can be initialized as `sparse` or `dense`:
+    The reward can be initialized as `sparse`, `dense` or `geodesic`:
     - *sparse*: the returned reward can have two values: `0` if the ball hasn't reached its final target position, and `1` if the ball is in the final target position (the ball is considered to have reached the goal if the Euclidean distance between both is lower than 0.5 m).
     - *dense*: the returned reward is the exponential negative Euclidean distance between the achieved goal position and the desired goal.
 
@@ -263,6 +271,11 @@ class PointMazeEnv(MazeEnv, EzPickle):
     env = gym.make('PointMaze_UMazeDense-v3')
     ```
 
+    The `dense` reward can also be computed with the length of the shortest path through the maze instead of the Euclidean distance, which does not reward the ball for getting closer to the goal through a wall:
+    - *geodesic*: the returned reward is the exponential negative length of the shortest path between the achieved goal position and the desired goal, moving between adjacent non-wall cells (see `Maze.geodesic_distance`).
+
+    This reward is selected with the `reward_type` argument, e.g. `gym.make('PointMaze_MediumDense-v3', reward_type="geodesic")`.
+
     ### Starting State
 
     The goal and initial placement of the ball in the maze follows the same structure for all environments. A discrete cell `(i,j)` is selected for the goal and agent's initial position as previously menitoned in the **Maze** section.
@@ -286,6 +299,8 @@ class PointMazeEnv(MazeEnv, EzPickle):
     * `maze_map` - Optional argument to initialize the environment with a custom maze map.
     * `continuing_task` - If set to `True` the episode won't be terminated when reaching the goal, instead a new goal location will be generated. If `False` the environment is terminated when the ball reaches the final goal.
     * `reset_target` - If set to `True` and the argument `continuing_task` is also `True`, when the ant reaches the target goal the location of the goal will be kept the same and no new goal location will be generated. If `False` a new goal will be generated when reached.
+    * `merge_walls` - If set to `True` the contiguous wall cells of the maze are merged into the minimum number of boxes, which reduces the number of geoms and speeds up the collision detection of large mazes. The outer boundary of the walls is the same, but the contacts near the seams between former wall cells can differ, e.g. an agent sliding along a wall no longer hits the edges of the cell boxes. Default to `False`, one box per wall cell.
+    * `single_draw_reset` - If set to `True` the reset position of the agent is drawn with a single draw among the reset locations that are not close to the goal, instead of drawing among all the reset locations until one is not close to the goal. Both follow the same distribution, but the seeded reset positions differ. Default to `False`, the reset positions of the previous versions.
 
     Note that, the maximum number of timesteps before the episode is `truncated` can be increased or decreased by specifying the `max_episode_steps` argument at initialization. For example,
     to increase the total number of timesteps to 100 make the environment as follows:
@@ -320,6 +335,8 @@ class PointMazeEnv(MazeEnv, EzPickle):
         reward_type: str = "sparse",
         continuing_task: bool = True,
         reset_target: bool = False,
+        merge_walls: bool = False,
+        single_draw_reset: bool = False,
         **kwargs,
     ):
         point_xml_file_path = path.join(
@@ -333,14 +350,17 @@ class PointMazeEnv(MazeEnv, EzPickle):
             reward_type=reward_type,
             continuing_task=continuing_task,
             reset_target=reset_target,
+            merge_walls=merge_walls,
+            single_draw_reset=single_draw_reset,
             **kwargs,
         )
 
         maze_length = len(maze_map)
         default_camera_config = {"distance": 12.5 if maze_length > 8 else 8.8}
 
-        self.point_env = PointEnv(
-            xml_file=self.tmp_xml_file_path,
+        self.point_env = MazePointEnv(
+            model=self.maze_model,
+            xml_file=self.agent_xml_path,
             render_mode=render_mode,
             default_camera_config=default_camera_config,
             **kwargs,
@@ -369,6 +389,8 @@ class PointMazeEnv(MazeEnv, EzPickle):
             reward_type,
             continuing_task,
             reset_target,
+            merge_walls=merge_walls,
+            single_draw_reset=single_draw_reset,
             **kwargs,
         )
 
@@ -383,9 +405,7 @@ class PointMazeEnv(MazeEnv, EzPickle):
 
         obs, info = self.point_env.reset(seed=seed)
         obs_dict = self._get_obs(obs)
-        info["success"] = bool(
-            np.linalg.norm(obs_dict["achieved_goal"] - self.goal) <= 0.45
-        )
+        info["success"] = self._is_success(obs_dict["achieved_goal"], self.goal)
 
         return obs_dict, info
 
@@ -396,9 +416,7 @@ class PointMazeEnv(MazeEnv, EzPickle):
         reward = self.compute_reward(obs_dict["achieved_goal"], self.goal, info)
         terminated = self.compute_terminated(obs_dict["achieved_goal"], self.goal, info)
         truncated = self.compute_truncated(obs_dict["achieved_goal"], self.goal, info)
-        info["success"] = bool(
-            np.linalg.norm(obs_dict["achieved_goal"] - self.goal) <= 0.45
-        )
+        info["success"] = self._is_success(obs_dict["achieved_goal"], self.goal)
 
         # Update the goal position if necessary
         self.update_goal(obs_dict["achieved_goal"])
@@ -6,6 +6,8 @@ import numpy as np
 from gymnasium import error, logger, spaces
 
 from gymnasium_robotics.core import GoalEnv
+from gymnasium_robotics.utils.goal_sampler import GoalComponents, GoalSampler
+from gymnasium_robotics.utils.step_profiler import StepProfiler
 
 try:
     import mujoco_py
@@ -28,6 +30,10 @@ else:
 DEFAULT_SIZE = 480
 
 
+def _no_lap():
+    """Stand-in for :meth:`StepProfiler.lap` when the steps are not profiled."""
+
+
 class BaseRobotEnv(GoalEnv):
     """Superclass for all MuJoCo fetch and hand robotic environments."""
 
@@ -48,6 +54,8 @@ class BaseRobotEnv(GoalEnv):
         render_mode: Optional[str] = None,
         width: int = DEFAULT_SIZE,
         height: int = DEFAULT_SIZE,
+        reuse_obs_buffers: bool = False,
+        goal_block_size: int = 0,
     ):
         """Initialize the hand and fetch robot superclass.
 
@@ -59,7 +67,19 @@ class BaseRobotEnv(GoalEnv):
             render_mode (optional string): type of rendering mode, "human" for window rendeirng and "rgb_array" for offscreen. Defaults to None.
             width (optional integer): width of each rendered frame. Defaults to DEFAULT_SIZE.
             height (optional integer): height of each rendered frame . Defaults to DEFAULT_SIZE.
+            reuse_obs_buffers (boolean): if ``True`` the observations are written into arrays preallocated once by the environment instead of new arrays. The arrays are overwritten by the following call to :meth:`step` or :meth:`reset`, copy them to keep an observation. Defaults to False.
+            goal_block_size (integer): if positive, the goals are drawn from `np_random` in blocks of ``goal_block_size`` goals by a :class:`GoalSampler` and served one by one on reset, instead of being drawn on every reset. The goals follow the same distribution but not the same sequence as with the default per-reset sampling. Defaults to 0.
         """
+        if goal_block_size > 0 and not self._supports_goal_blocks():
+            raise error.Error(
+                f"{type(self).__name__} does not support sampling the goals in blocks."
+            )
+        self.goal_sampler = (
+            GoalSampler(self._draw_goal_components, goal_block_size)
+            if goal_block_size > 0
+            else None
+        )
+
         if model_path.startswith("/"):
             self.fullpath = model_path
         else:
@@ -78,6 +98,8 @@ class BaseRobotEnv(GoalEnv):
         self._initialize_simulation()
 
         self.goal = np.zeros(0)
+        self.reuse_obs_buffers = reuse_obs_buffers
+        self._obs_buffers = None
         obs = self._get_obs()
 
         assert (
@@ -99,7 +121,10 @@ class BaseRobotEnv(GoalEnv):
             )
         )
 
+        self._allocate_obs_buffers()
+
         self.render_mode = render_mode
+        self.step_profiler: Optional[StepProfiler] = None
 
     # Env methods
     # ----------------------------
@@ -129,28 +154,121 @@ class BaseRobotEnv(GoalEnv):
         if np.array(action).shape != self.action_space.shape:
             raise ValueError("Action dimension mismatch")
 
+        return self._step_phases(action, self.step_profiler)
+
+    def step_many(self, actions):
+        """Run one control step for each action of ``actions`` and stop after the first terminated or truncated step.
+
+        Every step runs the same phases as :meth:`step` and is recorded by the :attr:`step_profiler` if it is enabled.
+        The observations are copied into the stacked arrays and no info dictionary is returned per step. The wrappers
+        of the environment (e.g. ``TimeLimit``) are not applied to the individual steps.
+
+        Args:
+            actions (np.ndarray): actions of shape ``(K, n_actions)``, ``K`` can be 0.
+
+        Returns:
+            observations (dictionary): the observations of the ``k <= K`` executed steps, stacked along a first axis of size ``k``.
+            rewards (np.ndarray): rewards of shape ``(k,)``.
+            terminated (np.ndarray): boolean termination flags of shape ``(k,)``, only the last one can be ``True``.
+            truncated (np.ndarray): boolean truncation flags of shape ``(k,)``, only the last one can be ``True``.
+            info (dictionary): the boolean ``"is_success"`` flags of shape ``(k,)``.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim != 2 or actions.shape[1:] != self.action_space.shape:
+            raise ValueError("Action dimension mismatch")
+
+        num_steps = len(actions)
+        observations = {
+            key: np.zeros((num_steps,) + space.shape, dtype=space.dtype)
+            for key, space in self.observation_space.spaces.items()
+        }
+        rewards = np.zeros(num_steps, dtype=np.float64)
+        terminated = np.zeros(num_steps, dtype=np.bool_)
+        truncated = np.zeros(num_steps, dtype=np.bool_)
+        is_success = np.zeros(num_steps, dtype=np.bool_)
+
+        for i, action in enumerate(actions):
+            obs, rewards[i], terminated[i], truncated[i], info = self._step_phases(
+                action, self.step_profiler
+            )
+            for key, value in obs.items():
+                observations[key][i] = value
+            is_success[i] = info["is_success"]
+            if terminated[i] or truncated[i]:
+                num_steps = i + 1
+                break
+
+        return (
+            {key: value[:num_steps] for key, value in observations.items()},
+            rewards[:num_steps],
+            terminated[:num_steps],
+            truncated[:num_steps],
+            {"is_success": is_success[:num_steps]},
+        )
+
+    def _step_phases(self, action, profiler: Optional[StepProfiler] = None):
+        """Run the phases of :meth:`step` in the order of :data:`STEP_PHASES` for an action of the right shape.
+
+        Args:
+            action (np.ndarray): the action, clipped to the :attr:`action_space` in the first phase.
+            profiler (optional StepProfiler): if given, it times every phase and records the step. The ``"human"``
+                rendering is not part of any phase.
+        """
+        lap = _no_lap if profiler is None else profiler.lap
+        if profiler is not None:
+            profiler.begin()
+
         action = np.clip(action, self.action_space.low, self.action_space.high)
+        lap()
         self._set_action(action)
+        lap()
 
         self._mujoco_step(action)
+        lap()
 
         self._step_callback()
+        lap()
 
         if self.render_mode == "human":
             self.render()
+            if profiler is not None:
+                profiler.resume()
         obs = self._get_obs()
+        lap()
 
         info = {
             "is_success": self._is_success(obs["achieved_goal"], self.goal),
         }
+        lap()
 
         terminated = self.compute_terminated(obs["achieved_goal"], self.goal, info)
+        lap()
         truncated = self.compute_truncated(obs["achieved_goal"], self.goal, info)
+        lap()
 
         reward = self.compute_reward(obs["achieved_goal"], self.goal, info)
+        lap()
 
+        if profiler is not None:
+            profiler.record(self._profiler_data)
         return obs, reward, terminated, truncated, info
 
+    def enable_step_profiling(self, capacity: int = 1024) -> StepProfiler:
+        """Record the duration of every phase of :meth:`step` and the simulation counters of the last ``capacity`` steps.
+
+        Args:
+            capacity (integer): number of steps kept in the ring buffer of the profiler. Defaults to 1024.
+
+        Returns:
+            The :class:`StepProfiler` of the environment, also available as :attr:`step_profiler`.
+        """
+        self.step_profiler = StepProfiler(capacity)
+        return self.step_profiler
+
+    def disable_step_profiling(self):
+        """Stop recording the steps and remove the profiler."""
+        self.step_profiler = None
+
     def reset(
         self,
         *,
@@ -175,10 +293,13 @@ class BaseRobotEnv(GoalEnv):
                 the ``info`` returned by :meth:`step`.
         """
         super().reset(seed=seed)
+        if seed is not None and self.goal_sampler is not None:
+            # The goals left in the block were drawn before `np_random` was seeded again
+            self.goal_sampler.clear()
         did_reset_sim = False
         while not did_reset_sim:
             did_reset_sim = self._reset_sim()
-        self.goal = self._sample_goal().copy()
+        self.goal = self._next_goal()
         obs = self._get_obs()
         if self.render_mode == "human":
             self.render()
@@ -187,6 +308,11 @@ class BaseRobotEnv(GoalEnv):
 
     # Extension methods
     # ----------------------------
+    @property
+    def _profiler_data(self):
+        """The simulation data of the bindings whose counters are recorded by the :attr:`step_profiler`."""
+        raise NotImplementedError
+
     def _mujoco_step(self, action):
         """Advance the mujoco simulation.
 
@@ -211,6 +337,33 @@ class BaseRobotEnv(GoalEnv):
         """Returns the observation."""
         raise NotImplementedError()
 
+    def _allocate_obs_buffers(self):
+        """Lay out the arrays of ``reuse_obs_buffers`` from the :attr:`observation_space`."""
+        self._obs_buffers = None
+        if self.reuse_obs_buffers:
+            self._obs_buffers = {
+                key: np.zeros(space.shape, dtype=space.dtype)
+                for key, space in self.observation_space.spaces.items()
+            }
+
+    def _make_obs(self, observation_parts, achieved_goal):
+        """Build the observation dictionary from the parts of the observation vector and the achieved goal.
+
+        With ``reuse_obs_buffers`` the observation is written into the arrays preallocated at initialization,
+        otherwise new arrays are returned.
+        """
+        if self._obs_buffers is None:
+            return {
+                "observation": np.concatenate(observation_parts),
+                "achieved_goal": np.array(achieved_goal).ravel(),
+                "desired_goal": self.goal.ravel().copy(),
+            }
+
+        np.concatenate(observation_parts, out=self._obs_buffers["observation"])
+        self._obs_buffers["achieved_goal"][:] = np.ravel(achieved_goal)
+        self._obs_buffers["desired_goal"][:] = self.goal.ravel()
+        return dict(self._obs_buffers)
+
     def _set_action(self, action):
         """Applies the given action to the simulation."""
         raise NotImplementedError()
@@ -223,6 +376,47 @@ class BaseRobotEnv(GoalEnv):
         """Samples a new goal and returns it."""
         raise NotImplementedError()
 
+    def _next_goal(self):
+        """Samples the goal of a reset, from the block of the :attr:`goal_sampler` if it is enabled."""
+        if self.goal_sampler is None:
+            return self._sample_goal().copy()
+        components = self.goal_sampler.next(self.np_random)
+        return self._goals_from_components(components)[0]
+
+    def sample_goals(
+        self, n: int, np_random: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Sample a batch of goals for the current state of the simulation, e.g. for curriculum or evaluation tooling.
+
+        The goals follow the distribution of the goals sampled on reset. Goals that depend on the simulation (e.g. on
+        the initial position of the object) are sampled relative to its current state.
+
+        Args:
+            n (integer): number of goals.
+            np_random (optional np.random.Generator): random number generator used to draw the goals. Defaults to the `np_random` of the environment.
+
+        Returns:
+            Array of shape ``(n,) + goal.shape`` with the goals.
+        """
+        if np_random is None:
+            np_random = self.np_random
+        return self._goals_from_components(self._draw_goal_components(np_random, n))
+
+    def _supports_goal_blocks(self) -> bool:
+        return (
+            type(self)._draw_goal_components is not BaseRobotEnv._draw_goal_components
+        )
+
+    def _draw_goal_components(
+        self, np_random: np.random.Generator, n: int
+    ) -> GoalComponents:
+        """Draws the parts of ``n`` goals that do not depend on the state of the simulation after a reset, see :class:`GoalSampler`."""
+        raise NotImplementedError()
+
+    def _goals_from_components(self, components: GoalComponents) -> np.ndarray:
+        """Builds the goals of the ``components`` drawn by :meth:`_draw_goal_components` for the current state of the simulation."""
+        raise NotImplementedError()
+
     def _env_setup(self, initial_qpos):
         """Initial configuration of the environment.
 
@@ -290,9 +484,12 @@ class MujocoRobotEnv(BaseRobotEnv):
         )
 
     def _initialize_simulation(self):
-        self.model = self._mujoco.MjModel.from_xml_path(self.fullpath)
+        self.model = self._utils.load_model_from_path(self.fullpath)
         self.data = self._mujoco.MjData(self.model)
         self._model_names = self._utils.MujocoModelNames(self.model)
+        _, self._mocap_weld_body_ids = self._utils.get_mocap_welds(self.model)
+        # Poses the next mocap action is applied to, set by `set_sim_state` until the next MuJoCo step
+        self._mocap_body_poses = None
 
         self.model.vis.global_.offwidth = self.width
         self.model.vis.global_.offheight = self.height
@@ -305,6 +502,7 @@ class MujocoRobotEnv(BaseRobotEnv):
     def _reset_sim(self):
         # Reset buffers for joint states, warm-start, control buffers etc.
         mujoco.mj_resetData(self.model, self.data)
+        self._mocap_body_poses = None
 
         self.data.time = self.initial_time
         self.data.qpos[:] = np.copy(self.initial_qpos)
@@ -337,8 +535,73 @@ class MujocoRobotEnv(BaseRobotEnv):
         """Return the timestep of each Gymanisum step."""
         return self.model.opt.timestep * self.n_substeps
 
+    def get_sim_state(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return a flat copy of the full physics state of the simulation, including mocap, act and warmstart.
+
+        The mocap actions are applied relative to the poses of the bodies welded to the mocaps computed in the last
+        substep (see :func:`mujoco_utils.reset_mocap2body_xpos`), which differ from the poses recomputed from the
+        physics state. These reference poses are appended to the physics state, so that the rollouts after
+        :meth:`set_sim_state` are identical to the original ones. The goal is not part of the simulation state and
+        must be saved separately from :attr:`goal`.
+
+        Args:
+            out (optional np.ndarray): preallocated array of size :attr:`sim_state_size` to write the state into.
+
+        Raises:
+            ValueError: if ``out`` does not have :attr:`sim_state_size` elements.
+        """
+        if out is None:
+            out = np.empty(self.sim_state_size, dtype=np.float64)
+        elif out.size != self.sim_state_size:
+            raise ValueError(
+                f"`out` has {out.size} elements, expected `sim_state_size` = {self.sim_state_size}."
+            )
+        n_physics = self._utils.get_sim_state_size(self.model)
+        self._utils.get_sim_state(self.model, self.data, out=out[:n_physics])
+        body_poses = out[n_physics:].reshape(len(self._mocap_weld_body_ids), 7)
+        if self._mocap_body_poses is not None:
+            body_poses[:] = self._mocap_body_poses
+        else:
+            body_poses[:, :3] = self.data.xpos[self._mocap_weld_body_ids]
+            body_poses[:, 3:] = self.data.xquat[self._mocap_weld_body_ids]
+        return out
+
+    def set_sim_state(self, state: np.ndarray):
+        """Restore a simulation state returned by :meth:`get_sim_state`.
+
+        The derived quantities of the simulation (e.g. the body and site poses) are recomputed from the physics state,
+        the mocap reference poses are kept apart for the next action.
+
+        Raises:
+            ValueError: if ``state`` does not have :attr:`sim_state_size` elements.
+        """
+        if len(state) != self.sim_state_size:
+            raise ValueError(
+                f"`state` has {len(state)} elements, expected `sim_state_size` = {self.sim_state_size}."
+            )
+        n_physics = self._utils.get_sim_state_size(self.model)
+        self._utils.set_sim_state(self.model, self.data, state[:n_physics])
+        self._mocap_body_poses = None
+        if len(self._mocap_weld_body_ids) > 0:
+            self._mocap_body_poses = np.reshape(
+                np.array(state[n_physics:], dtype=np.float64),
+                (len(self._mocap_weld_body_ids), 7),
+            )
+
+    @property
+    def sim_state_size(self) -> int:
+        """Number of elements of the array returned by :meth:`get_sim_state`."""
+        return self._utils.get_sim_state_size(self.model) + 7 * len(
+            self._mocap_weld_body_ids
+        )
+
+    @property
+    def _profiler_data(self):
+        return self.data
+
     def _mujoco_step(self, action):
         self._mujoco.mj_step(self.model, self.data, nstep=self.n_substeps)
+        self._mocap_body_poses = None
 
 
 class MujocoPyRobotEnv(BaseRobotEnv):
@@ -388,6 +651,28 @@ class MujocoPyRobotEnv(BaseRobotEnv):
         self.sim.forward()
         return super()._reset_sim()
 
+    def get_sim_state(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the flattened ``MjSimState`` (time, qpos, qvel, act and udd_state) of the simulation.
+
+        Args:
+            out (optional np.ndarray): preallocated array of size :attr:`sim_state_size` to write the state into.
+        """
+        state = self.sim.get_state().flatten()
+        if out is None:
+            return state
+        out[:] = state
+        return out
+
+    def set_sim_state(self, state: np.ndarray):
+        """Restore a simulation state returned by :meth:`get_sim_state`."""
+        self.sim.set_state_from_flattened(np.asarray(state, dtype=np.float64))
+        self.sim.forward()
+
+    @property
+    def sim_state_size(self) -> int:
+        """Number of elements of the array returned by :meth:`get_sim_state`."""
+        return self.sim.get_state().flatten().size
+
     def render(self):
         """Render a frame of the MuJoCo simulation.
 
@@ -440,6 +725,10 @@ class MujocoPyRobotEnv(BaseRobotEnv):
         """Return the timestep of each Gymanisum step."""
         return self.sim.model.opt.timestep * self.sim.nsubsteps
 
+    @property
+    def _profiler_data(self):
+        return self.sim.data
+
     def _mujoco_step(self, action):
         self.sim.step()
 
@@ -1,10 +1,12 @@
-from typing import Union
+import os
+from typing import Optional, Union
 
 import numpy as np
 from gymnasium import error
 
 from gymnasium_robotics.envs.shadow_dexterous_hand import MujocoHandEnv, MujocoPyHandEnv
 from gymnasium_robotics.utils import rotations
+from gymnasium_robotics.utils.reset_state_pool import ResetStatePool
 
 
 def quat_from_angle_and_axis(angle, axis):
@@ -63,9 +65,7 @@ def get_base_manipulate_env(HandEnvClass: Union[MujocoHandEnv, MujocoPyHandEnv])
             self.target_position = target_position
             self.target_rotation = target_rotation
             self.target_position_range = target_position_range
-            self.parallel_quats = [
-                rotations.euler2quat(r) for r in rotations.get_parallel_rotations()
-            ]
+            self.parallel_quats = rotations.get_parallel_quats()
             self.randomize_initial_rotation = randomize_initial_rotation
             self.randomize_initial_position = randomize_initial_position
             self.distance_threshold = distance_threshold
@@ -97,20 +97,13 @@ def get_base_manipulate_env(HandEnvClass: Union[MujocoHandEnv, MujocoPyHandEnv])
             if self.target_rotation != "ignore":
                 quat_a, quat_b = goal_a[..., 3:], goal_b[..., 3:]
 
-                if self.ignore_z_target_rotation:
-                    # Special case: We want to ignore the Z component of the rotation.
-                    # This code here assumes Euler angles with xyz convention. We first transform
-                    # to euler, then set the Z component to be equal between the two, and finally
-                    # transform back into quaternions.
-                    euler_a = rotations.quat2euler(quat_a)
-                    euler_b = rotations.quat2euler(quat_b)
-                    euler_a[2] = euler_b[2]
-                    quat_a = rotations.euler2quat(euler_a)
-
                 # Subtract quaternions and extract angle between them.
-                quat_diff = rotations.quat_mul(quat_a, rotations.quat_conjugate(quat_b))
-                angle_diff = 2 * np.arccos(np.clip(quat_diff[..., 0], -1.0, 1.0))
-                d_rot = angle_diff
+                # With ignore_z_target_rotation, the Z component of the rotation is ignored:
+                # this assumes Euler angles with xyz convention, the Z Euler angle of quat_a
+                # is set to the one of quat_b before the subtraction.
+                d_rot = rotations.quat_diff_angle(
+                    quat_a, quat_b, ignore_z=self.ignore_z_target_rotation
+                )
             assert d_pos.shape == d_rot.shape
             return d_pos, d_rot
 
@@ -141,17 +134,85 @@ def get_base_manipulate_env(HandEnvClass: Union[MujocoHandEnv, MujocoPyHandEnv])
 
 
 class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
+    def __init__(
+        self,
+        reset_state_pool_size: int = 0,
+        reset_state_pool_refill: str = "lazy",
+        reset_state_pool_path: Optional[str] = None,
+        **kwargs,
+    ):
+        """Initializes a new Hand manipulation environment with the new mujoco bindings.
+
+        Resetting the object requires to randomize its pose and to run the simulation until it settles on the palm,
+        which costs ~200 physics steps. With ``reset_state_pool_size > 0`` the settled initial states are cached in a
+        :class:`ResetStatePool` and restored on reset instead.
+
+        Args:
+            reset_state_pool_size (int): maximum number of cached initial states per seed stream, 0 to disable the cache
+            reset_state_pool_refill (string): refill policy of the cache, "eager", "lazy" or "never" (see :class:`ResetStatePool`). "eager" generates a whole pool on the first reset with every new seed, use "lazy" when resetting with a new seed every episode
+            reset_state_pool_path (string): optional `.npz` file with states saved by `ResetStatePool.save` to load into the cache, a `FileNotFoundError` is raised if it does not exist
+            **kwargs: arguments of the Hand manipulation environment
+        """
+        self.reset_state_pool = None
+        if reset_state_pool_size > 0:
+            self.reset_state_pool = ResetStatePool(
+                reset_state_pool_size, refill=reset_state_pool_refill
+            )
+            if reset_state_pool_path is not None:
+                if not os.path.exists(reset_state_pool_path):
+                    raise FileNotFoundError(
+                        f"The reset state pool file {reset_state_pool_path} does not exist."
+                    )
+                self.reset_state_pool.load(reset_state_pool_path)
+
+        super().__init__(**kwargs)
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        if self.reset_state_pool is not None and seed is not None:
+            self.reset_state_pool.select_stream(seed)
+        return super().reset(seed=seed, options=options)
+
     def _get_achieved_goal(self):
-        object_qpos = self._utils.get_joint_qpos(self.model, self.data, "object:joint")
+        object_qpos = self._object_joint.qpos(self.data)
         assert object_qpos.shape == (7,)
         return object_qpos
 
     def _env_setup(self, initial_qpos):
+        # Resolve the names of the joints used at every step once.
+        self._object_joint = self._utils.JointAccessor(
+            self.model, self._model_names, "object:joint"
+        )
+        self._target_joint = self._utils.JointAccessor(
+            self.model, self._model_names, "target:joint"
+        )
+        self._robot_joints = self._utils.RobotJointAccessor(
+            self.model, self._model_names
+        )
         for name, value in initial_qpos.items():
             self.data.set_joint_qpos(name, value)
         self._mujoco.mj_forward(self.model, self.data)
 
     def _reset_sim(self):
+        if self.reset_state_pool is not None:
+            state = self.reset_state_pool.sample(
+                self.np_random, self._generate_initial_state
+            )
+            if state is not None:
+                self.set_sim_state(state)
+                return True
+        return self._randomize_initial_state()
+
+    def _generate_initial_state(self, np_random):
+        """Randomize and settle the initial state with `np_random`, returns the state or None if it is not valid."""
+        env_np_random = self._np_random
+        self._np_random = np_random
+        try:
+            is_valid = self._randomize_initial_state()
+        finally:
+            self._np_random = env_np_random
+        return self.get_sim_state() if is_valid else None
+
+    def _randomize_initial_state(self):
         self.data.time = self.initial_time
         self.data.qpos[:] = np.copy(self.initial_qpos)
         self.data.qvel[:] = np.copy(self.initial_qvel)
@@ -159,9 +220,7 @@ class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
             self.data.act[:] = None
 
         self._mujoco.mj_forward(self.model, self.data)
-        initial_qpos = self._utils.get_joint_qpos(
-            self.model, self.data, "object:joint"
-        ).copy()
+        initial_qpos = self._object_joint.qpos(self.data)
         initial_pos, initial_quat = initial_qpos[:3], initial_qpos[3:]
         assert initial_qpos.shape == (7,)
         assert initial_pos.shape == (3,)
@@ -204,7 +263,7 @@ class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
         initial_quat /= np.linalg.norm(initial_quat)
         initial_qpos = np.concatenate([initial_pos, initial_quat])
 
-        self._utils.set_joint_qpos(self.model, self.data, "object:joint", initial_qpos)
+        self._object_joint.set_qpos(self.data, initial_qpos)
 
         def is_on_palm():
             self._mujoco.mj_forward(self.model, self.data)
@@ -232,14 +291,9 @@ class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
                 self.target_position_range[:, 0], self.target_position_range[:, 1]
             )
             assert offset.shape == (3,)
-            target_pos = (
-                self._utils.get_joint_qpos(self.model, self.data, "object:joint")[:3]
-                + offset
-            )
+            target_pos = self._object_joint.qpos(self.data)[:3] + offset
         elif self.target_position in ["ignore", "fixed"]:
-            target_pos = self._utils.get_joint_qpos(
-                self.model, self.data, "object:joint"
-            )[:3]
+            target_pos = self._object_joint.qpos(self.data)[:3]
         else:
             raise error.Error(
                 f'Unknown target_position option "{self.target_position}".'
@@ -257,6 +311,8 @@ class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
             angle = self.np_random.uniform(-np.pi, np.pi)
             axis = np.array([0.0, 0.0, 1.0])
             target_quat = quat_from_angle_and_axis(angle, axis)
+            # One index is drawn after the angle of each goal, the batched draws of `_draw_goal_components`
+            # would change the goals of the seeded environments.
             parallel_quat = self.parallel_quats[
                 self.np_random.integers(len(self.parallel_quats))
             ]
@@ -278,6 +334,56 @@ class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
         goal = np.concatenate([target_pos, target_quat])
         return goal
 
+    def _draw_goal_components(self, np_random, n):
+        # The position offsets and the rotations are drawn in the block, the position and the rotation of the
+        # object are only known after the reset of the simulation.
+        if self.target_position == "random":
+            offset = np_random.uniform(
+                self.target_position_range[:, 0],
+                self.target_position_range[:, 1],
+                size=(n, 3),
+            )
+        elif self.target_position in ["ignore", "fixed"]:
+            offset = np.zeros((n, 3))
+        else:
+            raise error.Error(
+                f'Unknown target_position option "{self.target_position}".'
+            )
+        components = {"offset": offset}
+
+        if self.target_rotation in ["ignore", "fixed"]:
+            return components
+        if self.target_rotation not in ["z", "parallel", "xyz"]:
+            raise error.Error(
+                f'Unknown target_rotation option "{self.target_rotation}".'
+            )
+        half_angle = np_random.uniform(-np.pi, np.pi, size=(n, 1)) / 2.0
+        if self.target_rotation == "xyz":
+            axis = np_random.uniform(-1.0, 1.0, size=(n, 3))
+            axis /= np.linalg.norm(axis, axis=-1, keepdims=True)
+        else:
+            axis = np.array([0.0, 0.0, 1.0])
+        quat = np.concatenate([np.cos(half_angle), np.sin(half_angle) * axis], axis=-1)
+        if self.target_rotation == "parallel":
+            parallel_quats = self.parallel_quats[
+                np_random.integers(len(self.parallel_quats), size=n)
+            ]
+            rotations.quat_mul(quat, parallel_quats, out=quat)
+        quat /= np.linalg.norm(quat, axis=-1, keepdims=True)
+        components["quat"] = quat
+        return components
+
+    def _goals_from_components(self, components):
+        object_qpos = self._object_joint.qpos(self.data)
+        offset = components["offset"]
+        goals = np.empty((len(offset), 7))
+        np.add(object_qpos[:3], offset, out=goals[:, :3])
+        if "quat" in components:
+            goals[:, 3:] = components["quat"]
+        else:
+            goals[:, 3:] = object_qpos[3:] / np.linalg.norm(object_qpos[3:])
+        return goals
+
     def _render_callback(self):
         # Assign current state to target object but offset a bit so that the actual object
         # is not obscured.
@@ -287,8 +393,8 @@ class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
             # Move the object to the side since we do not care about it's position.
             goal[0] += 0.15
 
-        self._utils.set_joint_qpos(self.model, self.data, "target:joint", goal)
-        self._utils.set_joint_qvel(self.model, self.data, "target:joint", np.zeros(6))
+        self._target_joint.set_qpos(self.data, goal)
+        self._target_joint.set_qvel(self.data, 0.0)
 
         if "object_hidden" in self._model_names.geom_names:
             hidden_id = self._model_names.geom_name2id["object_hidden"]
@@ -296,22 +402,15 @@ class MujocoManipulateEnv(get_base_manipulate_env(MujocoHandEnv)):
         self._mujoco.mj_forward(self.model, self.data)
 
     def _get_obs(self):
-        robot_qpos, robot_qvel = self._utils.robot_get_obs(
-            self.model, self.data, self._model_names.joint_names
-        )
-        object_qvel = self._utils.get_joint_qvel(self.model, self.data, "object:joint")
+        robot_qpos, robot_qvel = self._robot_joints.get_obs(self.data)
+        object_qvel = self._object_joint.qvel(self.data)
         achieved_goal = (
             self._get_achieved_goal().ravel()
         )  # this contains the object position + rotation
 
-        observation = np.concatenate(
-            [robot_qpos, robot_qvel, object_qvel, achieved_goal]
+        return self._make_obs(
+            [robot_qpos, robot_qvel, object_qvel, achieved_goal], achieved_goal
         )
-        return {
-            "observation": observation.copy(),
-            "achieved_goal": achieved_goal.copy(),
-            "desired_goal": self.goal.ravel().copy(),
-        }
 
 
 class MujocoPyManipulateEnv(get_base_manipulate_env(MujocoPyHandEnv)):
@@ -469,11 +568,6 @@ class MujocoPyManipulateEnv(get_base_manipulate_env(MujocoPyHandEnv)):
         achieved_goal = (
             self._get_achieved_goal().ravel()
         )  # this contains the object position + rotation
-        observation = np.concatenate(
-            [robot_qpos, robot_qvel, object_qvel, achieved_goal]
+        return self._make_obs(
+            [robot_qpos, robot_qvel, object_qvel, achieved_goal], achieved_goal
         )
-        return {
-            "observation": observation.copy(),
-            "achieved_goal": achieved_goal.copy(),
-            "desired_goal": self.goal.ravel().copy(),
-        }
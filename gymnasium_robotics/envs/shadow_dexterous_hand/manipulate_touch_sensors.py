@@ -86,6 +86,8 @@ class MujocoManipulateTouchSensorsEnv(MujocoManipulateEnv):
         elif self.touch_visualisation == "always":
             pass
 
+        # The touch sensor readings extend the observation of the manipulation environment.
+        self._obs_buffers = None
         obs = self._get_obs()
         self.observation_space = spaces.Dict(
             dict(
@@ -100,6 +102,7 @@ class MujocoManipulateTouchSensorsEnv(MujocoManipulateEnv):
                 ),
             )
         )
+        self._allocate_obs_buffers()
 
     def _render_callback(self):
         super()._render_callback()
@@ -111,10 +114,8 @@ class MujocoManipulateTouchSensorsEnv(MujocoManipulateEnv):
                     self.model.site_rgba[site_id] = self.notouch_color
 
     def _get_obs(self):
-        robot_qpos, robot_qvel = self._utils.robot_get_obs(
-            self.model, self.data, self._model_names.joint_names
-        )
-        object_qvel = self._utils.get_joint_qvel(self.model, self.data, "object:joint")
+        robot_qpos, robot_qvel = self._robot_joints.get_obs(self.data)
+        object_qvel = self._object_joint.qvel(self.data)
 
         achieved_goal = (
             self._get_achieved_goal().ravel()
@@ -127,16 +128,11 @@ class MujocoManipulateTouchSensorsEnv(MujocoManipulateEnv):
             touch_values = self.data.sensordata[self._touch_sensor_id] > 0.0
         elif self.touch_get_obs == "log":
             touch_values = np.log(self.data.sensordata[self._touch_sensor_id] + 1.0)
-        observation = np.concatenate(
-            [robot_qpos, robot_qvel, object_qvel, achieved_goal, touch_values]
+        return self._make_obs(
+            [robot_qpos, robot_qvel, object_qvel, achieved_goal, touch_values],
+            achieved_goal,
         )
 
-        return {
-            "observation": observation.copy(),
-            "achieved_goal": achieved_goal.copy(),
-            "desired_goal": self.goal.ravel().copy(),
-        }
-
 
 class MujocoPyManipulateTouchSensorsEnv(MujocoPyManipulateEnv):
     def __init__(
@@ -217,6 +213,8 @@ class MujocoPyManipulateTouchSensorsEnv(MujocoPyManipulateEnv):
         elif self.touch_visualisation == "always":
             pass
 
+        # The touch sensor readings extend the observation of the manipulation environment.
+        self._obs_buffers = None
         obs = self._get_obs()
         self.observation_space = spaces.Dict(
             dict(
@@ -231,6 +229,7 @@ class MujocoPyManipulateTouchSensorsEnv(MujocoPyManipulateEnv):
                 ),
             )
         )
+        self._allocate_obs_buffers()
 
     def _render_callback(self):
         super()._render_callback()
@@ -257,18 +256,13 @@ class MujocoPyManipulateTouchSensorsEnv(MujocoPyManipulateEnv):
         elif self.touch_get_obs == "log":
             touch_values = np.log(self.sim.data.sensordata[self._touch_sensor_id] + 1.0)
 
-        observation = np.concatenate(
+        return self._make_obs(
             [
                 robot_qpos,
                 robot_qvel,
                 object_qvel,
                 achieved_goal,
                 touch_values,
-            ]
+            ],
+            achieved_goal,
         )
-
-        return {
-            "observation": observation.copy(),
-            "achieved_goal": achieved_goal.copy(),
-            "desired_goal": self.goal.ravel().copy(),
-        }
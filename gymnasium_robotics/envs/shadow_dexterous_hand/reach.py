@@ -125,6 +125,34 @@ def get_base_hand_reanch_env(HandEnvClass: Union[MujocoHandEnv, MujocoPyHandEnv]
 
             return goal.flatten()
 
+        def _draw_goal_components(self, np_random, n):
+            thumb_idx = FINGERTIP_SITE_NAMES.index("robot0:S_thtip")
+            finger_idx = np.delete(np.arange(len(FINGERTIP_SITE_NAMES)), thumb_idx)
+            finger_idx = finger_idx[np_random.integers(len(finger_idx), size=n)]
+
+            # Pick a meeting point above the hand.
+            meeting_pos = self.palm_xpos + np.array([0.0, -0.09, 0.05])
+            meeting_pos = meeting_pos + np_random.normal(scale=0.005, size=(n, 3))
+
+            # Slightly move meeting goal towards the respective finger to avoid that they
+            # overlap.
+            initial_goal = self.initial_goal.reshape(-1, 3)
+            goals = np.tile(initial_goal, (n, 1, 1))
+            rows = np.arange(n)
+            for idx in [np.full(n, thumb_idx), finger_idx]:
+                offset_direction = meeting_pos - initial_goal[idx]
+                offset_direction /= np.linalg.norm(
+                    offset_direction, axis=-1, keepdims=True
+                )
+                goals[rows, idx] = meeting_pos - 0.005 * offset_direction
+
+            # With some probability, ask all fingers to move back to the origin.
+            goals[np_random.uniform(size=n) < 0.1] = initial_goal
+            return {"goal": goals.reshape(n, -1)}
+
+        def _goals_from_components(self, components):
+            return components["goal"].copy()
+
         def _is_success(self, achieved_goal, desired_goal):
             d = goal_distance(achieved_goal, desired_goal)
             return (d < self.distance_threshold).astype(np.float32)
@@ -396,16 +424,26 @@ class MujocoHandReachEnv(get_base_hand_reanch_env(MujocoHandEnv)):
     """
 
     def _get_achieved_goal(self):
-        goal = [
-            self._utils.get_site_xpos(self.model, self.data, name)
-            for name in FINGERTIP_SITE_NAMES
-        ]
-        return np.array(goal).flatten()
+        return self._fingertip_sites.xpos(self.data).flatten()
 
     # RobotEnv methods
     # ----------------------------
 
     def _env_setup(self, initial_qpos):
+        # Resolve the names of the sites and joints used at every step once.
+        self._fingertip_sites = self._utils.SiteAccessor(
+            self.model, self._model_names, FINGERTIP_SITE_NAMES
+        )
+        self._target_sites = self._utils.SiteAccessor(
+            self.model, self._model_names, [f"target{i}" for i in range(5)]
+        )
+        self._finger_sites = self._utils.SiteAccessor(
+            self.model, self._model_names, [f"finger{i}" for i in range(5)]
+        )
+        self._robot_joints = self._utils.RobotJointAccessor(
+            self.model, self._model_names
+        )
+
         for name, value in initial_qpos.items():
             self._utils.set_joint_qpos(self.model, self.data, name, value)
         self._mujoco.mj_forward(self.model, self.data)
@@ -416,34 +454,20 @@ class MujocoHandReachEnv(get_base_hand_reanch_env(MujocoHandEnv)):
         ].copy()
 
     def _get_obs(self):
-        robot_qpos, robot_qvel = self._utils.robot_get_obs(
-            self.model, self.data, self._model_names.joint_names
-        )
+        robot_qpos, robot_qvel = self._robot_joints.get_obs(self.data)
         achieved_goal = self._get_achieved_goal().ravel()
-        observation = np.concatenate([robot_qpos, robot_qvel, achieved_goal])
-        return {
-            "observation": observation.copy(),
-            "achieved_goal": achieved_goal.copy(),
-            "desired_goal": self.goal.copy(),
-        }
+        return self._make_obs([robot_qpos, robot_qvel, achieved_goal], achieved_goal)
 
     def _render_callback(self):
         # Visualize targets.
         sites_offset = (self.data.site_xpos - self.model.site_pos).copy()
-        goal = self.goal.reshape(5, 3)
-        for finger_idx in range(5):
-            site_name = f"target{finger_idx}"
-            site_id = self._model_names.site_name2id[site_name]
-            self.model.site_pos[site_id] = goal[finger_idx] - sites_offset[site_id]
+        site_ids = self._target_sites.ids
+        self.model.site_pos[site_ids] = self.goal.reshape(5, 3) - sites_offset[site_ids]
 
         # Visualize finger positions.
         achieved_goal = self._get_achieved_goal().reshape(5, 3)
-        for finger_idx in range(5):
-            site_name = f"finger{finger_idx}"
-            site_id = self._model_names.site_name2id[site_name]
-            self.model.site_pos[site_id] = (
-                achieved_goal[finger_idx] - sites_offset[site_id]
-            )
+        site_ids = self._finger_sites.ids
+        self.model.site_pos[site_ids] = achieved_goal - sites_offset[site_ids]
         self._mujoco.mj_forward(self.model, self.data)
 
 
@@ -470,12 +494,7 @@ class MujocoPyHandReachEnv(get_base_hand_reanch_env(MujocoPyHandEnv)):
         robot_qpos, robot_qvel = self._utils.robot_get_obs(self.sim)
 
         achieved_goal = self._get_achieved_goal().ravel()
-        observation = np.concatenate([robot_qpos, robot_qvel, achieved_goal])
-        return {
-            "observation": observation.copy(),
-            "achieved_goal": achieved_goal.copy(),
-            "desired_goal": self.goal.copy(),
-        }
+        return self._make_obs([robot_qpos, robot_qvel, achieved_goal], achieved_goal)
 
     def _render_callback(self):
         # Visualize targets.
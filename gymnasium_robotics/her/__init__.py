@@ -0,0 +1,2 @@
+# noqa: D104
+from gymnasium_robotics.her.replay_buffer import HerReplayBuffer
@@ -0,0 +1,294 @@
+"""Episode replay buffer with hindsight experience replay (HER) goal relabeling."""
+
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import error, spaces
+
+GOAL_SELECTION_STRATEGIES = ("future", "final", "episode")
+
+
+class HerReplayBuffer:
+    """Preallocated ring buffer of episodes that samples batches of transitions relabeled with hindsight goals.
+
+    The transitions of the last ``max_episodes`` episodes are stored in numpy arrays laid out once from the
+    ``observation``, ``achieved_goal`` and ``desired_goal`` spaces of a :class:`GoalEnv` (``Box`` or nested ``Dict``
+    spaces). When a batch is sampled, a fraction ``n_sampled_goal / (n_sampled_goal + 1)`` of its transitions get their
+    desired goal replaced by a goal achieved in the same episode, selected with ``goal_selection_strategy``:
+
+        - ``"future"``: a goal achieved later in the episode than the transition.
+        - ``"final"``: the goal achieved at the end of the episode.
+        - ``"episode"``: any goal achieved during the episode.
+
+    The rewards of the whole batch are then computed with a single call to the vectorized ``compute_reward`` of the
+    environment. Sampling only uses array operations whose cost grows with the batch size, there is no Python loop over
+    the transitions.
+
+    Only the completed episodes (terminated, truncated or ``max_episode_steps`` long) are sampled.
+
+    Example:
+        >>> import gymnasium as gym
+        >>> import gymnasium_robotics
+        >>> from gymnasium_robotics.her import HerReplayBuffer
+        >>> gym.register_envs(gymnasium_robotics)
+        >>> env = gym.make("FetchReach-v4")
+        >>> buffer = HerReplayBuffer.from_env(env, max_episodes=100, seed=0)
+        >>> obs, _ = env.reset(seed=0)
+        >>> for _ in range(50):
+        ...     action = env.action_space.sample()
+        ...     next_obs, reward, terminated, truncated, info = env.step(action)
+        ...     buffer.add(obs, action, next_obs, terminated, truncated)
+        ...     obs = next_obs
+        >>> batch = buffer.sample(256)
+        >>> batch["rewards"].shape
+        (256,)
+    """
+
+    def __init__(
+        self,
+        observation_space: spaces.Dict,
+        action_space: spaces.Box,
+        compute_reward: Callable[[Any, Any, Dict[str, Any]], np.ndarray],
+        max_episodes: int,
+        max_episode_steps: int,
+        goal_selection_strategy: str = "future",
+        n_sampled_goal: int = 4,
+        seed: Optional[int] = None,
+    ):
+        """Initialize an empty buffer.
+
+        Args:
+            observation_space (gymnasium.spaces.Dict): observation space of the goal environment, with the ``observation``, ``achieved_goal`` and ``desired_goal`` keys.
+            action_space (gymnasium.spaces.Box): action space of the environment.
+            compute_reward (callable): the ``compute_reward(achieved_goal, desired_goal, info)`` method of the unwrapped environment, called on batches of goals with an empty ``info``.
+            max_episodes (integer): number of episodes kept in the ring buffer.
+            max_episode_steps (integer): maximum number of steps of an episode. Longer episodes are split.
+            goal_selection_strategy (string): relabeling strategy, one of ``"future"``, ``"final"`` or ``"episode"``. Defaults to ``"future"``.
+            n_sampled_goal (integer): number of relabeled transitions for each transition with its original goal. Defaults to 4.
+            seed (optional integer): seed of the random number generator used for sampling.
+        """
+        if goal_selection_strategy not in GOAL_SELECTION_STRATEGIES:
+            raise error.Error(
+                f'Unknown goal selection strategy "{goal_selection_strategy}", expected one of {GOAL_SELECTION_STRATEGIES}.'
+            )
+        if max_episodes <= 0 or max_episode_steps <= 0:
+            raise ValueError(
+                f"max_episodes and max_episode_steps must be positive, got {max_episodes} and {max_episode_steps}."
+            )
+        for key in ["observation", "achieved_goal", "desired_goal"]:
+            if key not in observation_space.spaces:
+                raise error.Error(
+                    f'HerReplayBuffer requires the "{key}" key in the observation space.'
+                )
+
+        self.observation_space = observation_space
+        self.action_space = action_space
+        self.compute_reward = compute_reward
+        self.max_episodes = max_episodes
+        self.max_episode_steps = max_episode_steps
+        self.goal_selection_strategy = goal_selection_strategy
+        self.n_sampled_goal = n_sampled_goal
+        self.her_ratio = 1.0 - 1.0 / (n_sampled_goal + 1)
+        self.np_random = np.random.default_rng(seed)
+
+        # The observations and achieved goals of an episode of T steps are stored at T + 1 time steps
+        self._observations = _allocate(
+            observation_space["observation"], (max_episodes, max_episode_steps + 1)
+        )
+        self._achieved_goals = _allocate(
+            observation_space["achieved_goal"], (max_episodes, max_episode_steps + 1)
+        )
+        self._desired_goals = _allocate(
+            observation_space["desired_goal"], (max_episodes, max_episode_steps)
+        )
+        self._actions = _allocate(action_space, (max_episodes, max_episode_steps))
+        self._terminated = np.zeros((max_episodes, max_episode_steps), dtype=np.bool_)
+
+        # Number of steps of the completed episodes, 0 for empty slots and for the episode being written
+        self._episode_lengths = np.zeros(max_episodes, dtype=np.int64)
+        self._episode_ends = np.zeros(max_episodes, dtype=np.int64)
+        self._episode = 0
+        self._step = 0
+
+    @classmethod
+    def from_env(
+        cls,
+        env: gym.Env,
+        max_episodes: int,
+        max_episode_steps: Optional[int] = None,
+        **kwargs,
+    ) -> "HerReplayBuffer":
+        """Create a buffer for the spaces and the ``compute_reward`` method of ``env``.
+
+        Args:
+            env (gymnasium.Env): the (possibly wrapped) goal environment.
+            max_episodes (integer): number of episodes kept in the ring buffer.
+            max_episode_steps (optional integer): maximum number of steps of an episode. Defaults to the ``max_episode_steps`` of the environment spec.
+            **kwargs: the other arguments of :class:`HerReplayBuffer`.
+
+        Returns:
+            The empty replay buffer.
+        """
+        if max_episode_steps is None:
+            if env.spec is None or env.spec.max_episode_steps is None:
+                raise ValueError(
+                    "max_episode_steps must be given for environments without a time limit."
+                )
+            max_episode_steps = env.spec.max_episode_steps
+        return cls(
+            env.observation_space,
+            env.action_space,
+            env.unwrapped.compute_reward,
+            max_episodes,
+            max_episode_steps,
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        """Number of transitions of the completed episodes in the buffer."""
+        return int(self._episode_ends[-1])
+
+    @property
+    def num_episodes(self) -> int:
+        """Number of completed episodes in the buffer."""
+        return int(np.count_nonzero(self._episode_lengths))
+
+    def add(
+        self,
+        obs: Dict[str, Any],
+        action: np.ndarray,
+        next_obs: Dict[str, Any],
+        terminated: bool,
+        truncated: bool,
+    ):
+        """Add one transition to the episode being written, and complete the episode if it is over.
+
+        Args:
+            obs (dictionary): observation before the step.
+            action (np.ndarray): action of the step.
+            next_obs (dictionary): observation returned by the step.
+            terminated (boolean): termination flag returned by the step.
+            truncated (boolean): truncation flag returned by the step.
+        """
+        if self._step == 0:
+            # The slot of the oldest episode is reused
+            self._episode_lengths[self._episode] = 0
+            self._update_episode_ends()
+        episode, step = self._episode, self._step
+        _write(self._observations, (episode, step), obs["observation"])
+        _write(self._achieved_goals, (episode, step), obs["achieved_goal"])
+        _write(self._desired_goals, (episode, step), obs["desired_goal"])
+        _write(self._actions, (episode, step), action)
+        _write(self._observations, (episode, step + 1), next_obs["observation"])
+        _write(self._achieved_goals, (episode, step + 1), next_obs["achieved_goal"])
+        self._terminated[episode, step] = terminated
+        self._step += 1
+
+        if terminated or truncated or self._step == self.max_episode_steps:
+            self.end_episode()
+
+    def end_episode(self):
+        """Complete the episode being written, e.g. when the episode was interrupted without truncation."""
+        if self._step == 0:
+            return
+        self._episode_lengths[self._episode] = self._step
+        self._update_episode_ends()
+        self._episode = (self._episode + 1) % self.max_episodes
+        self._step = 0
+
+    def clear(self):
+        """Remove all the episodes."""
+        self._episode_lengths[:] = 0
+        self._update_episode_ends()
+        self._episode = 0
+        self._step = 0
+
+    def sample(self, batch_size: int) -> Dict[str, Any]:
+        """Sample a batch of transitions uniformly from the completed episodes and relabel their goals.
+
+        Args:
+            batch_size (integer): number of transitions.
+
+        Returns:
+            Dictionary with the ``"observations"`` and ``"next_observations"`` dictionaries (with the relabeled
+            ``"desired_goal"``), and the ``"actions"``, ``"rewards"``, ``"terminated"`` and ``"is_relabeled"`` arrays.
+        """
+        if len(self) == 0:
+            raise error.Error("Cannot sample from a buffer without completed episodes.")
+
+        # Uniform transitions: a flat transition index is mapped to its episode with the cumulative lengths
+        flat_index = self.np_random.integers(len(self), size=batch_size)
+        episodes = np.searchsorted(self._episode_ends, flat_index, side="right")
+        lengths = self._episode_lengths[episodes]
+        steps = flat_index - (self._episode_ends[episodes] - lengths)
+
+        is_relabeled = self.np_random.random(batch_size) < self.her_ratio
+        goal_steps = self._sample_goal_steps(steps, lengths)
+        achieved_goals = _gather(self._achieved_goals, (episodes, goal_steps))
+        desired_goals = _where(
+            is_relabeled,
+            achieved_goals,
+            _gather(self._desired_goals, (episodes, steps)),
+        )
+        next_achieved_goals = _gather(self._achieved_goals, (episodes, steps + 1))
+
+        return {
+            "observations": {
+                "observation": _gather(self._observations, (episodes, steps)),
+                "achieved_goal": _gather(self._achieved_goals, (episodes, steps)),
+                "desired_goal": desired_goals,
+            },
+            "actions": _gather(self._actions, (episodes, steps)),
+            "rewards": np.asarray(
+                self.compute_reward(next_achieved_goals, desired_goals, {}),
+                dtype=np.float64,
+            ),
+            "next_observations": {
+                "observation": _gather(self._observations, (episodes, steps + 1)),
+                "achieved_goal": next_achieved_goals,
+                "desired_goal": desired_goals,
+            },
+            "terminated": self._terminated[episodes, steps],
+            "is_relabeled": is_relabeled,
+        }
+
+    def _sample_goal_steps(self, steps: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Time steps of the achieved goals used to relabel the transitions at ``steps``."""
+        if self.goal_selection_strategy == "final":
+            return lengths
+        if self.goal_selection_strategy == "future":
+            # Achieved goals after the transition, from its next observation to the end of the episode
+            low = steps + 1
+        else:
+            low = np.ones_like(steps)
+        return self.np_random.integers(low, lengths + 1)
+
+    def _update_episode_ends(self):
+        np.cumsum(self._episode_lengths, out=self._episode_ends)
+
+
+def _allocate(space: spaces.Space, prefix: Tuple[int, ...]):
+    if isinstance(space, spaces.Dict):
+        return {key: _allocate(subspace, prefix) for key, subspace in space.items()}
+    return np.zeros(prefix + space.shape, dtype=space.dtype)
+
+
+def _write(buffer, index, value):
+    if isinstance(buffer, dict):
+        for key, subbuffer in buffer.items():
+            _write(subbuffer, index, value[key])
+    else:
+        buffer[index] = value
+
+
+def _gather(buffer, index):
+    if isinstance(buffer, dict):
+        return {key: _gather(subbuffer, index) for key, subbuffer in buffer.items()}
+    return buffer[index]
+
+
+def _where(condition: np.ndarray, x, y) -> Union[dict, np.ndarray]:
+    if isinstance(x, dict):
+        return {key: _where(condition, x[key], y[key]) for key in x}
+    return np.where(condition.reshape(condition.shape + (1,) * (x.ndim - 1)), x, y)
@@ -0,0 +1,76 @@
+"""Blocks of pre-drawn random goal components for the goal sampling of the robot environments."""
+
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+GoalComponents = Dict[str, np.ndarray]
+
+
+class GoalSampler:
+    """Serve the components of goals one at a time from blocks drawn with a single vectorized call.
+
+    The components of a goal are the parts that do not depend on the state of the simulation after a reset, e.g. the
+    offset of a target position or a target rotation, or the whole goal for the environments whose goals only depend
+    on their initial configuration. The sampler draws and builds the components of ``block_size`` goals at once with
+    ``draw_fn``, using the random number generator passed to :meth:`next`, and serves them in order. The environment
+    then combines the components of one goal with the current state of the simulation (e.g. the position of the
+    object) to build the goal.
+
+    The goals drawn with a given generator only depend on its state when a block is drawn, so the goals of an
+    environment seeded with :meth:`reset` are reproducible as long as the block is cleared when the environment is
+    seeded.
+
+    The sampler is enabled with the ``goal_block_size`` argument of :class:`BaseRobotEnv`. The Fetch environments
+    also serve their initial object positions from a sampler enabled with ``object_block_size``.
+    """
+
+    def __init__(
+        self,
+        draw_fn: Callable[[np.random.Generator, int], GoalComponents],
+        block_size: int = 4096,
+    ):
+        """Initialize a sampler without a block.
+
+        Args:
+            draw_fn (callable): function that returns a dictionary of arrays with the components of ``n`` goals along their first axis, drawn with the given random number generator.
+            block_size (integer): number of goals drawn at once. Defaults to 4096.
+        """
+        if block_size <= 0:
+            raise ValueError(
+                f"The size of the blocks must be positive, got {block_size}."
+            )
+        self.draw_fn = draw_fn
+        self.block_size = block_size
+
+        self._block: Optional[GoalComponents] = None
+        self._index = 0
+
+    def __len__(self) -> int:
+        """Number of goals left in the current block."""
+        return 0 if self._block is None else self.block_size - self._index
+
+    def next(self, np_random: np.random.Generator) -> GoalComponents:
+        """Return the components of the next goal, drawing a new block with ``np_random`` if needed.
+
+        Args:
+            np_random (np.random.Generator): random number generator used to draw a new block.
+
+        Returns:
+            Dictionary with the components of one goal, each with a first axis of size 1.
+        """
+        if len(self) == 0:
+            self._block = self.draw(np_random, self.block_size)
+            self._index = 0
+        index = self._index
+        self._index += 1
+        return {key: value[index : index + 1] for key, value in self._block.items()}
+
+    def draw(self, np_random: np.random.Generator, n: int) -> GoalComponents:
+        """Draw the components of ``n`` goals with ``np_random``, without changing the current block."""
+        return self.draw_fn(np_random, n)
+
+    def clear(self):
+        """Discard the goals left in the current block, e.g. when the random number generator is seeded again."""
+        self._block = None
+        self._index = 0
@@ -1,4 +1,7 @@
-from typing import Dict, Tuple, Union
+import copy
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from gymnasium import error
@@ -20,15 +23,27 @@ MJ_OBJ_TYPES = [
 ]
 
 
-def robot_get_obs(model, data, joint_names):
-    """Returns all joint positions and velocities associated with a robot."""
+def robot_get_obs(model, data, joint_names, out=None):
+    """Returns all joint positions and velocities associated with a robot.
+
+    To read the robot state at every step, prefer a :class:`RobotJointAccessor` built once per model.
+    If given, the positions and velocities are written into the preallocated arrays of the tuple ``out``.
+    """
     if data.qpos is not None and joint_names:
         names = [n for n in joint_names if n.startswith("robot")]
-        return (
-            np.squeeze(np.array([get_joint_qpos(model, data, name) for name in names])),
-            np.squeeze(np.array([get_joint_qvel(model, data, name) for name in names])),
+        qpos = np.squeeze(
+            np.array([get_joint_qpos(model, data, name) for name in names])
         )
-    return np.zeros(0), np.zeros(0)
+        qvel = np.squeeze(
+            np.array([get_joint_qvel(model, data, name) for name in names])
+        )
+    else:
+        qpos, qvel = np.zeros(0), np.zeros(0)
+    if out is not None:
+        out[0][:] = qpos
+        out[1][:] = qvel
+        return out
+    return qpos, qvel
 
 
 def ctrl_set_action(model, data, action):
@@ -107,6 +122,31 @@ def reset_mocap2body_xpos(model, data):
         data.mocap_quat[mocap_id][:] = data.xquat[body_idx]
 
 
+def get_mocap_welds(model: MjModel) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ids of the mocap bodies and of the bodies welded to them, see :func:`reset_mocap2body_xpos`."""
+    weld_mocap_ids, weld_body_ids = [], []
+    if model.nmocap > 0 and model.eq_type is not None:
+        for eq_type, obj1_id, obj2_id in zip(
+            model.eq_type, model.eq_obj1id, model.eq_obj2id
+        ):
+            if eq_type != mujoco.mjtEq.mjEQ_WELD:
+                continue
+            mocap_id = model.body_mocapid[obj1_id]
+            if mocap_id != -1:
+                # obj1 is the mocap, obj2 is the welded body
+                body_idx = obj2_id
+            else:
+                # obj2 is the mocap, obj1 is the welded body
+                mocap_id = model.body_mocapid[obj2_id]
+                body_idx = obj1_id
+            assert mocap_id != -1
+            weld_mocap_ids.append(mocap_id)
+            weld_body_ids.append(body_idx)
+    return np.array(weld_mocap_ids, dtype=np.intp), np.array(
+        weld_body_ids, dtype=np.intp
+    )
+
+
 def get_site_jacp(model, data, site_id):
     """Return the Jacobian' translational component of the end-effector of
     the corresponding site id.
@@ -261,6 +301,137 @@ def get_site_xmat(model: MjModel, data: MjData, name: str):
     return data.site_xmat[site_id].reshape(3, 3)
 
 
+# Maximum number of XML files whose compiled model is kept by `load_model_from_path`
+MODEL_CACHE_MAX_SIZE = 64
+
+# Compiled models with the (modification time, size) of their XML file, by real path, least recently used first
+_MODEL_CACHE: "OrderedDict[str, Tuple[int, int, MjModel]]" = OrderedDict()
+
+
+def load_model_from_path(fullpath: str) -> MjModel:
+    """Return a new copy of the model compiled from the XML file ``fullpath``.
+
+    The file is only compiled the first time it is loaded in the process, later calls copy the compiled model, which
+    is about 10 times faster. The file is compiled again when its modification time or size changes, but not when only
+    a file it includes changes. The models of the :data:`MODEL_CACHE_MAX_SIZE` most recently loaded files are kept,
+    see :func:`clear_model_cache` to release them.
+    """
+    stat = os.stat(fullpath)
+    key = os.path.realpath(fullpath)
+    entry = _MODEL_CACHE.get(key)
+    if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+        entry = (stat.st_mtime_ns, stat.st_size, MjModel.from_xml_path(fullpath))
+        _MODEL_CACHE[key] = entry
+        while len(_MODEL_CACHE) > MODEL_CACHE_MAX_SIZE:
+            _MODEL_CACHE.popitem(last=False)
+    _MODEL_CACHE.move_to_end(key)
+    return copy.copy(entry[2])
+
+
+def clear_model_cache():
+    """Release the compiled models cached by :func:`load_model_from_path`."""
+    _MODEL_CACHE.clear()
+
+
+class CompiledModelMixin:
+    """Makes a Gymnasium ``MujocoEnv`` simulate a compiled ``MjModel`` passed as ``model`` instead of compiling its XML file.
+
+    The model path given to the environment must still exist since ``MujocoEnv`` checks it, but it is not loaded. The
+    environment owns ``model``, pass a copy to share a compiled model between environments.
+    """
+
+    def __init__(self, *args, model: MjModel, **kwargs):
+        self._compiled_model = model
+        super().__init__(*args, **kwargs)
+
+    def _initialize_simulation(self) -> Tuple[MjModel, MjData]:
+        model = self._compiled_model
+        # Only grow the offscreen framebuffer, never shrink it below the size of the model XML.
+        model.vis.global_.offwidth = max(model.vis.global_.offwidth, self.width)
+        model.vis.global_.offheight = max(model.vis.global_.offheight, self.height)
+        return model, MjData(model)
+
+
+try:
+    SIM_STATE_SPEC = int(mujoco.mjtState.mjSTATE_INTEGRATION)
+except AttributeError:  # mujoco versions without mj_getState/mj_setState
+    SIM_STATE_SPEC = None
+
+
+def get_sim_state_size(model: MjModel, spec: int = SIM_STATE_SPEC) -> int:
+    """Return the number of elements of the flat simulation state selected by ``spec``."""
+    _check_sim_state_support()
+    return mujoco.mj_stateSize(model, spec)
+
+
+def get_sim_state(
+    model: MjModel, data: MjData, out=None, spec: int = SIM_STATE_SPEC
+) -> np.ndarray:
+    """Copy the simulation state of ``data`` into a flat array.
+
+    By default the full integration state is copied (``mjSTATE_INTEGRATION``): time, qpos, qvel, act, warmstart
+    accelerations, ctrl, qfrc_applied, xfrc_applied, mocap positions/quaternions and equality activations. Restoring it
+    with :func:`set_sim_state` makes the next ``mj_step`` bit-exact with the step of the original simulation.
+
+    Args:
+        model: mjModel of the MuJoCo environment.
+        data: mjData of the MuJoCo environment.
+        out (optional np.ndarray): preallocated float64 array of size :func:`get_sim_state_size` to write the state into.
+        spec (optional integer): bit mask of ``mujoco.mjtState`` elements to copy.
+
+    Returns:
+        The flat simulation state, ``out`` if it was given.
+    """
+    _check_sim_state_support()
+    if out is None:
+        out = np.empty(mujoco.mj_stateSize(model, spec), dtype=np.float64)
+    mujoco.mj_getState(model, data, out, spec)
+    return out
+
+
+def set_sim_state(model: MjModel, data: MjData, state, spec: int = SIM_STATE_SPEC):
+    """Restore a flat simulation state obtained with :func:`get_sim_state` and recompute the derived quantities."""
+    _check_sim_state_support()
+    state = np.asarray(state, dtype=np.float64)
+    mujoco.mj_setState(model, data, state, spec)
+    mujoco.mj_forward(model, data)
+    # mj_forward normalizes the free joint quaternions in qpos and overwrites qacc_warmstart,
+    # set the state again so that the next mj_step matches the original simulation exactly.
+    mujoco.mj_setState(model, data, state, spec)
+
+
+def _check_sim_state_support():
+    if not hasattr(mujoco, "mj_getState"):
+        raise error.DependencyNotInstalled(
+            f"mujoco {mujoco.__version__} does not provide `mj_getState`. (HINT: upgrade mujoco with `pip install -U mujoco`)"
+        )
+
+
+class SimStateMixin:
+    """Adds :meth:`get_sim_state` and :meth:`set_sim_state` to environments that expose ``self.model`` and ``self.data``.
+
+    Only the ``mjData`` physics state is saved. Quantities stored in the ``mjModel`` (e.g. randomized body positions)
+    or in Python attributes of the environment (e.g. the goal) are not part of the snapshot.
+    """
+
+    def get_sim_state(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return a flat copy of the full physics state, including mocap, act and warmstart.
+
+        Args:
+            out (optional np.ndarray): preallocated array of size :attr:`sim_state_size` to write the state into.
+        """
+        return get_sim_state(self.model, self.data, out=out)
+
+    def set_sim_state(self, state: np.ndarray):
+        """Restore a physics state returned by :meth:`get_sim_state`."""
+        set_sim_state(self.model, self.data, state)
+
+    @property
+    def sim_state_size(self) -> int:
+        """Number of elements of the array returned by :meth:`get_sim_state`."""
+        return get_sim_state_size(self.model)
+
+
 def extract_mj_names(
     model: MjModel, obj_type: mjtObj
 ) -> Tuple[Union[Tuple[str, ...], Tuple[()]], Dict[str, int], Dict[int, str]]:
@@ -467,3 +638,317 @@ class MujocoModelNames:
     @property
     def sensor_id2name(self):
         return self._sensor_id2name
+
+
+def _resolve_ids(name2id: Dict[str, int], names: Union[str, Sequence[str]], kind: str):
+    single = isinstance(names, str)
+    ids = []
+    for name in [names] if single else names:
+        assert name in name2id, f"{kind} with name '{name}' is not part of the model!"
+        ids.append(name2id[name])
+    return single, np.array(ids, dtype=np.intp)
+
+
+def _as_index(indices: np.ndarray):
+    """Return a slice if ``indices`` are contiguous, so that indexing returns a view instead of a copy."""
+    if len(indices) > 0 and np.all(np.diff(indices) == 1):
+        return slice(int(indices[0]), int(indices[-1]) + 1)
+    return indices
+
+
+def _take(array: np.ndarray, index, out: Optional[np.ndarray]):
+    """Index ``array`` into ``out``, or return a view for an integer index and a copy for an index array."""
+    if out is None:
+        return array[index]
+    out[...] = array[index]
+    return out
+
+
+def _matvec(matrix: np.ndarray, vector: np.ndarray, out: Optional[np.ndarray]):
+    if out is None:
+        return matrix @ vector
+    return np.matmul(matrix, vector, out=out)
+
+
+class SiteAccessor:
+    """Precomputed access to the data of one or several sites.
+
+    The site ids are resolved once from :class:`MujocoModelNames`. With a single site name the getters return arrays
+    of shape ``(3,)`` (``(3, 3)`` for :meth:`xmat`), with a list of names they return arrays of shape ``(n_sites, 3)``.
+    Like :func:`get_site_xpos`, :meth:`xpos` of a single site returns a view of ``data.site_xpos``.
+    """
+
+    def __init__(
+        self,
+        model: MjModel,
+        model_names: MujocoModelNames,
+        names: Union[str, Sequence[str]],
+    ):
+        """Resolve the ids of the sites ``names``.
+
+        Args:
+            model: mjModel of the MuJoCo environment.
+            model_names: names and ids of the model objects.
+            names: name or list of names of the sites.
+        """
+        self._single, self.ids = _resolve_ids(model_names.site_name2id, names, "Site")
+        self.id = int(self.ids[0]) if self._single else None
+        self._index = self.id if self._single else self.ids
+        jacp = np.zeros((len(self.ids), 3, model.nv))
+        jacr = np.zeros((len(self.ids), 3, model.nv))
+        self._jacobians = [
+            (int(site_id), jacp[i], jacr[i]) for i, site_id in enumerate(self.ids)
+        ]
+        self._jacp = jacp[0] if self._single else jacp
+        self._jacr = jacr[0] if self._single else jacr
+
+    def xpos(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the cartesian positions of the sites."""
+        return _take(data.site_xpos, self._index, out)
+
+    def xmat(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the rotation matrices of the sites."""
+        xmat = data.site_xmat[self._index]
+        return _take(xmat.reshape(xmat.shape[:-1] + (3, 3)), ..., out)
+
+    def xvelp(
+        self, model: MjModel, data: MjData, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Return the translational velocities of the sites in world coordinates."""
+        for site_id, jacp, _ in self._jacobians:
+            mujoco.mj_jacSite(model, data, jacp, None, site_id)
+        return _matvec(self._jacp, data.qvel, out)
+
+    def xvelr(
+        self, model: MjModel, data: MjData, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Return the rotational velocities of the sites in world coordinates."""
+        for site_id, _, jacr in self._jacobians:
+            mujoco.mj_jacSite(model, data, None, jacr, site_id)
+        return _matvec(self._jacr, data.qvel, out)
+
+
+class JointAccessor:
+    """Precomputed access to the positions (qpos) and velocities (qvel) of one or several joints.
+
+    The ``qpos`` and ``qvel`` addresses of the joints are resolved once from their type. The values of several joints
+    are concatenated in the order of ``names``. Like :func:`get_joint_qpos`, the getters return copies.
+    """
+
+    def __init__(
+        self,
+        model: MjModel,
+        model_names: MujocoModelNames,
+        names: Union[str, Sequence[str]],
+    ):
+        """Resolve the qpos and qvel addresses of the joints ``names``.
+
+        Args:
+            model: mjModel of the MuJoCo environment.
+            model_names: names and ids of the model objects.
+            names: name or list of names of the joints.
+        """
+        _, self.ids = _resolve_ids(model_names.joint_name2id, names, "Joint")
+        qpos_idx, qvel_idx = [], []
+        for joint_id in self.ids:
+            joint_type = model.jnt_type[joint_id]
+            if joint_type == mujoco.mjtJoint.mjJNT_FREE:
+                qpos_ndim, qvel_ndim = 7, 6
+            elif joint_type == mujoco.mjtJoint.mjJNT_BALL:
+                qpos_ndim, qvel_ndim = 4, 3
+            else:
+                assert joint_type in (
+                    mujoco.mjtJoint.mjJNT_HINGE,
+                    mujoco.mjtJoint.mjJNT_SLIDE,
+                )
+                qpos_ndim, qvel_ndim = 1, 1
+            qpos_adr, qvel_adr = model.jnt_qposadr[joint_id], model.jnt_dofadr[joint_id]
+            qpos_idx.append(np.arange(qpos_adr, qpos_adr + qpos_ndim))
+            qvel_idx.append(np.arange(qvel_adr, qvel_adr + qvel_ndim))
+        self.qpos_idx = _as_index(np.concatenate(qpos_idx or [[]]).astype(np.intp))
+        self.qvel_idx = _as_index(np.concatenate(qvel_idx or [[]]).astype(np.intp))
+
+    def qpos(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the positions of the joints."""
+        if out is None:
+            return data.qpos[self.qpos_idx].copy()
+        return _take(data.qpos, self.qpos_idx, out)
+
+    def qvel(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the velocities of the joints."""
+        if out is None:
+            return data.qvel[self.qvel_idx].copy()
+        return _take(data.qvel, self.qvel_idx, out)
+
+    def set_qpos(self, data: MjData, value):
+        """Set the positions of the joints."""
+        data.qpos[self.qpos_idx] = value
+
+    def set_qvel(self, data: MjData, value):
+        """Set the velocities of the joints."""
+        data.qvel[self.qvel_idx] = value
+
+
+class RobotJointAccessor(JointAccessor):
+    """Precomputed gather of the robot joints, the joints whose name starts with ``robot``.
+
+    :meth:`get_obs` returns the same positions and velocities as :func:`robot_get_obs` with two fancy indexing
+    operations, instead of one name lookup and one array allocation per joint.
+    """
+
+    def __init__(self, model: MjModel, model_names: MujocoModelNames):
+        """Resolve the qpos and qvel addresses of the robot joints of the model.
+
+        Args:
+            model: mjModel of the MuJoCo environment.
+            model_names: names and ids of the model objects.
+        """
+        super().__init__(
+            model,
+            model_names,
+            [name for name in model_names.joint_names if name.startswith("robot")],
+        )
+
+    def get_obs(
+        self, data: MjData, out: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the positions and velocities of the robot joints.
+
+        Args:
+            data: mjData of the MuJoCo environment.
+            out (optional tuple): preallocated ``(qpos, qvel)`` arrays to write the robot state into.
+        """
+        if out is None:
+            return self.qpos(data), self.qvel(data)
+        return self.qpos(data, out=out[0]), self.qvel(data, out=out[1])
+
+
+class BodyAccessor:
+    """Precomputed access to the cartesian frames of one or several bodies."""
+
+    def __init__(
+        self,
+        model: MjModel,
+        model_names: MujocoModelNames,
+        names: Union[str, Sequence[str]],
+    ):
+        """Resolve the ids of the bodies ``names``.
+
+        Args:
+            model: mjModel of the MuJoCo environment.
+            model_names: names and ids of the model objects.
+            names: name or list of names of the bodies.
+        """
+        single, self.ids = _resolve_ids(model_names.body_name2id, names, "Body")
+        self._index = int(self.ids[0]) if single else self.ids
+
+    def xpos(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the cartesian positions of the bodies."""
+        return _take(data.xpos, self._index, out)
+
+    def xquat(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the cartesian orientations (quaternions) of the bodies."""
+        return _take(data.xquat, self._index, out)
+
+
+class MocapAccessor:
+    """Precomputed access to the positions and orientations of one or several mocap bodies."""
+
+    def __init__(
+        self,
+        model: MjModel,
+        model_names: MujocoModelNames,
+        names: Union[str, Sequence[str]],
+    ):
+        """Resolve the mocap ids of the bodies ``names``.
+
+        Args:
+            model: mjModel of the MuJoCo environment.
+            model_names: names and ids of the model objects.
+            names: name or list of names of the mocap bodies.
+        """
+        single, body_ids = _resolve_ids(model_names.body_name2id, names, "Body")
+        self.ids = model.body_mocapid[body_ids]
+        assert np.all(self.ids != -1), f"Bodies {names} are not all mocap bodies!"
+        self._index = int(self.ids[0]) if single else self.ids
+
+    def pos(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the positions of the mocap bodies."""
+        return _take(data.mocap_pos, self._index, out)
+
+    def quat(self, data: MjData, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the orientations (quaternions) of the mocap bodies."""
+        return _take(data.mocap_quat, self._index, out)
+
+    def set_pos(self, data: MjData, value):
+        """Set the positions of the mocap bodies."""
+        data.mocap_pos[self._index] = value
+
+    def set_quat(self, data: MjData, value):
+        """Set the orientations (quaternions) of the mocap bodies."""
+        data.mocap_quat[self._index] = value
+
+
+class ActionPlan:
+    """Action application compiled from the actuators and mocap welds of a model.
+
+    Equivalent to calling :func:`ctrl_set_action` and :func:`mocap_set_action`, but the actuator bias types, the qpos
+    addresses of the position actuators and the weld (mocap, body) pairs are resolved once, so that an action is
+    applied with a few numpy operations instead of Python loops over the actuators and equality constraints.
+    """
+
+    def __init__(self, model: MjModel):
+        """Compile the action plan of ``model``.
+
+        Args:
+            model: mjModel of the MuJoCo environment.
+        """
+        self.nmocap = model.nmocap
+        self.nu = model.nu
+
+        # Position actuators set their target relative to the current qpos of their joint.
+        self.position_actuator_ids = np.flatnonzero(model.actuator_biastype != 0)
+        self.position_qpos_idx = model.jnt_qposadr[
+            model.actuator_trnid[self.position_actuator_ids, 0]
+        ]
+
+        self.weld_mocap_ids, self.weld_body_ids = get_mocap_welds(model)
+
+    def apply(
+        self,
+        data: MjData,
+        action: np.ndarray,
+        body_poses: Optional[np.ndarray] = None,
+    ):
+        """Apply ``action`` (the mocap deltas followed by the actuator controls) to ``data``.
+
+        Args:
+            data: mjData of the MuJoCo environment.
+            action (np.ndarray): the mocap deltas followed by the actuator controls.
+            body_poses (optional np.ndarray): ``(x, y, z, qw, qx, qy, qz)`` poses of shape ``(len(weld_body_ids), 7)``
+                that the mocap deltas are applied to, instead of the current poses of the welded bodies in ``data``.
+        """
+        n_mocap_action = self.nmocap * 7
+        if self.nu > 0:
+            ctrl_action = action[n_mocap_action:]
+            n_ctrl = ctrl_action.shape[0]
+            data.ctrl[:n_ctrl] = ctrl_action
+            ids, qpos_idx = self._position_actuators(n_ctrl)
+            data.ctrl[ids] = data.qpos[qpos_idx] + ctrl_action[ids]
+
+        if self.nmocap > 0:
+            mocap_action = action[:n_mocap_action].reshape(self.nmocap, 7)
+            if body_poses is None:
+                data.mocap_pos[self.weld_mocap_ids] = data.xpos[self.weld_body_ids]
+                data.mocap_quat[self.weld_mocap_ids] = data.xquat[self.weld_body_ids]
+            else:
+                data.mocap_pos[self.weld_mocap_ids] = body_poses[:, :3]
+                data.mocap_quat[self.weld_mocap_ids] = body_poses[:, 3:]
+            data.mocap_pos += mocap_action[:, :3]
+            data.mocap_quat += mocap_action[:, 3:]
+
+    def _position_actuators(self, n_ctrl: int):
+        if n_ctrl == self.nu:
+            return self.position_actuator_ids, self.position_qpos_idx
+        mask = self.position_actuator_ids < n_ctrl
+        return self.position_actuator_ids[mask], self.position_qpos_idx[mask]
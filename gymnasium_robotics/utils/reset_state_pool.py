@@ -0,0 +1,170 @@
+"""Bounded pools of precomputed initial simulation states for environments with expensive resets."""
+
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+from gymnasium import error, logger
+
+REFILL_POLICIES = ("eager", "lazy", "never")
+
+
+class ResetStatePool:
+    """Cache of validated initial simulation states, grouped in one bounded pool per seed stream.
+
+    A seed stream is started every time the environment is reset with an explicit ``seed``. The states of a stream
+    are generated with a random number generator derived from that seed, independent of the environment's
+    ``np_random``, so the content of an eagerly filled pool only depends on the seed. Resets without a seed keep
+    using the pool of the current stream.
+
+    At most ``max_streams`` seed streams are kept: when a new stream is started, the least recently used stream is
+    dropped with its states. Seeding every episode with a new seed therefore keeps the memory bounded, but every
+    episode starts a new, empty stream and the pool is only reused by the resets without a seed.
+
+    The refill policy selects when new states are generated:
+
+        - ``"eager"``: the whole pool is generated the first time a stream is used. This makes the first reset of a
+          stream ``size`` times slower than a reset without a pool, so it only pays off when a seed is reused for many
+          resets. Do not use it with a new seed every episode.
+        - ``"lazy"``: one new state is generated on each reset until the pool is full.
+        - ``"never"``: states are never generated, the pool only contains the states loaded with :meth:`load`.
+    """
+
+    def __init__(self, size: int, refill: str = "lazy", max_streams: int = 8):
+        """Initialize an empty pool.
+
+        Args:
+            size (integer): maximum number of states kept for each seed stream.
+            refill (string): refill policy, one of ``"eager"``, ``"lazy"`` or ``"never"``. Defaults to ``"lazy"``.
+            max_streams (integer): maximum number of seed streams kept, the least recently used stream is dropped first. Defaults to 8.
+        """
+        if size <= 0:
+            raise ValueError(f"The size of the pool must be positive, got {size}.")
+        if max_streams <= 0:
+            raise ValueError(
+                f"The number of seed streams must be positive, got {max_streams}."
+            )
+        if refill not in REFILL_POLICIES:
+            raise error.Error(
+                f'Unknown refill policy "{refill}", expected one of {REFILL_POLICIES}.'
+            )
+        self.size = size
+        self.refill = refill
+        self.max_streams = max_streams
+
+        # Seed streams in least recently used order
+        self._streams: "OrderedDict[Optional[int], List[np.ndarray]]" = OrderedDict()
+        self._generators: "OrderedDict[Optional[int], np.random.Generator]" = (
+            OrderedDict()
+        )
+        self._stream: Optional[int] = None
+        self._warned_eager_eviction = False
+
+    def __len__(self) -> int:
+        """Number of states in the pool of the current seed stream."""
+        return len(self._streams.get(self._stream, []))
+
+    @property
+    def stream(self) -> Optional[int]:
+        """Seed of the current stream, ``None`` if the environment has not been seeded."""
+        return self._stream
+
+    def select_stream(self, seed: Optional[int]):
+        """Use the pool of the seed stream ``seed`` for the following resets."""
+        self._stream = seed
+        self._stream_states(seed)
+
+    def sample(
+        self,
+        np_random: np.random.Generator,
+        generate_fn: Callable[[np.random.Generator], Optional[np.ndarray]],
+    ) -> Optional[np.ndarray]:
+        """Refill the pool of the current stream according to the refill policy and return one of its states.
+
+        Args:
+            np_random (np.random.Generator): random number generator used to select the returned state.
+            generate_fn (callable): function that generates a new initial state with the given random number generator. It returns ``None`` if the generated state is not valid.
+
+        Returns:
+            A copy of a state of the pool, or ``None`` if the pool is empty (only possible with the ``"never"`` policy).
+        """
+        states = self._stream_states(self._stream)
+        if self.refill == "eager":
+            while len(states) < self.size:
+                states.append(self._generate(generate_fn))
+        elif self.refill == "lazy" and len(states) < self.size:
+            states.append(self._generate(generate_fn))
+
+        if len(states) == 0:
+            return None
+        return states[np_random.integers(len(states))].copy()
+
+    def add(self, state: np.ndarray, seed: Optional[int] = None):
+        """Add ``state`` to the pool of the seed stream ``seed`` if it is not full."""
+        states = self._stream_states(seed)
+        if len(states) < self.size:
+            states.append(np.array(state, dtype=np.float64))
+
+    def clear(self):
+        """Remove the states of every seed stream."""
+        self._streams.clear()
+        self._generators.clear()
+
+    def save(self, path: str):
+        """Save the states of every seed stream to the ``.npz`` file ``path``."""
+        np.savez(
+            path,
+            **{
+                _stream_key(seed): np.array(states)
+                for seed, states in self._streams.items()
+                if len(states) > 0
+            },
+        )
+
+    def load(self, path: str):
+        """Add the states saved with :meth:`save` in the file ``path`` to the pools of their seed streams."""
+        with np.load(path) as saved:
+            for key in saved.files:
+                seed = None if key == "stream_none" else int(key[len("stream_") :])
+                for state in saved[key]:
+                    self.add(state, seed)
+
+    def _stream_states(self, seed: Optional[int]) -> List[np.ndarray]:
+        """Return the states of the stream ``seed``, started if needed, and mark it as the most recently used one."""
+        if seed in self._streams:
+            self._streams.move_to_end(seed)
+            return self._streams[seed]
+
+        self._streams[seed] = []
+        # The current stream and the stream of `seed` are never dropped
+        evictable = [key for key in self._streams if key not in (self._stream, seed)]
+        for evicted in evictable[: max(len(self._streams) - self.max_streams, 0)]:
+            del self._streams[evicted]
+            self._generators.pop(evicted, None)
+            if self.refill == "eager" and not self._warned_eager_eviction:
+                self._warned_eager_eviction = True
+                logger.warn(
+                    f"More than {self.max_streams} seed streams were started with the eager refill policy of the "
+                    "reset state pool, which generates a whole pool for every new seed. Use the lazy policy when "
+                    "the environment is reset with a new seed every episode."
+                )
+        return self._streams[seed]
+
+    def _generate(
+        self, generate_fn: Callable[[np.random.Generator], Optional[np.ndarray]]
+    ) -> np.ndarray:
+        if self._stream not in self._generators:
+            # Spawn an independent child of the seed, so that the pool does not replay the draws of the
+            # environment's own `np_random` seeded with the same value.
+            seed_seq = np.random.SeedSequence(self._stream).spawn(1)[0]
+            self._generators[self._stream] = np.random.default_rng(seed_seq)
+        np_random = self._generators[self._stream]
+
+        state = None
+        while state is None:
+            state = generate_fn(np_random)
+        return np.array(state, dtype=np.float64)
+
+
+def _stream_key(seed: Optional[int]) -> str:
+    return "stream_none" if seed is None else f"stream_{seed}"
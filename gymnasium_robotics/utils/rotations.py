@@ -28,6 +28,7 @@
 # https://github.com/matthew-brett/transforms3d
 # They have mostly been modified to support batched operations.
 
+import functools
 import itertools
 import math
 
@@ -96,12 +97,17 @@ SO3
     While not supported by MuJoCo, this representation has a lot of nice features.
     We expect to add support for these in the future.
 
+Performance
+-----------
+    benchmarks/rotations.py measures every conversion for single rotations and
+    batches, and checks the timings against a baseline. The CI checks them against the
+    reference baseline benchmarks/rotations_baseline.json, scaled by the speed of the machine.
+
 TODO / Missing
 --------------
     - Rotation integration or derivatives (e.g. velocity conversions)
     - More representations (SO3, etc)
     - Random sampling (e.g. sample uniform random rotation)
-    - Performance benchmarks/measurements
     - (Maybe) define everything as to/from matrices, for simplicity
 """
 
@@ -110,12 +116,28 @@ _FLOAT_EPS = np.finfo(np.float64).eps
 _EPS4 = _FLOAT_EPS * 4.0
 
 
-def euler2mat(euler):
+def _as_float_array(x):
+    """Return ``x`` as a float32 or float64 array, other dtypes are converted to float64."""
+    x = np.asarray(x)
+    if x.dtype != np.float32 and x.dtype != np.float64:
+        x = x.astype(np.float64)
+    return x
+
+
+def _output(out, shape, dtype):
+    """Return ``out``, or a new array if it is None."""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    assert out.shape == shape, f"Invalid shape out {out.shape}, expected {shape}"
+    return out
+
+
+def euler2mat(euler, out=None):
     """Convert Euler Angles to Rotation Matrix.
 
     See rotation.py for notes
     """
-    euler = np.asarray(euler, dtype=np.float64)
+    euler = _as_float_array(euler)
     assert euler.shape[-1] == 3, f"Invalid shaped euler {euler}"
 
     ai, aj, ak = -euler[..., 2], -euler[..., 1], -euler[..., 0]
@@ -124,7 +146,7 @@ def euler2mat(euler):
     cc, cs = ci * ck, ci * sk
     sc, ss = si * ck, si * sk
 
-    mat = np.empty(euler.shape[:-1] + (3, 3), dtype=np.float64)
+    mat = _output(out, euler.shape[:-1] + (3, 3), euler.dtype)
     mat[..., 2, 2] = cj * ck
     mat[..., 2, 1] = sj * sc - cs
     mat[..., 2, 0] = sj * cc + ss
@@ -137,12 +159,12 @@ def euler2mat(euler):
     return mat
 
 
-def euler2quat(euler):
+def euler2quat(euler, out=None):
     """Convert Euler Angles to Quaternions.
 
     See rotation.py for notes
     """
-    euler = np.asarray(euler, dtype=np.float64)
+    euler = _as_float_array(euler)
     assert euler.shape[-1] == 3, f"Invalid shape euler {euler}"
 
     ai, aj, ak = euler[..., 2] / 2, -euler[..., 1] / 2, euler[..., 0] / 2
@@ -151,7 +173,7 @@ def euler2quat(euler):
     cc, cs = ci * ck, ci * sk
     sc, ss = si * ck, si * sk
 
-    quat = np.empty(euler.shape[:-1] + (4,), dtype=np.float64)
+    quat = _output(out, euler.shape[:-1] + (4,), euler.dtype)
     quat[..., 0] = cj * cc + sj * ss
     quat[..., 3] = cj * sc - sj * cs
     quat[..., 2] = -(cj * ss + sj * cc)
@@ -159,95 +181,177 @@ def euler2quat(euler):
     return quat
 
 
-def mat2euler(mat):
+def _mat2euler(m00, m01, m02, m10, m11, m12, m22, euler, axes=(0, 1, 2)):
+    """Write the Euler Angles of the rotation matrices with the given entries to ``euler``, only for ``axes``."""
+    cy = np.sqrt(m22 * m22 + m12 * m12)
+    condition = cy > _EPS4
+    if 2 in axes:
+        euler[..., 2] = np.where(
+            condition, -np.arctan2(m01, m00), -np.arctan2(-m10, m11)
+        )
+    if 1 in axes:
+        euler[..., 1] = -np.arctan2(-m02, cy)
+    if 0 in axes:
+        euler[..., 0] = np.where(condition, -np.arctan2(m12, m22), 0.0)
+    return euler
+
+
+def _mat2euler_scalar(m00, m01, m02, m10, m11, m12, m22):
+    """Euler Angles of a single float64 rotation matrix, computed on Python floats to skip the array overhead.
+
+    np.arctan2 is used rather than math.atan2, whose results can differ in the last bit.
+    """
+    cy = math.sqrt(m22 * m22 + m12 * m12)
+    if cy > _EPS4:
+        return -np.arctan2(m12, m22), -np.arctan2(-m02, cy), -np.arctan2(m01, m00)
+    return 0.0, -np.arctan2(-m02, cy), -np.arctan2(-m10, m11)
+
+
+def mat2euler(mat, out=None):
     """Convert Rotation Matrix to Euler Angles.
 
     See rotation.py for notes
     """
-    mat = np.asarray(mat, dtype=np.float64)
+    mat = _as_float_array(mat)
     assert mat.shape[-2:] == (3, 3), f"Invalid shape matrix {mat}"
 
-    cy = np.sqrt(mat[..., 2, 2] * mat[..., 2, 2] + mat[..., 1, 2] * mat[..., 1, 2])
-    condition = cy > _EPS4
-    euler = np.empty(mat.shape[:-1], dtype=np.float64)
-    euler[..., 2] = np.where(
-        condition,
-        -np.arctan2(mat[..., 0, 1], mat[..., 0, 0]),
-        -np.arctan2(-mat[..., 1, 0], mat[..., 1, 1]),
+    euler = _output(out, mat.shape[:-1], mat.dtype)
+    if mat.ndim == 2 and mat.dtype == np.float64:
+        (m00, m01, m02), (m10, m11, m12), (_, _, m22) = mat.tolist()
+        euler[:] = _mat2euler_scalar(m00, m01, m02, m10, m11, m12, m22)
+        return euler
+    return _mat2euler(
+        mat[..., 0, 0],
+        mat[..., 0, 1],
+        mat[..., 0, 2],
+        mat[..., 1, 0],
+        mat[..., 1, 1],
+        mat[..., 1, 2],
+        mat[..., 2, 2],
+        euler,
     )
-    euler[..., 1] = np.where(
-        condition, -np.arctan2(-mat[..., 0, 2], cy), -np.arctan2(-mat[..., 0, 2], cy)
-    )
-    euler[..., 0] = np.where(
-        condition, -np.arctan2(mat[..., 1, 2], mat[..., 2, 2]), 0.0
-    )
-    return euler
 
 
-def mat2quat(mat):
+def mat2quat(mat, out=None):
     """Convert Rotation Matrix to Quaternion.
 
     See rotation.py for notes
+
+    Uses the closed form of Shepperd's method: the quaternion is read from the
+    row of the 4x4 symmetric matrix ``4 * q q^T`` with the largest diagonal
+    entry, which is never smaller than 1, so there is no loss of precision
+    near 180 degree rotations. Every element of the batch is converted at once.
+    Like the eigenvector method it replaces, the quaternion with positive w is
+    returned.
+
+    Args:
+        mat: rotation matrices of shape (..., 3, 3).
+        out: optional array of shape (..., 4) to write the quaternions into.
     """
-    mat = np.asarray(mat, dtype=np.float64)
+    mat = _as_float_array(mat)
     assert mat.shape[-2:] == (3, 3), f"Invalid shape matrix {mat}"
 
-    Qxx, Qyx, Qzx = mat[..., 0, 0], mat[..., 0, 1], mat[..., 0, 2]
-    Qxy, Qyy, Qzy = mat[..., 1, 0], mat[..., 1, 1], mat[..., 1, 2]
-    Qxz, Qyz, Qzz = mat[..., 2, 0], mat[..., 2, 1], mat[..., 2, 2]
-    # Fill only lower half of symmetric matrix
-    K = np.zeros(mat.shape[:-2] + (4, 4), dtype=np.float64)
-    K[..., 0, 0] = Qxx - Qyy - Qzz
-    K[..., 1, 0] = Qyx + Qxy
-    K[..., 1, 1] = Qyy - Qxx - Qzz
-    K[..., 2, 0] = Qzx + Qxz
-    K[..., 2, 1] = Qzy + Qyz
-    K[..., 2, 2] = Qzz - Qxx - Qyy
-    K[..., 3, 0] = Qyz - Qzy
-    K[..., 3, 1] = Qzx - Qxz
-    K[..., 3, 2] = Qxy - Qyx
-    K[..., 3, 3] = Qxx + Qyy + Qzz
-    K /= 3.0
-    # TODO: vectorize this -- probably could be made faster
-    q = np.empty(K.shape[:-2] + (4,))
-    it = np.nditer(q[..., 0], flags=["multi_index"])
-    while not it.finished:
-        # Use Hermitian eigenvectors, values for speed
-        vals, vecs = np.linalg.eigh(K[it.multi_index])
-        # Select largest eigenvector, reorder to w,x,y,z quaternion
-        q[it.multi_index] = vecs[[3, 0, 1, 2], np.argmax(vals)]
-        # Prefer quaternion with positive w
-        # (q * -1 corresponds to same rotation as q)
-        if q[it.multi_index][0] < 0:
-            q[it.multi_index] *= -1
-        it.iternext()
-    return q
+    m00, m01, m02 = mat[..., 0, 0], mat[..., 0, 1], mat[..., 0, 2]
+    m10, m11, m12 = mat[..., 1, 0], mat[..., 1, 1], mat[..., 1, 2]
+    m20, m21, m22 = mat[..., 2, 0], mat[..., 2, 1], mat[..., 2, 2]
+    # 4 * q q^T in w, x, y, z order, from the diagonal and the (anti)symmetric parts
+    K = np.empty(mat.shape[:-2] + (4, 4), dtype=mat.dtype)
+    K[..., 0, 0] = 1.0 + m00 + m11 + m22
+    K[..., 1, 1] = 1.0 + m00 - m11 - m22
+    K[..., 2, 2] = 1.0 - m00 + m11 - m22
+    K[..., 3, 3] = 1.0 - m00 - m11 + m22
+    K[..., 0, 1] = K[..., 1, 0] = m21 - m12
+    K[..., 0, 2] = K[..., 2, 0] = m02 - m20
+    K[..., 0, 3] = K[..., 3, 0] = m10 - m01
+    K[..., 1, 2] = K[..., 2, 1] = m01 + m10
+    K[..., 1, 3] = K[..., 3, 1] = m02 + m20
+    K[..., 2, 3] = K[..., 3, 2] = m12 + m21
+
+    # Row of the largest of 4w^2, 4x^2, 4y^2, 4z^2
+    branch = np.argmax(np.diagonal(K, axis1=-2, axis2=-1), axis=-1)
+    q = np.take_along_axis(K, branch[..., np.newaxis, np.newaxis], axis=-2)[..., 0, :]
+    # Normalizing the row also projects slightly non-orthogonal matrices to a unit quaternion
+    quat = _output(out, mat.shape[:-2] + (4,), mat.dtype)
+    np.divide(q, np.linalg.norm(q, axis=-1, keepdims=True), out=quat)
+    # Prefer quaternion with positive w
+    # (q * -1 corresponds to same rotation as q)
+    np.negative(quat, out=quat, where=quat[..., :1] < 0)
+    return quat
 
 
-def quat2euler(quat):
+def _quat2mat_entries(w, x, y, z):
+    """Entries of the rotation matrix used by `mat2euler`, computed like `quat2mat`."""
+    Nq = w * w + x * x + y * y + z * z
+    s = 2.0 / Nq
+    X, Y, Z = x * s, y * s, z * s
+    wX, wY, wZ = w * X, w * Y, w * Z
+    xX, xY, xZ = x * X, x * Y, x * Z
+    yY, yZ, zZ = y * Y, y * Z, z * Z
+    return (
+        1.0 - (yY + zZ),
+        xY - wZ,
+        xZ + wY,
+        xY + wZ,
+        1.0 - (xX + zZ),
+        yZ - wX,
+        1.0 - (xX + yY),
+    )
+
+
+def _quat2euler_scalar(w, x, y, z):
+    """Euler Angles of a single float64 quaternion, computed on Python floats."""
+    if w * w + x * x + y * y + z * z > _FLOAT_EPS:
+        return _mat2euler_scalar(*_quat2mat_entries(w, x, y, z))
+    return 0.0, 0.0, 0.0
+
+
+def _euler2quat_scalar(ex, ey, ez):
+    """Quaternion of single Euler Angles, computed on Python floats like `euler2quat`."""
+    ai, aj, ak = ez / 2, -ey / 2, ex / 2
+    si, sj, sk = np.sin(ai), np.sin(aj), np.sin(ak)
+    ci, cj, ck = np.cos(ai), np.cos(aj), np.cos(ak)
+    cc, cs = ci * ck, ci * sk
+    sc, ss = si * ck, si * sk
+    return cj * cc + sj * ss, cj * cs - sj * sc, -(cj * ss + sj * cc), cj * sc - sj * cs
+
+
+def quat2euler(quat, out=None):
     """Convert Quaternion to Euler Angles.
 
     See rotation.py for notes
+
+    Equivalent to ``mat2euler(quat2mat(quat))``, without building the rotation matrices.
     """
-    return mat2euler(quat2mat(quat))
+    quat = _as_float_array(quat)
+    assert quat.shape[-1] == 4, f"Invalid shape quat {quat}"
 
+    euler = _output(out, quat.shape[:-1] + (3,), quat.dtype)
+    if quat.ndim == 1 and quat.dtype == np.float64:
+        euler[:] = _quat2euler_scalar(*quat.tolist())
+        return euler
+
+    w, x, y, z = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    _mat2euler(*_quat2mat_entries(w, x, y, z), euler)
+    # Like quat2mat, quaternions with a norm close to 0 are the identity rotation
+    euler[~(np.sum(quat * quat, axis=-1) > _FLOAT_EPS)] = 0.0
+    return euler
 
-def subtract_euler(e1, e2):
 
+def subtract_euler(e1, e2, out=None):
     assert e1.shape == e2.shape
     assert e1.shape[-1] == 3
     q1 = euler2quat(e1)
     q2 = euler2quat(e2)
-    q_diff = quat_mul(q1, quat_conjugate(q2))
-    return quat2euler(q_diff)
+    q_diff = quat_mul(q1, quat_conjugate(q2, out=q2), out=q1)
+    return quat2euler(q_diff, out=out)
 
 
-def quat2mat(quat):
+def quat2mat(quat, out=None):
     """Convert Quaternion to Euler Angles.
 
     See rotation.py for notes
     """
-    quat = np.asarray(quat, dtype=np.float64)
+    quat = _as_float_array(quat)
     assert quat.shape[-1] == 4, f"Invalid shape quat {quat}"
 
     w, x, y, z = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
@@ -258,7 +362,7 @@ def quat2mat(quat):
     xX, xY, xZ = x * X, x * Y, x * Z
     yY, yZ, zZ = y * Y, y * Z, z * Z
 
-    mat = np.empty(quat.shape[:-1] + (3, 3), dtype=np.float64)
+    mat = _output(out, quat.shape[:-1] + (3, 3), quat.dtype)
     mat[..., 0, 0] = 1.0 - (yY + zZ)
     mat[..., 0, 1] = xY - wZ
     mat[..., 0, 2] = xZ + wY
@@ -268,16 +372,17 @@ def quat2mat(quat):
     mat[..., 2, 0] = xZ - wY
     mat[..., 2, 1] = yZ + wX
     mat[..., 2, 2] = 1.0 - (xX + yY)
-    return np.where((Nq > _FLOAT_EPS)[..., np.newaxis, np.newaxis], mat, np.eye(3))
+    mat[~(Nq > _FLOAT_EPS)] = np.eye(3)
+    return mat
 
 
-def quat_conjugate(q):
-    inv_q = -q
+def quat_conjugate(q, out=None):
+    inv_q = np.negative(q, out=out)
     inv_q[..., 0] *= -1
     return inv_q
 
 
-def quat_mul(q0, q1):
+def quat_mul(q0, q1, out=None):
     assert q0.shape == q1.shape
     assert q0.shape[-1] == 4
     assert q1.shape[-1] == 4
@@ -296,13 +401,64 @@ def quat_mul(q0, q1):
     x = w0 * x1 + x0 * w1 + y0 * z1 - z0 * y1
     y = w0 * y1 + y0 * w1 + z0 * x1 - x0 * z1
     z = w0 * z1 + z0 * w1 + x0 * y1 - y0 * x1
-    q = np.array([w, x, y, z])
-    if q.ndim == 2:
-        q = q.swapaxes(0, 1)
-    assert q.shape == q0.shape
+    # The components are computed before writing, so out can be q0 or q1
+    q = _output(out, q0.shape, np.result_type(q0, q1))
+    q[..., 0] = w
+    q[..., 1] = x
+    q[..., 2] = y
+    q[..., 3] = z
     return q
 
 
+def _replace_euler_z(q0, q1):
+    """Quaternions with the X and Y Euler Angles of q0 and the Z Euler Angle of q1."""
+    if q0.ndim == 1 and q0.dtype == np.float64 and q1.dtype == np.float64:
+        ex, ey, _ = _quat2euler_scalar(*q0.tolist())
+        _, _, ez = _quat2euler_scalar(*q1.tolist())
+        return np.array(_euler2quat_scalar(ex, ey, ez))
+    q0, q1 = _as_float_array(q0), _as_float_array(q1)
+    euler = np.empty(q0.shape[:-1] + (3,), dtype=np.result_type(q0, q1))
+    # Like quat2euler, but only the needed angles are computed
+    for quat, axes in [(q0, (0, 1)), (q1, (2,))]:
+        w, x, y, z = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+        _mat2euler(*_quat2mat_entries(w, x, y, z), euler, axes=axes)
+        euler[~(np.sum(quat * quat, axis=-1) > _FLOAT_EPS), axes[0] : axes[-1] + 1] = (
+            0.0
+        )
+    return euler2quat(euler, out=np.empty(q0.shape, dtype=euler.dtype))
+
+
+def quat_diff_angle(q0, q1, ignore_z=False, out=None):
+    """Angle in [0, 2 pi] of the rotation between quaternions, i.e. of ``quat_mul(q0, quat_conjugate(q1))``.
+
+    Only the w component of the difference quaternion is computed.
+
+    With ``ignore_z``, the rotation about the Z axis is ignored: the Z Euler
+    Angle of q0 is replaced by the one of q1 first, which gives the same angle as
+    converting q0 to Euler Angles, setting their Z component and converting
+    them back to a quaternion. Single float64 quaternions are converted
+    without intermediate arrays.
+    """
+    assert q0.shape == q1.shape
+    assert q0.shape[-1] == 4
+
+    if ignore_z:
+        q0 = _replace_euler_z(q0, q1)
+
+    w = (
+        q0[..., 0] * q1[..., 0]
+        + q0[..., 1] * q1[..., 1]
+        + q0[..., 2] * q1[..., 2]
+        + q0[..., 3] * q1[..., 3]
+    )
+    if out is None:
+        return 2 * np.arccos(np.clip(w, -1.0, 1.0))
+    np.clip(w, -1.0, 1.0, out=out)
+    np.arccos(out, out=out)
+    out *= 2
+    return out
+
+
 def quat_rot_vec(q, v0):
     q_v0 = np.array([0, v0[0], v0[1], v0[2]])
     q_v = quat_mul(q, quat_mul(q_v0, quat_conjugate(q)))
@@ -408,6 +564,17 @@ def get_parallel_rotations():
     return parallel_rotations
 
 
+@functools.lru_cache(maxsize=None)
+def get_parallel_quats():
+    """Quaternions of the 24 rotations of `get_parallel_rotations`, as a read-only array of shape (24, 4).
+
+    The table is computed once per process and shared by all its callers.
+    """
+    parallel_quats = np.array([euler2quat(r) for r in get_parallel_rotations()])
+    parallel_quats.flags.writeable = False
+    return parallel_quats
+
+
 def unit_vector(data, axis=None, out=None):
     """
     Returns ndarray normalized by length, i.e. eucledian norm, along axis.
@@ -434,73 +601,77 @@ def unit_vector(data, axis=None, out=None):
         >>> list(unit_vector([1.0]))
         [1.0]
     Args:
-        data (np.array): data to normalize
+        data (np.array): data to normalize, float32 and float64 data keep their dtype
         axis (None or int): If specified, determines specific axis along data to normalize
         out (None or np.array): If specified, will store computation in this variable
     Returns:
         None or np.array: If @out is not specified, will return normalized vector. Otherwise, stores the output in @out
     """
     if out is None:
-        data = np.array(data, dtype=np.float32, copy=True)
+        data = _as_float_array(data).copy()
         if data.ndim == 1:
             data /= math.sqrt(np.dot(data, data))
             return data
     else:
         if out is not data:
-            out[:] = np.array(data, copy=False)
+            out[:] = np.asarray(data)
         data = out
-    length = np.atleast_1d(np.sum(data * data, axis))
-    np.sqrt(length, length)
-    if axis is not None:
-        length = np.expand_dims(length, axis)
+    length = np.sum(data * data, axis=axis, keepdims=True)
+    np.sqrt(length, out=length)
     data /= length
     if out is None:
         return data
 
 
-def quat_slerp(quat0, quat1, fraction, shortestpath=True):
+def quat_slerp(quat0, quat1, fraction, shortestpath=True, out=None):
     """
     Return spherical linear interpolation between two quaternions.
+
+    Batches of quaternions of shape (..., 4) and of fractions of shape (...) are
+    interpolated at once, e.g. N pairs of quaternions with N fractions, or a
+    single pair of quaternions with N fractions. The quaternions are normalized
+    first and are not modified.
     E.g.:
-    >>> q0 = random_quat()
-    >>> q1 = random_quat()
+    >>> q0 = euler2quat(np.array([0.0, 0.0, 0.0]))
+    >>> q1 = euler2quat(np.array([0.0, 0.0, 1.0]))
     >>> q = quat_slerp(q0, q1, 0.0)
     >>> np.allclose(q, q0)
     True
     >>> q = quat_slerp(q0, q1, 1.0)
     >>> np.allclose(q, q1)
     True
-    >>> q = quat_slerp(q0, q1, 0.5)
-    >>> angle = math.acos(np.dot(q0, q))
-    >>> np.allclose(2.0, math.acos(np.dot(q0, q1)) / angle) or \
-        np.allclose(2.0, math.acos(-np.dot(q0, q1)) / angle)
+    >>> q = quat_slerp(q0, q1, np.linspace(0.0, 1.0, 5))
+    >>> np.allclose(quat2euler(q)[:, 2], np.linspace(0.0, 1.0, 5))
     True
     Args:
-        quat0 (np.array): (x,y,z,w) quaternion startpoint
-        quat1 (np.array): (x,y,z,w) quaternion endpoint
-        fraction (float): fraction of interpolation to calculate
+        quat0 (np.array): (..., 4) quaternion startpoints
+        quat1 (np.array): (..., 4) quaternion endpoints
+        fraction (float or np.array): fractions of interpolation to calculate
         shortestpath (bool): If True, will calculate the shortest path
+        out (None or np.array): If specified, will store the quaternions in this variable
     Returns:
-        np.array: (x,y,z,w) quaternion distance
+        np.array: (..., 4) interpolated quaternions
     """
-    q0 = unit_vector(quat0[:4])
-    q1 = unit_vector(quat1[:4])
-    if fraction == 0.0:
-        return q0
-    elif fraction == 1.0:
-        return q1
-    d = np.dot(q0, q1)
-    if abs(abs(d) - 1.0) < _EPS4:
-        return q0
-    if shortestpath and d < 0.0:
+    q0 = unit_vector(_as_float_array(quat0)[..., :4], axis=-1)
+    q1 = unit_vector(_as_float_array(quat1)[..., :4], axis=-1)
+    fraction = np.asarray(fraction, dtype=q0.dtype)[..., np.newaxis]
+
+    d = np.sum(q0 * q1, axis=-1, keepdims=True)
+    # Quaternions of the same rotation (up to the sign) are not interpolated
+    keep_q0 = (np.abs(np.abs(d) - 1.0) < _EPS4) | (fraction == 0.0)
+    q1_path = q1
+    if shortestpath:
         # invert rotation
-        d = -d
-        q1 *= -1.0
-    angle = math.acos(np.clip(d, -1, 1))
-    if abs(angle) < _EPS4:
-        return q0
-    isin = 1.0 / math.sin(angle)
-    q0 *= math.sin((1.0 - fraction) * angle) * isin
-    q1 *= math.sin(fraction * angle) * isin
-    q0 += q1
-    return q0
+        invert = d < 0.0
+        d = np.where(invert, -d, d)
+        q1_path = np.where(invert, -q1, q1)
+    angle = np.arccos(np.clip(d, -1, 1))
+    keep_q0 |= np.abs(angle) < _EPS4
+
+    isin = 1.0 / np.where(keep_q0, 1.0, np.sin(angle))
+    w0 = np.where(keep_q0, 1.0, np.sin((1.0 - fraction) * angle) * isin)
+    w1 = np.where(keep_q0, 0.0, np.sin(fraction * angle) * isin)
+    quat = np.add(w0 * q0, w1 * q1_path, out=out)
+    # The endpoint is returned as given, even when it is not on the shortest path
+    np.copyto(quat, q1, where=fraction == 1.0)
+    return quat
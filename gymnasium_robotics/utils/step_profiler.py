@@ -0,0 +1,162 @@
+"""Opt-in per-phase timing of the ``step`` method of the robot environments."""
+
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+STEP_PHASES = (
+    "clip_action",
+    "set_action",
+    "mujoco_step",
+    "step_callback",
+    "get_obs",
+    "is_success",
+    "compute_terminated",
+    "compute_truncated",
+    "compute_reward",
+)
+
+
+class StepProfiler:
+    """Ring buffer of the per-phase durations and simulation counters of the last ``capacity`` steps.
+
+    Every step records one row with the duration in nanoseconds of each phase of :data:`STEP_PHASES`, measured with
+    ``time.perf_counter_ns``, and the simulation counters after the step: the number of contacts ``ncon``, the number
+    of constraint solver iterations and the number of MuJoCo warnings raised during the step. Recording a step only
+    writes a few integers into preallocated arrays, so the profiler can be left enabled in long sampling runs.
+
+    A step is timed with :meth:`begin`, one :meth:`lap` at the end of each phase and :meth:`record`. The work done
+    between a :meth:`lap` and :meth:`resume` (e.g. the ``"human"`` rendering) is not part of any phase.
+
+    The profiler is enabled with :meth:`BaseRobotEnv.enable_step_profiling`.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize an empty ring buffer.
+
+        Args:
+            capacity (integer): number of steps kept in the ring buffer. Defaults to 1024.
+        """
+        if capacity <= 0:
+            raise ValueError(f"The capacity must be positive, got {capacity}.")
+        self.capacity = capacity
+        self.num_steps = 0
+
+        self._durations = np.zeros((capacity, len(STEP_PHASES)), dtype=np.int64)
+        self._ncon = np.zeros(capacity, dtype=np.int64)
+        self._solver_iter = np.zeros(capacity, dtype=np.int64)
+        self._warnings = np.zeros(capacity, dtype=np.int64)
+        self._last_warning_count = 0
+        self._warning_data = None
+        self._warning_counter = None
+        self._phase = 0
+        self._mark = 0
+
+    def begin(self):
+        """Start timing a new step with its first phase."""
+        self._phase = 0
+        self._mark = time.perf_counter_ns()
+
+    def lap(self):
+        """End the current phase of the step and start the next one."""
+        now = time.perf_counter_ns()
+        self._durations[self.num_steps % self.capacity, self._phase] = now - self._mark
+        self._phase += 1
+        self._mark = now
+
+    def resume(self):
+        """Start the current phase again, leaving the time since the last :meth:`lap` out of the phases."""
+        self._mark = time.perf_counter_ns()
+
+    def record(self, data):
+        """Record the simulation counters of the step timed since :meth:`begin` and move to the next row.
+
+        Args:
+            data: the simulation data of the bindings of the environment after the step, the ``MjData`` of the
+                mujoco bindings or the ``sim.data`` of mujoco-py.
+        """
+        if self._phase != len(STEP_PHASES):
+            raise RuntimeError(
+                f"Expected {len(STEP_PHASES)} timed phases, got {self._phase}."
+            )
+        row = self.num_steps % self.capacity
+        self._ncon[row] = data.ncon
+        self._solver_iter[row] = _solver_iterations(data)
+
+        # The warning counters are cumulative and cleared when the simulation is reset.
+        if data is not self._warning_data:
+            self._warning_data = data
+            self._warning_counter = _warning_counter(data)
+        warning_count = self._warning_counter()
+        if warning_count < self._last_warning_count:
+            self._last_warning_count = 0
+        self._warnings[row] = warning_count - self._last_warning_count
+        self._last_warning_count = warning_count
+
+        self.num_steps += 1
+
+    def clear(self):
+        """Remove all the recorded steps."""
+        self.num_steps = 0
+        self._last_warning_count = 0
+
+    def records(self) -> Dict[str, np.ndarray]:
+        """Return the recorded steps in chronological order.
+
+        Returns:
+            Dictionary with one array per phase (durations in nanoseconds) and the ``"ncon"``, ``"solver_iter"`` and
+            ``"warnings"`` arrays of the simulation counters.
+        """
+        n = min(self.num_steps, self.capacity)
+        order = (np.arange(n) + self.num_steps - n) % self.capacity
+        phase_ns = self._durations[order]
+        records = {phase: phase_ns[:, i] for i, phase in enumerate(STEP_PHASES)}
+        records["ncon"] = self._ncon[order]
+        records["solver_iter"] = self._solver_iter[order]
+        records["warnings"] = self._warnings[order]
+        return records
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return aggregate statistics of the steps in the ring buffer.
+
+        Returns:
+            Dictionary with the ``"mean"``, ``"p50"``, ``"p99"`` and ``"max"`` of every phase duration (in
+            nanoseconds) and of the ``"ncon"`` and ``"solver_iter"`` counters, the ``"total"`` of the
+            ``"warnings"``, and the ``"fraction"`` of the step time spent in every phase.
+        """
+        records = self.records()
+        if len(records["ncon"]) == 0:
+            return {}
+
+        total_ns = sum(records[phase].sum() for phase in STEP_PHASES)
+        summary = {}
+        for key, values in records.items():
+            if key == "warnings":
+                summary[key] = {"total": int(values.sum())}
+                continue
+            summary[key] = {
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p99": float(np.percentile(values, 99)),
+                "max": float(values.max()),
+            }
+            if key in STEP_PHASES:
+                summary[key]["fraction"] = float(values.sum() / max(total_ns, 1))
+        return summary
+
+
+def _warning_counter(data) -> Callable[[], int]:
+    """Return a function that counts the warnings raised so far by the simulation ``data``."""
+    if hasattr(data.warning, "number"):
+        # View on the warning counters of the mujoco bindings, updated in place by the simulation.
+        number = data.warning.number
+        return lambda: int(number.sum())
+    return lambda: sum(warning.number for warning in data.warning)
+
+
+def _solver_iterations(data) -> int:
+    # `solver_iter` was replaced by the per island `solver_niter` array in mujoco 3.0
+    if hasattr(data, "solver_niter"):
+        return int(np.sum(data.solver_niter))
+    return int(data.solver_iter)
@@ -0,0 +1,3 @@
+# noqa: D104
+from gymnasium_robotics.vector.batched_robot_env import MujocoBatchedRobotEnv
+from gymnasium_robotics.vector.thread_vector_env import ThreadVectorEnv
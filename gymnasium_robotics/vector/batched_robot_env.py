@@ -0,0 +1,272 @@
+"""Vectorized MuJoCo robot environment that shares a single ``MjModel`` across all sub-environments."""
+
+from copy import deepcopy
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.utils import seeding
+from gymnasium.vector import VectorEnv
+from gymnasium.vector.utils import batch_space, create_empty_array
+
+from gymnasium_robotics.envs.robot_env import MujocoRobotEnv
+from gymnasium_robotics.utils.goal_sampler import GoalSampler
+
+try:
+    from gymnasium.vector import AutoresetMode
+except ImportError:  # gymnasium < 1.1 only has the next-step autoreset
+    AutoresetMode = None
+
+# Attributes of the environments with the samplers that serve blocks of pre-drawn goals or initial states
+SLOT_SAMPLERS = ("goal_sampler", "object_sampler")
+# Attributes of the environments with the pools of initial states, whose seed stream is selected on seeded resets
+SLOT_POOLS = ("reset_state_pool",)
+
+
+class MujocoBatchedRobotEnv(VectorEnv):
+    """Runs ``num_envs`` instances of a :class:`MujocoRobotEnv` with one ``MjModel`` and ``num_envs`` ``MjData``.
+
+    A single environment instance is built with ``env_fn`` and its compiled ``MjModel`` is shared by every slot. Each
+    slot owns its ``MjData``, goal and random number generator, which are swapped into the template environment before
+    calling its :class:`BaseRobotEnv` hooks (``_reset_sim`` and ``_next_goal`` on reset, and the phases of
+    :meth:`BaseRobotEnv.step` on step, which are recorded by the ``step_profiler`` of the template environment if it is
+    enabled). Therefore any Fetch or Shadow Dexterous Hand environment can be batched without subprocesses and without
+    loading the MJCF file more than once.
+
+    The environment follows the Gymnasium ``VectorEnv`` API with next-step autoreset: after a slot is terminated or
+    truncated, the following call to :meth:`step` resets that slot and ignores its action. Single slots can be reset
+    at any time with ``reset(options={"reset_mask": mask})``.
+
+    Example:
+        >>> import gymnasium as gym
+        >>> import gymnasium_robotics
+        >>> from gymnasium_robotics.vector import MujocoBatchedRobotEnv
+        >>> gym.register_envs(gymnasium_robotics)
+        >>> envs = MujocoBatchedRobotEnv(lambda: gym.make("FetchReach-v4"), num_envs=4)
+        >>> obs, info = envs.reset(seed=42)
+        >>> obs["observation"].shape
+        (4, 10)
+        >>> obs, reward, terminated, truncated, info = envs.step(envs.action_space.sample())
+        >>> reward.shape
+        (4,)
+    """
+
+    def __init__(
+        self,
+        env_fn: Callable[[], gym.Env],
+        num_envs: int,
+        max_episode_steps: Optional[int] = None,
+        copy: bool = True,
+    ):
+        """Initialize the batched environment.
+
+        Args:
+            env_fn (callable): function that creates the environment to batch. The unwrapped environment must be a :class:`MujocoRobotEnv`.
+            num_envs (integer): number of sub-environments (slots).
+            max_episode_steps (optional integer): number of steps after which a slot is truncated. Defaults to the ``max_episode_steps`` of the environment spec, if any.
+            copy (boolean): if ``True`` the observations returned by :meth:`reset` and :meth:`step` are copies of the internal buffers. Defaults to True.
+
+        Raises:
+            TypeError: if the unwrapped environment is not a :class:`MujocoRobotEnv`.
+        """
+        env = env_fn()
+        if not isinstance(env.unwrapped, MujocoRobotEnv):
+            raise TypeError(
+                f"MujocoBatchedRobotEnv only supports MujocoRobotEnv environments, got {type(env.unwrapped)}."
+            )
+        if max_episode_steps is None and env.spec is not None:
+            max_episode_steps = env.spec.max_episode_steps
+
+        self.env = env.unwrapped
+        self.num_envs = num_envs
+        self.max_episode_steps = max_episode_steps
+        self.copy = copy
+
+        self.metadata = dict(self.env.metadata)
+        if AutoresetMode is not None:
+            self.metadata["autoreset_mode"] = AutoresetMode.NEXT_STEP
+        self.render_mode = None
+
+        self.single_action_space = self.env.action_space
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.single_observation_space = self.env.observation_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+        # One MjModel shared by every slot, one MjData per slot cloned from the initialized template.
+        self.model = self.env.model
+        self.datas = [self.env.data] + [
+            deepcopy(self.env.data) for _ in range(num_envs - 1)
+        ]
+        self.goals = np.zeros(
+            (num_envs,) + self.single_observation_space["desired_goal"].shape,
+            dtype=np.float64,
+        )
+        self._np_randoms: List[Optional[np.random.Generator]] = [None] * num_envs
+        # The blocks of the goal and object samplers are drawn with the random generator of a slot, so every slot
+        # needs its own samplers.
+        samplers = {
+            name: getattr(self.env, name)
+            for name in SLOT_SAMPLERS
+            if getattr(self.env, name, None) is not None
+        }
+        self._samplers = [
+            {
+                name: GoalSampler(sampler.draw_fn, sampler.block_size)
+                for name, sampler in samplers.items()
+            }
+            for _ in range(num_envs)
+        ]
+        # The pools of initial states select their seed stream on seeded resets, so every slot needs its own pools.
+        # The pools of the template have not been used yet, apart from the states loaded from a file.
+        self._pools = [
+            {
+                name: deepcopy(getattr(self.env, name))
+                for name in SLOT_POOLS
+                if getattr(self.env, name, None) is not None
+            }
+            for _ in range(num_envs)
+        ]
+
+        self._observations = create_empty_array(
+            self.single_observation_space, n=num_envs, fn=np.zeros
+        )
+        self._rewards = np.zeros((num_envs,), dtype=np.float64)
+        self._terminations = np.zeros((num_envs,), dtype=np.bool_)
+        self._truncations = np.zeros((num_envs,), dtype=np.bool_)
+        self._successes = np.zeros((num_envs,), dtype=np.float64)
+        self._elapsed_steps = np.zeros((num_envs,), dtype=np.int64)
+        self._autoreset_envs = np.zeros((num_envs,), dtype=np.bool_)
+
+    def reset(
+        self,
+        *,
+        seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        """Reset all the slots, or the slots selected by ``options["reset_mask"]``.
+
+        Args:
+            seed (optional integer or list): ``None`` for random seeds, an integer ``seed`` for seeds ``[seed, seed + 1, ...]``, or a list with one seed per slot.
+            options (optional dictionary): can contain a boolean ``"reset_mask"`` array of shape ``(num_envs,)`` selecting the slots to reset.
+
+        Returns:
+            observation (dictionary): stacked observations of all the slots.
+            info (dictionary): empty dictionary.
+        """
+        if seed is None:
+            seed = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(
+                f"If seeds are passed as a list the length must match num_envs={self.num_envs} but got length={len(seed)}."
+            )
+
+        reset_mask = np.ones((self.num_envs,), dtype=np.bool_)
+        if options is not None and "reset_mask" in options:
+            reset_mask = np.asarray(options["reset_mask"], dtype=np.bool_)
+            if reset_mask.shape != (self.num_envs,):
+                raise ValueError(
+                    f"`options['reset_mask']` must have shape `({self.num_envs},)`, got {reset_mask.shape}"
+                )
+
+        for i in np.flatnonzero(reset_mask):
+            self._reset_slot(i, seed[i])
+
+        return self._get_observations(), {}
+
+    def step(self, actions: np.ndarray):
+        """Step every slot with its action from ``actions``.
+
+        Args:
+            actions (np.ndarray): array of shape ``(num_envs, n_actions)``.
+
+        Returns:
+            observation (dictionary): stacked observations of all the slots.
+            reward (np.ndarray): array of shape ``(num_envs,)`` with the rewards of each slot.
+            terminated (np.ndarray): boolean array of shape ``(num_envs,)``.
+            truncated (np.ndarray): boolean array of shape ``(num_envs,)``.
+            info (dictionary): contains the ``is_success`` array of the slots and its ``_is_success`` mask.
+        """
+        actions = np.asarray(actions)
+        if actions.shape != self.action_space.shape:
+            raise ValueError("Action dimension mismatch")
+
+        env = self.env
+        stepped = ~self._autoreset_envs
+        for i in range(self.num_envs):
+            if self._autoreset_envs[i]:
+                self._reset_slot(i, None)
+                self._rewards[i] = 0.0
+                continue
+
+            self._activate(i)
+            (
+                obs,
+                self._rewards[i],
+                self._terminations[i],
+                self._truncations[i],
+                info,
+            ) = env._step_phases(actions[i], env.step_profiler)
+            self._write_observation(i, obs)
+            self._successes[i] = info["is_success"]
+            self._elapsed_steps[i] += 1
+
+        if self.max_episode_steps is not None:
+            self._truncations |= self._elapsed_steps >= self.max_episode_steps
+        self._autoreset_envs = self._terminations | self._truncations
+
+        infos = {"is_success": self._successes.copy(), "_is_success": stepped}
+        return (
+            self._get_observations(),
+            self._rewards.copy(),
+            self._terminations.copy(),
+            self._truncations.copy(),
+            infos,
+        )
+
+    def close_extras(self, **kwargs):
+        """Close the template environment."""
+        self.env.close()
+
+    def _activate(self, index: int):
+        """Swap the simulation data, goal, random generator, samplers and pools of slot ``index`` into the template environment."""
+        self.env.data = self.datas[index]
+        self.env.goal = self.goals[index]
+        self.env._np_random = self._np_randoms[index]
+        for name, sampler in self._samplers[index].items():
+            setattr(self.env, name, sampler)
+        for name, pool in self._pools[index].items():
+            setattr(self.env, name, pool)
+
+    def _reset_slot(self, index: int, seed: Optional[int]):
+        if seed is not None or self._np_randoms[index] is None:
+            self._np_randoms[index], _ = seeding.np_random(seed)
+            for sampler in self._samplers[index].values():
+                sampler.clear()
+        if seed is not None:
+            # Same as the `reset` of the environments with a pool, e.g. `MujocoManipulateEnv.reset`
+            for pool in self._pools[index].values():
+                pool.select_stream(seed)
+        self._activate(index)
+
+        env = self.env
+        did_reset_sim = False
+        while not did_reset_sim:
+            did_reset_sim = env._reset_sim()
+        self.goals[index] = env._next_goal()
+        self._write_observation(index, env._get_obs())
+
+        self._terminations[index] = False
+        self._truncations[index] = False
+        self._autoreset_envs[index] = False
+        self._elapsed_steps[index] = 0
+
+    def _write_observation(self, index: int, obs: Dict[str, np.ndarray]):
+        for key, value in obs.items():
+            self._observations[key][index] = value
+
+    def _get_observations(self):
+        if self.copy:
+            return {key: value.copy() for key, value in self._observations.items()}
+        return self._observations
@@ -0,0 +1,238 @@
+"""Vectorized environment that steps its sub-environments on a pool of worker threads."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv
+from gymnasium.vector.utils import batch_space, create_empty_array
+
+try:
+    from gymnasium.vector import AutoresetMode
+except ImportError:  # gymnasium < 1.1 only has the next-step autoreset
+    AutoresetMode = None
+
+
+class ThreadVectorEnv(VectorEnv):
+    """Vectorized environment that runs the sub-environments on worker threads.
+
+    ``mujoco.mj_step`` releases the GIL while the physics is integrated, so the simulation of several sub-environments
+    can run concurrently on multiple cores from a single process. Each worker thread steps a fixed chunk of
+    sub-environments and writes their observations, rewards, terminations and truncations directly into preallocated
+    numpy buffers that are shared with the main thread. Unlike :class:`gymnasium.vector.AsyncVectorEnv` there are no
+    subprocesses and observations are never pickled.
+
+    Any environment registered by ``gymnasium_robotics`` can be used (Fetch, Shadow Dexterous Hand, Maze, Kitchen, Adroit),
+    as long as its observation space is a ``Box`` or a (nested) ``Dict`` of ``Box`` spaces. The environment follows the
+    Gymnasium ``VectorEnv`` API with next-step autoreset.
+
+    Example:
+        >>> import gymnasium as gym
+        >>> import gymnasium_robotics
+        >>> from gymnasium_robotics.vector import ThreadVectorEnv
+        >>> gym.register_envs(gymnasium_robotics)
+        >>> envs = ThreadVectorEnv([lambda: gym.make("FetchPush-v4") for _ in range(8)], num_workers=4)
+        >>> obs, info = envs.reset(seed=42)
+        >>> obs["observation"].shape
+        (8, 25)
+    """
+
+    def __init__(
+        self,
+        env_fns: Sequence[Callable[[], gym.Env]],
+        num_workers: Optional[int] = None,
+        copy: bool = True,
+    ):
+        """Initialize the thread vector environment.
+
+        Args:
+            env_fns (list): functions that create the sub-environments.
+            num_workers (optional integer): number of worker threads. Defaults to the number of sub-environments.
+            copy (boolean): if ``True`` the observations returned by :meth:`reset` and :meth:`step` are copies of the shared buffers. Defaults to True.
+        """
+        self.env_fns = env_fns
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.num_envs = len(self.envs)
+        self.num_workers = min(num_workers or self.num_envs, self.num_envs)
+        self.copy = copy
+
+        self.metadata = dict(self.envs[0].metadata)
+        if AutoresetMode is not None:
+            self.metadata["autoreset_mode"] = AutoresetMode.NEXT_STEP
+        self.render_mode = self.envs[0].render_mode
+
+        self.single_action_space = self.envs[0].action_space
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+        self.single_observation_space = self.envs[0].observation_space
+        self.observation_space = batch_space(
+            self.single_observation_space, self.num_envs
+        )
+        for env in self.envs:
+            if env.observation_space != self.single_observation_space:
+                raise RuntimeError(
+                    "ThreadVectorEnv requires the sub-environments to have the same observation space."
+                )
+
+        self._observations = create_empty_array(
+            self.single_observation_space, n=self.num_envs, fn=np.zeros
+        )
+        self._rewards = np.zeros((self.num_envs,), dtype=np.float64)
+        self._terminations = np.zeros((self.num_envs,), dtype=np.bool_)
+        self._truncations = np.zeros((self.num_envs,), dtype=np.bool_)
+        self._autoreset_envs = np.zeros((self.num_envs,), dtype=np.bool_)
+        self._env_infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+
+        self._chunks = [
+            chunk
+            for chunk in np.array_split(np.arange(self.num_envs), self.num_workers)
+            if len(chunk) > 0
+        ]
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix="ThreadVectorEnv"
+        )
+
+    def reset(
+        self,
+        *,
+        seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        """Reset all the sub-environments, or the ones selected by ``options["reset_mask"]``.
+
+        Args:
+            seed (optional integer or list): ``None`` for random seeds, an integer ``seed`` for seeds ``[seed, seed + 1, ...]``, or a list with one seed per sub-environment.
+            options (optional dictionary): passed to the sub-environments. It can contain a boolean ``"reset_mask"`` array of shape ``(num_envs,)``.
+
+        Returns:
+            observation: batched observations of the sub-environments.
+            info (dictionary): batched infos of the reset sub-environments.
+        """
+        if seed is None:
+            seed = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(
+                f"If seeds are passed as a list the length must match num_envs={self.num_envs} but got length={len(seed)}."
+            )
+
+        options = dict(options) if options is not None else {}
+        reset_mask = np.asarray(
+            options.pop("reset_mask", np.ones((self.num_envs,), dtype=np.bool_)),
+            dtype=np.bool_,
+        )
+        if reset_mask.shape != (self.num_envs,):
+            raise ValueError(
+                f"`options['reset_mask']` must have shape `({self.num_envs},)`, got {reset_mask.shape}"
+            )
+
+        def reset_chunk(chunk):
+            for i in chunk:
+                if reset_mask[i]:
+                    self._reset_env(i, seed[i], options or None)
+
+        list(self._executor.map(reset_chunk, self._chunks))
+
+        infos = {}
+        for i in np.flatnonzero(reset_mask):
+            infos = self._add_info(infos, self._env_infos[i], i)
+        return self._get_observations(), infos
+
+    def step(self, actions):
+        """Step the sub-environments with their respective actions on the worker threads.
+
+        Args:
+            actions: batched actions of shape :attr:`action_space`.
+
+        Returns:
+            The batched observations, rewards, terminations, truncations and infos of the sub-environments.
+        """
+        actions = np.asarray(actions)
+        list(
+            self._executor.map(
+                lambda chunk: self._step_chunk(chunk, actions), self._chunks
+            )
+        )
+
+        infos = {}
+        for i in range(self.num_envs):
+            infos = self._add_info(infos, self._env_infos[i], i)
+        self._autoreset_envs = np.logical_or(self._terminations, self._truncations)
+
+        return (
+            self._get_observations(),
+            np.copy(self._rewards),
+            np.copy(self._terminations),
+            np.copy(self._truncations),
+            infos,
+        )
+
+    def render(self):
+        """Returns the rendered frames from the sub-environments."""
+        return tuple(env.render() for env in self.envs)
+
+    def call(self, name: str, *args, **kwargs):
+        """Call a method or get an attribute with ``name`` from every sub-environment."""
+        results = []
+        for env in self.envs:
+            function = env.get_wrapper_attr(name)
+            results.append(
+                function(*args, **kwargs) if callable(function) else function
+            )
+        return tuple(results)
+
+    def get_attr(self, name: str):
+        """Get the attribute ``name`` from every sub-environment."""
+        return self.call(name)
+
+    def close_extras(self, **kwargs):
+        """Shut down the worker threads and close the sub-environments."""
+        if hasattr(self, "_executor"):
+            self._executor.shutdown(wait=True)
+        if hasattr(self, "envs"):
+            for env in self.envs:
+                env.close()
+
+    def _reset_env(self, index: int, seed: Optional[int], options: Optional[dict]):
+        obs, self._env_infos[index] = self.envs[index].reset(seed=seed, options=options)
+        _write_to_buffer(self.single_observation_space, index, obs, self._observations)
+        self._rewards[index] = 0.0
+        self._terminations[index] = False
+        self._truncations[index] = False
+        self._autoreset_envs[index] = False
+
+    def _step_chunk(self, chunk: np.ndarray, actions: np.ndarray):
+        for i in chunk:
+            if self._autoreset_envs[i]:
+                self._reset_env(i, None, None)
+                continue
+            (
+                obs,
+                self._rewards[i],
+                self._terminations[i],
+                self._truncations[i],
+                self._env_infos[i],
+            ) = self.envs[i].step(actions[i])
+            _write_to_buffer(self.single_observation_space, i, obs, self._observations)
+
+    def _get_observations(self):
+        if self.copy:
+            return _copy_buffer(self._observations)
+        return self._observations
+
+
+def _write_to_buffer(space: spaces.Space, index: int, value, buffer):
+    """Write the observation ``value`` of one sub-environment into row ``index`` of the batched ``buffer``."""
+    if isinstance(space, spaces.Dict):
+        for key, subspace in space.spaces.items():
+            _write_to_buffer(subspace, index, value[key], buffer[key])
+    else:
+        buffer[index] = value
+
+
+def _copy_buffer(buffer):
+    if isinstance(buffer, dict):
+        return {key: _copy_buffer(value) for key, value in buffer.items()}
+    return buffer.copy()
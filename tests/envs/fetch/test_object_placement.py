@@ -0,0 +1,93 @@
+"""Tests for the batched sampling of the initial object positions of the Fetch environments."""
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import gymnasium_robotics
+from gymnasium_robotics.envs.fetch.fetch_env import (
+    OBJECT_MIN_DISTANCE,
+    sample_object_xpos,
+)
+
+gym.register_envs(gymnasium_robotics)
+
+
+def _rejection_loop(np_random, n, center, obj_range):
+    """Object positions drawn with the rejection loop of the resets."""
+    positions = []
+    for _ in range(n):
+        object_xpos = center[:2]
+        while np.linalg.norm(object_xpos - center[:2]) < OBJECT_MIN_DISTANCE:
+            object_xpos = center[:2] + np_random.uniform(-obj_range, obj_range, size=2)
+        positions.append(object_xpos)
+    return np.array(positions)
+
+
+def _ks_statistic(a, b):
+    """Two-sample Kolmogorov-Smirnov statistic of the 1-d samples ``a`` and ``b``."""
+    values = np.sort(np.concatenate([a, b]))
+    cdf_a = np.searchsorted(np.sort(a), values, side="right") / len(a)
+    cdf_b = np.searchsorted(np.sort(b), values, side="right") / len(b)
+    return np.max(np.abs(cdf_a - cdf_b))
+
+
+@pytest.mark.parametrize("obj_range", [0.15, 0.08])
+def test_object_positions_distribution(obj_range):
+    """Check that the batched positions follow the distribution of the rejection loop."""
+    n = 20000
+    center = np.array([1.34, 0.75, 0.53])
+    expected = _rejection_loop(np.random.default_rng(0), n, center, obj_range)
+    positions = sample_object_xpos(np.random.default_rng(1), n, center, obj_range)
+    assert positions.shape == (n, 2)
+
+    offsets = positions - center[:2]
+    assert np.all(np.abs(offsets) <= obj_range)
+    assert np.all(np.linalg.norm(offsets, axis=-1) >= OBJECT_MIN_DISTANCE)
+
+    # The critical value of the two-sample KS test at a significance level of 0.001 is 0.0195
+    expected_offsets = expected - center[:2]
+    for statistic in [
+        lambda x: x[:, 0],
+        lambda x: x[:, 1],
+        lambda x: np.linalg.norm(x, axis=-1),
+        lambda x: np.arctan2(x[:, 1], x[:, 0]),
+    ]:
+        assert _ks_statistic(statistic(offsets), statistic(expected_offsets)) < 0.025
+
+    with pytest.raises(ValueError):
+        sample_object_xpos(np.random.default_rng(0), 1, center, 0.05)
+
+
+def test_object_blocks_on_reset():
+    """Check that the object positions served from the blocks are valid and reproducible."""
+
+    def reset_positions(env, seed):
+        positions = []
+        for episode in range(6):
+            obs, _ = env.reset(seed=seed if episode == 0 else None)
+            positions.append(obs["achieved_goal"][:2].copy())
+        return np.array(positions)
+
+    env = gym.make("FetchPush-v4", object_block_size=4)
+    sampler = env.unwrapped.object_sampler
+    positions = reset_positions(env, seed=0)
+    assert len(sampler) == 2
+    offsets = positions - env.unwrapped.initial_gripper_xpos[:2]
+    assert np.all(np.linalg.norm(offsets, axis=-1) >= OBJECT_MIN_DISTANCE)
+    assert np.all(np.abs(offsets) <= env.unwrapped.obj_range + 1e-6)
+
+    np.testing.assert_array_equal(
+        reset_positions(gym.make("FetchPush-v4", object_block_size=4), seed=0),
+        positions,
+    )
+    np.testing.assert_array_equal(
+        env.unwrapped.sample_object_positions(5, np.random.default_rng(3)),
+        sample_object_xpos(
+            np.random.default_rng(3),
+            5,
+            env.unwrapped.initial_gripper_xpos,
+            env.unwrapped.obj_range,
+        ),
+    )
+    env.close()
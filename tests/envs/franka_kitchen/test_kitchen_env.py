@@ -1,13 +1,18 @@
+import os
+import shutil
 from copy import deepcopy
 
 import gymnasium as gym
+import numpy as np
 import pytest
 
 import gymnasium_robotics
+from gymnasium_robotics.envs.franka_kitchen.franka_env import FrankaRobot
 from gymnasium_robotics.envs.franka_kitchen.kitchen_env import (
     OBS_ELEMENT_GOALS,
     OBS_ELEMENT_INDICES,
 )
+from gymnasium_robotics.utils.mujoco_utils import robot_get_obs
 
 gym.register_envs(gymnasium_robotics)
 
@@ -51,8 +56,11 @@ def test_task_completion(remove_task_when_completed, terminate_on_tasks_complete
         for task in TASKS:
             # Force task to be achieved
             env.unwrapped.data.qpos[OBS_ELEMENT_INDICES[task]] = OBS_ELEMENT_GOALS[task]
-            _, _, terminated, _, info = env.step(env.action_space.sample())
+            _, reward, terminated, _, info = env.step(env.action_space.sample())
             completed_tasks.add(task)
+            assert reward == len(
+                info["step_task_completions"]
+            ), f"The reward: {reward}, must be equal to the number of tasks completed after the current step: {info['step_task_completions']}."
 
             assert (
                 set(info["episode_task_completions"]) == completed_tasks
@@ -124,3 +132,60 @@ def test_task_completion(remove_task_when_completed, terminate_on_tasks_complete
             ), "If the environment is initialized with `terminate_on_tasks_complete=False`, the episode must not terminate after all tasks are completed."
 
     env.close()
+
+
+@pytest.fixture(scope="module")
+def kitchen_model_path(tmp_path_factory):
+    """Copy of the kitchen model that compiles when the `wood1.png` texture is missing from the checkout.
+
+    The texture is replaced by another one of the kitchen, it only changes the rendering of the model.
+    """
+    assets_dir = os.path.join(
+        os.path.dirname(gymnasium_robotics.__file__), "envs/assets/kitchen_franka"
+    )
+    root = tmp_path_factory.mktemp("kitchen_franka")
+    os.symlink(os.path.join(assets_dir, "franka_assets"), root / "franka_assets")
+    kitchen_dir = root / "kitchen_assets"
+    shutil.copytree(os.path.join(assets_dir, "kitchen_assets"), kitchen_dir)
+    wood_texture = kitchen_dir / "textures" / "wood1.png"
+    if not wood_texture.exists():
+        shutil.copyfile(kitchen_dir / "textures" / "marble1.png", wood_texture)
+    return str(kitchen_dir / "kitchen_env_model.xml")
+
+
+@pytest.mark.parametrize("robot_noise_ratio", [0.0, 0.01])
+def test_franka_robot_obs(kitchen_model_path, robot_noise_ratio):
+    """Check that the observations of the Franka robot match the joint state gathered by name with `robot_get_obs`."""
+    robot = FrankaRobot(
+        model_path=kitchen_model_path, robot_noise_ratio=robot_noise_ratio
+    )
+    robot.reset(seed=0)
+    robot.action_space.seed(0)
+    qpos, qvel = np.zeros(9), np.zeros(9)
+    for _ in range(5):
+        obs, *_ = robot.step(robot.action_space.sample())
+        expected_qpos, expected_qvel = robot_get_obs(
+            robot.model, robot.data, robot.model_names.joint_names
+        )
+        assert robot_get_obs(
+            robot.model, robot.data, robot.model_names.joint_names, out=(qpos, qvel)
+        ) == (qpos, qvel)
+        np.testing.assert_array_equal(qpos, expected_qpos)
+        np.testing.assert_array_equal(qvel, expected_qvel)
+
+        actual_qpos, actual_qvel = robot.robot_joints.get_obs(robot.data)
+        np.testing.assert_array_equal(actual_qpos, expected_qpos)
+        np.testing.assert_array_equal(actual_qvel, expected_qvel)
+        # The observation noise is only added to the observation, not to the simulation
+        noise_bound = robot_noise_ratio * np.concatenate(
+            [robot.robot_pos_noise_amp[:9], robot.robot_vel_noise_amp[:9]]
+        )
+        np.testing.assert_array_less(
+            np.abs(obs - np.concatenate([expected_qpos, expected_qvel])),
+            noise_bound + 1e-12,
+        )
+        if robot_noise_ratio == 0.0:
+            np.testing.assert_array_equal(
+                obs, np.concatenate([expected_qpos, expected_qvel])
+            )
+    robot.close()
@@ -1,9 +1,12 @@
 import pickle
 
 import gymnasium as gym
+import numpy as np
 import pytest
 
 import gymnasium_robotics
+from gymnasium_robotics.utils.reset_state_pool import ResetStatePool
+from tests.utils import assert_equals
 
 gym.register_envs(gymnasium_robotics)
 ENVIRONMENT_IDS = (
@@ -26,3 +29,107 @@ def test_serialize_deserialize(environment_id):
         env1.target_position,
         env2.target_position,
     )
+
+
+@pytest.mark.parametrize("environment_id", ENVIRONMENT_IDS)
+def test_reset_state_pool(environment_id, tmp_path):
+    env = gym.make(
+        environment_id, reset_state_pool_size=4, reset_state_pool_refill="eager"
+    ).unwrapped
+    obs_1, _ = env.reset(seed=7)
+    pool = env.reset_state_pool
+    assert len(pool) == 4 and pool.stream == 7
+    assert env.data.site_xpos[env._model_names.site_name2id["object:center"]][2] > 0.04
+
+    for _ in range(5):
+        env.reset()
+        assert any(
+            np.array_equal(env.get_sim_state(), state) for state in pool._streams[7]
+        )
+    obs_2, _ = env.reset(seed=7)
+    assert_equals(obs_1, obs_2)
+
+    # The same seed stream generates the same pool, that can be reloaded from disk with the "never" policy.
+    path = str(tmp_path / "pool.npz")
+    pool.save(path)
+    env_2 = gym.make(
+        environment_id,
+        reset_state_pool_size=4,
+        reset_state_pool_refill="never",
+        reset_state_pool_path=path,
+    ).unwrapped
+    assert_equals(env_2.reset(seed=7)[0], obs_1)
+    assert len(env_2.reset_state_pool) == 4
+
+    env_3 = gym.make(
+        environment_id, reset_state_pool_size=4, reset_state_pool_refill="eager"
+    ).unwrapped
+    assert_equals(env_3.reset(seed=7)[0], obs_1)
+
+    # A missing pool file is an error rather than a silently regenerated pool.
+    with pytest.raises(FileNotFoundError):
+        gym.make(
+            environment_id,
+            reset_state_pool_size=4,
+            reset_state_pool_path=str(tmp_path / "missing.npz"),
+        )
+
+
+def test_reset_state_pool_lazy():
+    env = gym.make(
+        "HandManipulateBlock-v1",
+        reset_state_pool_size=3,
+        reset_state_pool_refill="lazy",
+    ).unwrapped
+    env.reset(seed=1)
+    assert len(env.reset_state_pool) == 1
+    for _ in range(5):
+        env.reset()
+    assert len(env.reset_state_pool) == 3
+
+    env.reset(seed=2)
+    assert len(env.reset_state_pool) == 1
+
+
+def test_reset_state_pool_streams_are_bounded():
+    """Check that a new seed every episode keeps a bounded number of seed streams."""
+    env = gym.make(
+        "HandManipulateBlock-v1",
+        reset_state_pool_size=3,
+        reset_state_pool_refill="lazy",
+    ).unwrapped
+    pool = env.reset_state_pool
+    for seed in range(pool.max_streams + 4):
+        env.reset(seed=seed)
+    assert len(pool._streams) == pool.max_streams
+    assert list(pool._streams)[-1] == pool.stream == pool.max_streams + 3
+    assert set(pool._generators) <= set(pool._streams)
+
+    def generate_fn(np_random):
+        return np_random.uniform(size=2)
+
+    pool = ResetStatePool(2, refill="eager", max_streams=2)
+    with pytest.warns(UserWarning, match="eager refill policy"):
+        for seed in (0, 1, 0, 2):
+            pool.select_stream(seed)
+            pool.sample(np.random.default_rng(0), generate_fn)
+    # The least recently used stream 1 was dropped
+    assert list(pool._streams) == [0, 2]
+    pool.add(np.zeros(2), seed=3)
+    assert list(pool._streams) == [2, 3] and pool.stream == 2
+
+    with pytest.raises(ValueError):
+        ResetStatePool(2, max_streams=0)
+
+
+def test_shared_model_tables():
+    """Check that the environments share the parallel rotations and copy the compiled model."""
+    env_1 = gym.make("HandManipulateBlockRotateParallel-v1").unwrapped
+    env_2 = gym.make("HandManipulateBlockRotateParallel-v1").unwrapped
+    assert env_1.parallel_quats is env_2.parallel_quats
+    assert env_1.parallel_quats.shape == (24, 4)
+    assert not env_1.parallel_quats.flags.writeable
+
+    assert env_1.model is not env_2.model
+    env_1.model.site_pos[0] += 1.0
+    assert not np.array_equal(env_1.model.site_pos, env_2.model.site_pos)
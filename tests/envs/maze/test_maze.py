@@ -0,0 +1,447 @@
+"""Tests for the construction of the maze models."""
+
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+
+import gymnasium as gym
+import mujoco
+import numpy as np
+import pytest
+
+import gymnasium_robotics
+from gymnasium_robotics.envs.maze import maps, maze_v4
+from gymnasium_robotics.envs.maze.maze_v4 import Maze, maze_cache_key, merge_wall_cells
+
+gym.register_envs(gymnasium_robotics)
+
+MAZE_MAP = [
+    [1, 1, 1, 1, 1],
+    [1, "r", 0, 0, 1],
+    [1, 1, 1, "g", 1],
+    [1, 1, 1, 1, 1],
+]
+
+
+def test_maze_model_cache():
+    """Check that the maze models are compiled once, without temporary files, and copied for each environment."""
+    temp_files = set(os.listdir(tempfile.gettempdir()))
+    maze_v4.clear_maze_cache()
+    envs = [
+        gym.make("PointMaze_UMaze-v3", maze_map=MAZE_MAP).unwrapped for _ in range(2)
+    ]
+    assert len(maze_v4._MAZE_CACHE) == 1
+    assert set(os.listdir(tempfile.gettempdir())) == temp_files
+
+    models = [env.point_env.model for env in envs]
+    assert models[0] is not models[1]
+    assert envs[0].maze is not envs[1].maze
+    assert envs[0].maze.unique_goal_locations is not envs[1].maze.unique_goal_locations
+
+    # Same model as the one compiled from the MJCF string of `make_maze_xml`
+    maze, xml = Maze.make_maze_xml(envs[0].agent_xml_path, MAZE_MAP, 1, 0.4)
+    expected = mujoco.MjModel.from_xml_string(xml)
+    for model in models:
+        assert model.ngeom == expected.ngeom
+        np.testing.assert_array_equal(model.geom_pos, expected.geom_pos)
+        np.testing.assert_array_equal(model.geom_size, expected.geom_size)
+    np.testing.assert_array_equal(
+        envs[0].maze.unique_reset_locations, maze.unique_reset_locations
+    )
+
+    agent_xml_path = envs[0].agent_xml_path
+    key = maze_cache_key(agent_xml_path, MAZE_MAP, 1, 0.4)
+    assert key == maze_cache_key(agent_xml_path, MAZE_MAP, 1.0, 0.4)
+    assert key != maze_cache_key(agent_xml_path, MAZE_MAP, 2, 0.4)
+    assert key != maze_cache_key(agent_xml_path, MAZE_MAP[::-1], 1, 0.4)
+
+
+def test_make_maze_is_deprecated():
+    """Check that `make_maze` warns that it is deprecated and writes the same model as `make_maze_xml`."""
+    agent_xml_path = gym.make("PointMaze_UMaze-v3").unwrapped.agent_xml_path
+    with pytest.warns(DeprecationWarning, match="make_maze"):
+        _, xml_path = Maze.make_maze(agent_xml_path, MAZE_MAP, 1, 0.4)
+    try:
+        with open(xml_path) as f:
+            assert f.read() == Maze.make_maze_xml(agent_xml_path, MAZE_MAP, 1, 0.4)[1]
+    finally:
+        os.remove(xml_path)
+
+
+def test_maze_model_cache_is_bounded(monkeypatch):
+    """Check that the maze cache keeps the most recently loaded mazes up to `MAZE_CACHE_MAX_SIZE`."""
+    monkeypatch.setattr(maze_v4, "MAZE_CACHE_MAX_SIZE", 2)
+    maze_v4.clear_maze_cache()
+    agent_xml_path = gym.make("PointMaze_UMaze-v3").unwrapped.agent_xml_path
+    maze_v4.clear_maze_cache()
+
+    def load(scaling):
+        Maze.load_maze_model(agent_xml_path, MAZE_MAP, scaling, 0.4)
+        return Maze.__qualname__ + maze_cache_key(
+            agent_xml_path, MAZE_MAP, scaling, 0.4
+        )
+
+    key_1, _ = load(1), load(2)
+    load(1)  # The first maze becomes the most recently used one
+    key_3 = load(3)
+    assert list(maze_v4._MAZE_CACHE) == [key_1, key_3]
+
+    maze_v4.clear_maze_cache()
+    assert len(maze_v4._MAZE_CACHE) == 0
+
+
+def test_maze_xml_asset_paths(tmp_path):
+    """Check that the relative paths of the assets of the agent model are made absolute."""
+    agent_xml_path = tmp_path / "agent.xml"
+    agent_xml_path.write_text(
+        """<mujoco>
+            <compiler meshdir="meshes" texturedir="/textures"/>
+            <asset>
+                <mesh name="body" file="body.stl"/>
+                <texture name="grid" type="2d" file="grid.png"/>
+            </asset>
+            <worldbody/>
+        </mujoco>"""
+    )
+    _, xml = Maze.make_maze_xml(str(agent_xml_path), MAZE_MAP, 1, 0.4)
+    root = ET.fromstring(xml)
+    assert root.find(".//mesh").get("file") == str(
+        tmp_path.resolve() / "meshes" / "body.stl"
+    )
+    assert root.find(".//texture").get("file") == "/textures/grid.png"
+    num_walls = sum(row.count(1) for row in MAZE_MAP)
+    assert len(root.findall(".//worldbody/geom")) == num_walls
+
+
+@pytest.mark.parametrize(
+    "maze_map", [MAZE_MAP, maps.U_MAZE, maps.MEDIUM_MAZE, maps.LARGE_MAZE_DIVERSE_GR]
+)
+def test_merge_wall_cells(maze_map):
+    """Check that the merged rectangles cover every wall cell exactly once."""
+    walls = np.array([[cell == 1 for cell in row] for row in maze_map])
+    coverage = np.zeros(walls.shape, dtype=int)
+    rectangles = merge_wall_cells(maze_map)
+    for i, j, rows, cols in rectangles:
+        coverage[i : i + rows, j : j + cols] += 1
+    np.testing.assert_array_equal(coverage, walls.astype(int))
+    assert len(rectangles) < walls.sum()
+
+
+def _min_num_rectangles(walls):
+    """Minimum number of rectangles partitioning the wall cells, by exhaustive search."""
+    best = [int(walls.sum())]
+
+    def search(covered, n):
+        if n >= best[0]:
+            return
+        uncovered = np.argwhere(walls & ~covered)
+        if len(uncovered) == 0:
+            best[0] = n
+            return
+        # The first uncovered cell in row-major order is the top left cell of its rectangle
+        i, j = uncovered[0]
+        max_cols = 0
+        while j + max_cols < walls.shape[1] and (walls & ~covered)[i, j + max_cols]:
+            max_cols += 1
+        for cols in range(1, max_cols + 1):
+            rows = 1
+            while i + rows < walls.shape[0] and np.all(
+                (walls & ~covered)[i + rows, j : j + cols]
+            ):
+                rows += 1
+            for r in range(1, rows + 1):
+                next_covered = covered.copy()
+                next_covered[i : i + r, j : j + cols] = True
+                search(next_covered, n + 1)
+
+    search(np.zeros_like(walls), 0)
+    return best[0]
+
+
+def test_merge_wall_cells_is_minimal():
+    """Check that the merged rectangles are a minimum partition of the wall cells of random small maps."""
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        walls = rng.random(rng.integers(2, 6, size=2)) < rng.uniform(0.4, 0.9)
+        maze_map = walls.astype(int).tolist()
+        rectangles = merge_wall_cells(maze_map)
+        coverage = np.zeros(walls.shape, dtype=int)
+        for i, j, rows, cols in rectangles:
+            coverage[i : i + rows, j : j + cols] += 1
+        np.testing.assert_array_equal(coverage, walls.astype(int))
+        assert len(rectangles) == _min_num_rectangles(walls), maze_map
+
+
+def test_merged_walls_rollouts():
+    """Check that the rollouts with and without merged walls agree when the agent hits the walls away from the seams."""
+    # The top and bottom walls are merged into one box, the agent pushes against the middle of the top wall cell.
+    maze_map = [
+        [1, 1, 1, 1, 1],
+        [1, 0, "r", 0, 1],
+        [1, 0, 0, "g", 1],
+        [1, 1, 1, 1, 1],
+    ]
+
+    def rollout(merge_walls):
+        env = gym.make(
+            "PointMaze_UMaze-v3", maze_map=maze_map, merge_walls=merge_walls
+        ).unwrapped
+        obs, _ = env.reset(seed=0)
+        trajectory, contacts = [obs["observation"]], []
+        for _ in range(50):
+            obs, *_ = env.step(np.array([0.0, 1.0]))
+            trajectory.append(obs["observation"])
+            contacts.append(env.point_env.data.ncon)
+        env.close()
+        return np.array(trajectory), np.array(contacts)
+
+    trajectory, contacts = rollout(merge_walls=False)
+    merged_trajectory, merged_contacts = rollout(merge_walls=True)
+    assert contacts.max() > 0
+    np.testing.assert_array_equal(merged_contacts, contacts)
+    np.testing.assert_allclose(merged_trajectory, trajectory, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("env_id", ["PointMaze_UMaze-v3", "AntMaze_UMaze-v5"])
+def test_merged_wall_geoms(env_id):
+    """Check that the merged wall boxes of the model fill the same volume as one box per wall cell."""
+
+    def wall_boxes(merge_walls):
+        env = gym.make(
+            env_id, maze_map=maps.MEDIUM_MAZE, merge_walls=merge_walls
+        ).unwrapped
+        model = getattr(env, "point_env", None) or env.ant_env
+        model = model.model
+        geoms = [
+            geom_id
+            for geom_id in range(model.ngeom)
+            if mujoco.mj_id2name(model, mujoco.mjtObj.mjOBJ_GEOM, geom_id).startswith(
+                "block_"
+            )
+        ]
+        return model.geom_pos[geoms], model.geom_size[geoms], env.maze
+
+    def cells(pos, size, maze):
+        # Cell centers covered by the boxes
+        covered = set()
+        for (x, y, _), (sx, sy, _) in zip(pos, size):
+            for i in range(maze.map_length):
+                for j in range(maze.map_width):
+                    cx, cy = maze.cell_rowcol_to_xy(np.array([i, j]))
+                    if abs(cx - x) < sx and abs(cy - y) < sy:
+                        covered.add((i, j))
+        return covered
+
+    pos, size, maze = wall_boxes(merge_walls=False)
+    merged_pos, merged_size, _ = wall_boxes(merge_walls=True)
+    assert len(merged_pos) < len(pos)
+    np.testing.assert_array_equal(merged_pos[:, 2], pos[0, 2])
+    np.testing.assert_array_equal(merged_size[:, 2], size[0, 2])
+    # Same covered cells and same total volume, so the boxes do not overlap
+    assert cells(merged_pos, merged_size, maze) == cells(pos, size, maze)
+    np.testing.assert_allclose(
+        np.prod(merged_size, axis=-1).sum(), np.prod(size, axis=-1).sum()
+    )
+
+
+def test_geodesic_distances():
+    """Check the shortest path distances and next cells between the cells of a maze."""
+    maze = Maze(MAZE_MAP, maze_size_scaling=1.0, maze_height=0.4)
+    distance_map = maze.geodesic_distance_map((2, 3))
+    assert distance_map.shape == (4, 5)
+    assert distance_map[2, 3] == 0 and distance_map[1, 3] == 1
+    assert distance_map[1, 2] == 2 and distance_map[1, 1] == 3
+    assert np.isinf(distance_map[0]).all() and np.isinf(distance_map[2, :3]).all()
+
+    reset_xy, goal_xy = maze.cell_rowcol_to_xy((1, 1)), maze.cell_rowcol_to_xy((2, 3))
+    xy_pos = np.stack([reset_xy + 0.3, reset_xy, goal_xy, [100.0, 0.0]])
+    np.testing.assert_array_equal(
+        maze.geodesic_cell_distance(xy_pos, goal_xy), [3, 3, 0, np.inf]
+    )
+    assert maze.geodesic_cell_distance(reset_xy, goal_xy).shape == ()
+    np.testing.assert_array_equal(
+        maze.geodesic_next_cell(xy_pos, goal_xy),
+        [
+            maze.cell_rowcol_to_xy((1, 2)),
+            maze.cell_rowcol_to_xy((1, 2)),
+            goal_xy,
+            [np.nan, np.nan],
+        ],
+    )
+
+
+def test_geodesic_tables():
+    """Check the lazily computed and all pairs tables on batches of random coordinates."""
+    maze = gym.make("PointMaze_Large-v3").unwrapped.maze
+    rng = np.random.default_rng(0)
+    half_size = np.array([maze.x_map_center, maze.y_map_center])
+    xy_pos = rng.uniform(-half_size, half_size, size=(1000, 2))
+    goal_xy_pos = rng.uniform(-half_size, half_size, size=(1000, 2))
+
+    distance = maze.geodesic_cell_distance(xy_pos, goal_xy_pos)
+    next_xy = maze.geodesic_next_cell(xy_pos, goal_xy_pos)
+    # The distances are symmetric and decrease by one along the path
+    np.testing.assert_array_equal(
+        maze.geodesic_cell_distance(goal_xy_pos, xy_pos), distance
+    )
+    connected = np.isfinite(distance)
+    assert 0 < connected.sum() < len(distance)
+    np.testing.assert_array_equal(
+        maze.geodesic_cell_distance(next_xy[connected], goal_xy_pos[connected]),
+        np.maximum(distance[connected] - 1, 0),
+    )
+    assert np.isnan(next_xy[~connected]).all()
+
+    # The distances are at least the Manhattan distances between the cells
+    rowcol = np.array([maze.cell_xy_to_rowcol(xy) for xy in xy_pos[connected]])
+    goal_rowcol = np.array(
+        [maze.cell_xy_to_rowcol(xy) for xy in goal_xy_pos[connected]]
+    )
+    assert np.all(distance[connected] >= np.abs(rowcol - goal_rowcol).sum(axis=-1))
+
+    maze.precompute_geodesic_distances()
+    np.testing.assert_array_equal(
+        maze.geodesic_cell_distance(xy_pos, goal_xy_pos), distance
+    )
+    np.testing.assert_array_equal(maze.geodesic_next_cell(xy_pos, goal_xy_pos), next_xy)
+
+
+def test_geodesic_distance():
+    """Check the interpolated lengths of the shortest paths through the maze."""
+    maze = Maze(MAZE_MAP, maze_size_scaling=2.0, maze_height=0.4)
+    reset_xy, goal_xy = maze.cell_rowcol_to_xy((1, 1)), maze.cell_rowcol_to_xy((2, 3))
+    # Through the centers of the cells (1, 2) and (1, 3)
+    np.testing.assert_allclose(maze.geodesic_distance(reset_xy, goal_xy), 6.0)
+    np.testing.assert_allclose(
+        maze.geodesic_distance(reset_xy + [0.5, 0.0], goal_xy + [0.0, 0.5]),
+        5.0,
+    )
+
+    maze = gym.make("PointMaze_Large-v3").unwrapped.maze
+    rng = np.random.default_rng(1)
+    half_size = np.array([maze.x_map_center, maze.y_map_center])
+    xy_pos = rng.uniform(-half_size, half_size, size=(1000, 2))
+    goal_xy_pos = rng.uniform(-half_size, half_size, size=(1000, 2))
+    distance = maze.geodesic_distance(xy_pos, goal_xy_pos)
+    cell_distance = maze.geodesic_cell_distance(xy_pos, goal_xy_pos)
+    euclidean = np.linalg.norm(xy_pos - goal_xy_pos, axis=-1)
+
+    np.testing.assert_array_equal(np.isinf(distance), np.isinf(cell_distance))
+    near = cell_distance <= 1
+    np.testing.assert_array_equal(distance[near], euclidean[near])
+    connected = np.isfinite(distance)
+    assert np.all(distance[connected] >= euclidean[connected])
+    assert np.any(distance[connected] > euclidean[connected] + 1)
+    np.testing.assert_array_equal(
+        [maze.geodesic_distance(a, b) for a, b in zip(xy_pos, goal_xy_pos)],
+        distance,
+    )
+
+
+@pytest.mark.parametrize(
+    "env_id", ["PointMaze_Medium-v3", "AntMaze_Medium-v4", "AntMaze_Medium-v5"]
+)
+def test_geodesic_reward(env_id):
+    """Check that the geodesic rewards of batches of goals are the rewards of each goal."""
+    env = gym.make(env_id, reward_type="geodesic")
+    env.reset(seed=0)
+    obs, reward, _, _, info = env.step(env.action_space.sample())
+    unwrapped = env.unwrapped
+    assert reward == unwrapped.compute_reward(
+        obs["achieved_goal"], obs["desired_goal"], info
+    )
+
+    maze = unwrapped.maze
+    rng = np.random.default_rng(0)
+    goal_locations = maze.unique_goal_locations
+    achieved_goal = goal_locations[rng.integers(len(goal_locations), size=256)]
+    desired_goal = goal_locations[rng.integers(len(goal_locations), size=256)]
+    achieved_goal = achieved_goal + rng.uniform(-0.25, 0.25, size=(256, 2))
+    rewards = unwrapped.compute_reward(achieved_goal, desired_goal, None)
+    assert rewards.shape == (256,)
+    np.testing.assert_array_equal(
+        rewards,
+        [
+            unwrapped.compute_reward(achieved, desired, None)
+            for achieved, desired in zip(achieved_goal, desired_goal)
+        ],
+    )
+    np.testing.assert_allclose(
+        rewards, np.exp(-maze.geodesic_distance(achieved_goal, desired_goal))
+    )
+    # The Euclidean dense reward is higher through the walls
+    dense_rewards = np.exp(-np.linalg.norm(achieved_goal - desired_goal, axis=-1))
+    assert np.all(rewards <= dense_rewards)
+    assert np.any(rewards < dense_rewards)
+    env.close()
+
+
+def test_cell_conversions():
+    """Check that the batched cell conversions match the conversions of each cell."""
+    maze = Maze(maps.LARGE_MAZE, maze_size_scaling=4.0, maze_height=0.5)
+    rowcol = np.stack(
+        np.meshgrid(np.arange(maze.map_length), np.arange(maze.map_width)), axis=-1
+    ).reshape(-1, 2)
+    xy = maze.cell_rowcol_to_xy(rowcol)
+    assert xy.shape == (len(rowcol), 2)
+    np.testing.assert_array_equal(xy, [maze.cell_rowcol_to_xy(cell) for cell in rowcol])
+    np.testing.assert_array_equal(maze.cell_rowcol_to_xy([0, 0]), xy[0])
+    np.testing.assert_array_equal(maze.cell_xy_to_rowcol(xy), rowcol)
+    offsets = np.random.default_rng(0).uniform(-1.9, 1.9, size=xy.shape)
+    np.testing.assert_array_equal(maze.cell_xy_to_rowcol(xy + offsets), rowcol)
+    np.testing.assert_array_equal(maze.cell_xy_to_rowcol(xy[3]), rowcol[3])
+
+
+def test_location_arrays():
+    """Check the location arrays of the maze."""
+    maze = gym.make("PointMaze_Medium-v3").unwrapped.maze
+    empty_cells = [
+        (i, j)
+        for i, row in enumerate(maps.MEDIUM_MAZE)
+        for j, cell in enumerate(row)
+        if cell == 0
+    ]
+    for locations in (maze.unique_goal_locations, maze.unique_reset_locations):
+        assert locations.shape == (len(empty_cells), 2)
+        np.testing.assert_array_equal(locations, maze.cell_rowcol_to_xy(empty_cells))
+    np.testing.assert_array_equal(maze.combined_locations, locations)
+
+
+def test_reset_positions():
+    """Check that the reset positions keep the seeded draws of the rejection loop, or use a single draw."""
+
+    def rejection_loop_reset_pos(env):
+        # The reset positions of the previous versions
+        reset_pos = env.goal.copy()
+        while np.linalg.norm(reset_pos - env.goal) <= 0.5 * env.maze.maze_size_scaling:
+            reset_index = env.np_random.integers(
+                low=0, high=len(env.maze.unique_reset_locations)
+            )
+            reset_pos = env.maze.unique_reset_locations[reset_index].copy()
+        return reset_pos
+
+    env = gym.make("PointMaze_Medium-v3").unwrapped
+    expected_env = gym.make("PointMaze_Medium-v3").unwrapped
+    env.reset(seed=0)
+    expected_env.reset(seed=0)
+    for _ in range(200):
+        np.testing.assert_array_equal(
+            env.generate_reset_pos(), rejection_loop_reset_pos(expected_env)
+        )
+
+    env = gym.make("PointMaze_Medium-v3", single_draw_reset=True).unwrapped
+    env.reset(seed=0)
+    env.goal = env.maze.unique_goal_locations[0].copy()
+    reset_positions = np.array([env.generate_reset_pos() for _ in range(2000)])
+    assert np.all(
+        np.linalg.norm(reset_positions - env.goal, axis=-1)
+        > 0.5 * env.maze.maze_size_scaling
+    )
+    _, counts = np.unique(reset_positions, axis=0, return_counts=True)
+    assert len(counts) == len(env.maze.unique_reset_locations) - 1
+    assert counts.min() > 0.5 * counts.mean()
+
+    single_cell_maze = [[1, 1, 1], [1, "c", 1], [1, 1, 1]]
+    env = gym.make("PointMaze_UMaze-v3", maze_map=single_cell_maze).unwrapped
+    with pytest.raises(AssertionError):
+        env.reset(seed=0)
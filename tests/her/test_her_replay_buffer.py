@@ -0,0 +1,157 @@
+"""Tests for the HER replay buffer."""
+
+import gymnasium as gym
+import numpy as np
+import pytest
+from gymnasium import spaces
+
+import gymnasium_robotics
+from gymnasium_robotics.her import HerReplayBuffer
+
+gym.register_envs(gymnasium_robotics)
+
+EPISODE_LENGTHS = [5, 3, 8, 6]
+
+
+def _counting_buffer(goal_selection_strategy, max_episodes=8):
+    """Buffer filled with episodes whose achieved goal is the time step and whose observation is (episode, step)."""
+    goal_space = spaces.Box(-np.inf, np.inf, shape=(1,))
+    observation_space = spaces.Dict(
+        observation=spaces.Box(-np.inf, np.inf, shape=(2,)),
+        achieved_goal=goal_space,
+        desired_goal=goal_space,
+    )
+
+    def compute_reward(achieved_goal, desired_goal, info):
+        assert np.ndim(achieved_goal) == 2
+        return -(achieved_goal[:, 0] != desired_goal[:, 0]).astype(np.float64)
+
+    buffer = HerReplayBuffer(
+        observation_space,
+        spaces.Box(-1, 1, shape=(1,)),
+        compute_reward,
+        max_episodes=max_episodes,
+        max_episode_steps=10,
+        goal_selection_strategy=goal_selection_strategy,
+        seed=0,
+    )
+
+    def obs(episode, step):
+        return {
+            "observation": np.array([episode, step]),
+            "achieved_goal": np.array([step]),
+            "desired_goal": np.array([-1.0]),
+        }
+
+    for episode, length in enumerate(EPISODE_LENGTHS):
+        for step in range(length):
+            buffer.add(
+                obs(episode, step),
+                np.array([step / 10]),
+                obs(episode, step + 1),
+                terminated=False,
+                truncated=step == length - 1,
+            )
+    return buffer
+
+
+@pytest.mark.parametrize("goal_selection_strategy", ["future", "final", "episode"])
+def test_goal_selection_strategies(goal_selection_strategy):
+    """Check the time steps of the relabeled goals and the rewards of the sampled transitions."""
+    buffer = _counting_buffer(goal_selection_strategy)
+    assert len(buffer) == sum(EPISODE_LENGTHS)
+    assert buffer.num_episodes == len(EPISODE_LENGTHS)
+
+    batch = buffer.sample(2000)
+    episodes, steps = batch["observations"]["observation"].T.astype(int)
+    np.testing.assert_array_equal(
+        batch["next_observations"]["observation"][:, 1], steps + 1
+    )
+    np.testing.assert_allclose(batch["actions"][:, 0], steps / 10)
+    lengths = np.array(EPISODE_LENGTHS)[episodes]
+    assert np.all(steps < lengths)
+
+    is_relabeled = batch["is_relabeled"]
+    assert 0.7 < is_relabeled.mean() < 0.9
+    goal_steps = batch["observations"]["desired_goal"][:, 0]
+    np.testing.assert_array_equal(goal_steps[~is_relabeled], -1.0)
+    np.testing.assert_array_equal(
+        batch["next_observations"]["desired_goal"],
+        batch["observations"]["desired_goal"],
+    )
+    if goal_selection_strategy == "future":
+        assert np.all(goal_steps[is_relabeled] > steps[is_relabeled])
+    elif goal_selection_strategy == "final":
+        np.testing.assert_array_equal(goal_steps[is_relabeled], lengths[is_relabeled])
+    assert np.all(goal_steps[is_relabeled] >= 1)
+    assert np.all(goal_steps[is_relabeled] <= lengths[is_relabeled])
+
+    np.testing.assert_array_equal(
+        batch["rewards"], -(goal_steps != steps + 1).astype(np.float64)
+    )
+    # Every stored transition is sampled
+    assert len(set(zip(episodes, steps))) == sum(EPISODE_LENGTHS)
+
+
+def test_episode_ring_buffer():
+    """Check that the oldest episodes are overwritten and the episode being written is not sampled."""
+    buffer = _counting_buffer("future", max_episodes=2)
+    assert buffer.num_episodes == 2
+    assert len(buffer) == sum(EPISODE_LENGTHS[2:])
+    episodes = buffer.sample(500)["observations"]["observation"][:, 0]
+    assert set(episodes) == {2, 3}
+
+    buffer.add(
+        {
+            "observation": np.zeros(2),
+            "achieved_goal": np.zeros(1),
+            "desired_goal": np.zeros(1),
+        },
+        np.zeros(1),
+        {
+            "observation": np.zeros(2),
+            "achieved_goal": np.zeros(1),
+            "desired_goal": np.zeros(1),
+        },
+        terminated=False,
+        truncated=False,
+    )
+    assert buffer.num_episodes == 1
+    assert set(buffer.sample(500)["observations"]["observation"][:, 0]) == {3}
+
+    buffer.clear()
+    assert len(buffer) == 0
+    with pytest.raises(gym.error.Error):
+        buffer.sample(1)
+
+
+def test_fetch_relabeled_rewards():
+    """Check that the relabeled rewards of a Fetch environment match its `compute_reward`."""
+    env = gym.make("FetchPush-v4")
+    buffer = HerReplayBuffer.from_env(env, max_episodes=4, seed=0)
+    assert buffer.max_episode_steps == 50
+
+    env.action_space.seed(0)
+    for episode in range(3):
+        obs, _ = env.reset(seed=episode)
+        terminated = truncated = False
+        while not (terminated or truncated):
+            action = env.action_space.sample()
+            next_obs, reward, terminated, truncated, _ = env.step(action)
+            buffer.add(obs, action, next_obs, terminated, truncated)
+            obs = next_obs
+    assert buffer.num_episodes == 3 and len(buffer) == 150
+
+    batch = buffer.sample(256)
+    assert batch["observations"] in gym.vector.utils.batch_space(
+        env.observation_space, 256
+    )
+    expected = [
+        env.unwrapped.compute_reward(achieved, desired, {})
+        for achieved, desired in zip(
+            batch["next_observations"]["achieved_goal"],
+            batch["next_observations"]["desired_goal"],
+        )
+    ]
+    np.testing.assert_array_equal(batch["rewards"], expected)
+    env.close()
@@ -1,7 +1,9 @@
+import copy
 import pickle
 import warnings
 
 import gymnasium as gym
+import mujoco
 import numpy as np
 import pytest
 from gymnasium.envs.mujoco.utils import check_mujoco_reset_state
@@ -166,6 +168,250 @@ def test_pickle_env(env_spec):
     pickled_env.close()
 
 
+@pytest.mark.parametrize(
+    "env_spec",
+    non_mujoco_py_env_specs,
+    ids=[spec.id for spec in non_mujoco_py_env_specs],
+)
+def test_sim_state_restore(env_spec):
+    """Check that restoring a snapshot from `get_sim_state` reproduces the same rollout of the simulation."""
+    env = env_spec.make(disable_env_checker=True).unwrapped
+    if not hasattr(env, "get_sim_state"):
+        env.close()
+        pytest.skip(f"{env_spec.id} does not implement get_sim_state")
+
+    env.reset(seed=SEED)
+    env.action_space.seed(SEED)
+    for _ in range(5):
+        env.step(env.action_space.sample())
+
+    state = np.zeros(env.sim_state_size)
+    assert env.get_sim_state(out=state) is state
+    actions = [env.action_space.sample() for _ in range(10)]
+
+    def rollout():
+        qpos, qvel = [], []
+        for action in actions:
+            env.step(action)
+            qpos.append(env.data.qpos.copy())
+            qvel.append(env.data.qvel.copy())
+        return np.array(qpos), np.array(qvel)
+
+    qpos_1, qvel_1 = rollout()
+    env.set_sim_state(state)
+    np.testing.assert_array_equal(env.get_sim_state(), state)
+    qpos_2, qvel_2 = rollout()
+
+    np.testing.assert_array_equal(qpos_1, qpos_2)
+    np.testing.assert_array_equal(qvel_1, qvel_2)
+    env.close()
+
+
+@pytest.mark.parametrize("env_id", ["FetchPush-v4", "HandManipulateBlock-v1"])
+def test_sim_state_size_mismatch(env_id):
+    """Check that `get_sim_state` and `set_sim_state` reject arrays that do not have `sim_state_size` elements."""
+    env = gym.make(env_id).unwrapped
+    env.reset(seed=SEED)
+    state = env.get_sim_state()
+
+    for size in (env.sim_state_size - 1, env.sim_state_size + 7):
+        with pytest.raises(ValueError, match="sim_state_size"):
+            env.get_sim_state(out=np.zeros(size))
+        with pytest.raises(ValueError, match="sim_state_size"):
+            env.set_sim_state(np.zeros(size))
+
+    # The state of the simulation is left untouched by the rejected calls
+    np.testing.assert_array_equal(env.get_sim_state(), state)
+    env.close()
+
+
+@pytest.mark.parametrize(
+    "env_id", ["FetchPickAndPlace-v4", "HandReach-v3", "HandManipulateBlock-v1"]
+)
+def test_sim_state_restore_obs(env_id):
+    """Check that `set_sim_state` restores the observation of the snapshot and recomputes the derived quantities."""
+    env = gym.make(env_id).unwrapped
+    env.reset(seed=SEED)
+    env.action_space.seed(SEED)
+    for _ in range(3):
+        env.step(env.action_space.sample())
+    # The body and site poses are computed in the last substep, before the integration of the physics state
+    mujoco.mj_forward(env.model, env.data)
+    obs = env._get_obs()
+    state = env.get_sim_state()
+
+    for _ in range(3):
+        env.step(env.action_space.sample())
+    env.set_sim_state(state)
+    for key, value in env._get_obs().items():
+        np.testing.assert_array_equal(value, obs[key], err_msg=key)
+
+    # After a step, the body poses computed by the forward pass agree with the restored physics state
+    env.step(env.action_space.sample())
+    state = env.get_sim_state()
+    env.step(env.action_space.sample())
+    env.set_sim_state(state)
+    data = copy.deepcopy(env.data)
+    mujoco.mj_forward(env.model, data)
+    np.testing.assert_array_equal(env.data.xpos, data.xpos)
+    np.testing.assert_array_equal(env.data.xquat, data.xquat)
+    np.testing.assert_array_equal(env.data.site_xpos, data.site_xpos)
+    env.close()
+
+
+robot_env_specs = [
+    spec
+    for spec in non_mujoco_py_env_specs
+    if "fetch" in spec.entry_point or "shadow_dexterous_hand" in spec.entry_point
+]
+
+
+@pytest.mark.parametrize(
+    "env_spec", robot_env_specs, ids=[env.id for env in robot_env_specs]
+)
+def test_reuse_obs_buffers(env_spec):
+    """Check that writing the observations into preallocated buffers returns the same observations."""
+    env_1 = env_spec.make(disable_env_checker=True).unwrapped
+    env_2 = env_spec.make(disable_env_checker=True, reuse_obs_buffers=True).unwrapped
+
+    obs_1, _ = env_1.reset(seed=SEED)
+    obs_2, _ = env_2.reset(seed=SEED)
+    buffers = dict(obs_2)
+    assert data_equivalence(obs_1, obs_2, exact=True)
+    assert obs_2 in env_2.observation_space
+
+    env_1.action_space.seed(SEED)
+    for _ in range(10):
+        action = env_1.action_space.sample()
+        obs_1, reward_1, _, _, _ = env_1.step(action)
+        obs_2, reward_2, _, _, _ = env_2.step(action)
+        assert data_equivalence(obs_1, obs_2, exact=True)
+        assert reward_1 == reward_2
+        for key, value in obs_2.items():
+            assert value is buffers[key]
+
+    env_1.close()
+    env_2.close()
+
+
+goal_env_specs = [
+    spec for spec in non_mujoco_py_env_specs if "adroit_hand" not in spec.entry_point
+]
+BATCH_SIZE = 16
+_GOAL_ENV_STATE = ["goal", "tasks_to_complete", "step_task_completions"]
+
+
+@pytest.mark.parametrize(
+    "env_spec", goal_env_specs, ids=[env.id for env in goal_env_specs]
+)
+def test_batched_goal_computation(env_spec):
+    """Check that the reward, termination and success of the goal environments are computed for batches of goals without side effects, as for HER relabeling."""
+    env = env_spec.make(disable_env_checker=True).unwrapped
+    env.reset(seed=SEED)
+    env.action_space.seed(SEED)
+    achieved_goals, desired_goals = [], []
+    for _ in range(BATCH_SIZE):
+        obs, *_ = env.step(env.action_space.sample())
+        achieved_goals.append(obs["achieved_goal"])
+        desired_goals.append(obs["desired_goal"])
+    # Relabel half of the goals with achieved goals so that the batch contains successes
+    desired_goals[::2] = achieved_goals[::2]
+
+    def stack(space, items):
+        out = gym.vector.utils.create_empty_array(space, n=len(items), fn=np.zeros)
+        return gym.vector.utils.concatenate(space, items, out)
+
+    def goal_env_state():
+        return copy.deepcopy(
+            {key: value for key, value in vars(env).items() if key in _GOAL_ENV_STATE}
+        )
+
+    achieved_goal = stack(env.observation_space["achieved_goal"], achieved_goals)
+    desired_goal = stack(env.observation_space["desired_goal"], desired_goals)
+    state = goal_env_state()
+
+    for method in ["compute_reward", "compute_terminated", "compute_truncated"]:
+        batch = np.broadcast_to(
+            getattr(env, method)(achieved_goal, desired_goal, {}), (BATCH_SIZE,)
+        )
+        expected = [
+            getattr(env, method)(achieved, desired, {})
+            for achieved, desired in zip(achieved_goals, desired_goals)
+        ]
+        np.testing.assert_allclose(batch, expected, err_msg=method)
+    assert np.shape(env.compute_reward(achieved_goal, desired_goal, {})) == (
+        BATCH_SIZE,
+    )
+
+    success = env._is_success(achieved_goal, desired_goal)
+    assert np.shape(success) == (BATCH_SIZE,)
+    np.testing.assert_array_equal(
+        success,
+        [
+            env._is_success(achieved, desired)
+            for achieved, desired in zip(achieved_goals, desired_goals)
+        ],
+    )
+    assert np.all(success[::2])
+
+    assert data_equivalence(goal_env_state(), state, exact=True)
+    env.close()
+
+
+@pytest.mark.parametrize(
+    "env_id",
+    ["FetchPickAndPlace-v4", "HandReach-v3", "PointMaze_UMaze-v3", "AntMaze_UMaze-v5"],
+)
+def test_step_many(env_id):
+    """Check that `step_many` returns the stacked outputs of the same calls to `step`."""
+    env_1 = gym.make(env_id, disable_env_checker=True).unwrapped
+    env_2 = gym.make(env_id, disable_env_checker=True).unwrapped
+    env_1.reset(seed=SEED)
+    env_2.reset(seed=SEED)
+    env_1.action_space.seed(SEED)
+    actions = np.array([env_1.action_space.sample() for _ in range(8)])
+
+    steps = [env_1.step(action) for action in actions]
+    observations, rewards, terminated, truncated, info = env_2.step_many(actions)
+
+    assert data_equivalence(
+        observations,
+        {key: np.stack([obs[key] for obs, *_ in steps]) for key in observations},
+        exact=True,
+    )
+    assert observations in gym.vector.utils.batch_space(env_2.observation_space, 8)
+    np.testing.assert_array_equal(rewards, [step[1] for step in steps])
+    np.testing.assert_array_equal(terminated, [step[2] for step in steps])
+    np.testing.assert_array_equal(truncated, [step[3] for step in steps])
+    np.testing.assert_array_equal(
+        info["is_success"],
+        [step[4].get("is_success", step[4].get("success")) for step in steps],
+    )
+
+    # The steps stop after the first termination
+    env_2.compute_terminated = lambda achieved_goal, desired_goal, info: True
+    observations, rewards, terminated, truncated, info = env_2.step_many(actions)
+    assert len(rewards) == len(info["is_success"]) == 1
+    assert observations["observation"].shape[0] == 1
+    assert terminated[0]
+
+    # An empty batch does not step the simulation
+    state = env_2.get_sim_state().copy()
+    observations, rewards, terminated, truncated, info = env_2.step_many(actions[:0])
+    assert observations in gym.vector.utils.batch_space(env_2.observation_space, 0)
+    for value in observations.values():
+        assert value.shape[0] == 0
+    for value in (rewards, terminated, truncated, info["is_success"]):
+        assert value.shape == (0,)
+    assert terminated.dtype == truncated.dtype == info["is_success"].dtype == bool
+    np.testing.assert_array_equal(env_2.get_sim_state(), state)
+
+    with pytest.raises(ValueError):
+        env_2.step_many(actions[0])
+    env_1.close()
+    env_2.close()
+
+
 _test_robot_env_reset_list = ["Fetch", "HandReach"]
 
 
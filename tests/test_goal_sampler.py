@@ -0,0 +1,97 @@
+"""Tests for the goals sampled in blocks by the robot environments."""
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import gymnasium_robotics
+from gymnasium_robotics.utils.goal_sampler import GoalSampler
+
+gym.register_envs(gymnasium_robotics)
+
+ENV_IDS = [
+    "FetchReach-v4",
+    "FetchPickAndPlace-v4",
+    "HandReach-v3",
+    "HandManipulateBlock-v1",
+    "HandManipulateBlockRotateZ-v1",
+    "HandManipulateBlockRotateParallel-v1",
+    "HandManipulatePenRotate-v1",
+]
+
+
+@pytest.mark.parametrize("env_id", ENV_IDS)
+def test_sample_goals_distribution(env_id):
+    """Check that the vectorized goals follow the distribution of the goals sampled one by one."""
+    n = 20000
+    env = gym.make(env_id).unwrapped
+    env.reset(seed=0)
+    expected = np.array([env._sample_goal() for _ in range(n)])
+    goals = env.sample_goals(n, np.random.default_rng(1))
+    assert goals.shape == expected.shape
+
+    std_error = np.sqrt((np.var(goals, axis=0) + np.var(expected, axis=0)) / n)
+    assert np.all(
+        np.abs(np.mean(goals, axis=0) - np.mean(expected, axis=0))
+        <= 5 * std_error + 1e-12
+    )
+    np.testing.assert_allclose(
+        np.std(goals, axis=0), np.std(expected, axis=0), rtol=0.05, atol=1e-12
+    )
+    np.testing.assert_allclose(goals.min(axis=0), expected.min(axis=0), atol=0.01)
+    np.testing.assert_allclose(goals.max(axis=0), expected.max(axis=0), atol=0.01)
+    env.close()
+
+
+@pytest.mark.parametrize("env_id", ["FetchPickAndPlace-v4", "HandManipulateEgg-v1"])
+def test_goal_blocks_are_reproducible(env_id):
+    """Check that the goals served from the blocks are reproducible and are the goals of the observations."""
+
+    def reset_goals(env, seed):
+        goals = []
+        for episode in range(6):
+            obs, _ = env.reset(seed=seed if episode == 0 else None)
+            np.testing.assert_array_equal(obs["desired_goal"], env.unwrapped.goal)
+            goals.append(obs["desired_goal"].copy())
+        return np.array(goals)
+
+    env = gym.make(env_id, goal_block_size=4)
+    sampler = env.unwrapped.goal_sampler
+    assert isinstance(sampler, GoalSampler) and sampler.block_size == 4
+
+    goals = reset_goals(env, seed=0)
+    assert len(sampler) == 2
+    assert len(np.unique(goals, axis=0)) == len(goals)
+    # Resetting a simulation that already ran may differ in the last bits because of the solver warm start
+    np.testing.assert_allclose(reset_goals(env, seed=0), goals, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(
+        reset_goals(gym.make(env_id, goal_block_size=4), seed=0), goals
+    )
+    assert not np.array_equal(reset_goals(env, seed=1), goals)
+    env.close()
+
+
+def test_goal_sampler_blocks():
+    """Check that the components are drawn in blocks and served in order."""
+    calls = []
+
+    def draw_fn(np_random, n):
+        calls.append(n)
+        return {"value": np_random.uniform(size=(n, 2))}
+
+    sampler = GoalSampler(draw_fn, block_size=3)
+    assert len(sampler) == 0
+    values = [sampler.next(np.random.default_rng(0))["value"] for _ in range(4)]
+    assert calls == [3, 3] and len(sampler) == 2
+    for value in values:
+        assert value.shape == (1, 2)
+    np.testing.assert_array_equal(
+        np.concatenate(values[:3]), np.random.default_rng(0).uniform(size=(3, 2))
+    )
+    assert sampler.draw(np.random.default_rng(0), 5)["value"].shape == (5, 2)
+    assert len(sampler) == 2
+
+    sampler.clear()
+    assert len(sampler) == 0
+    with pytest.raises(ValueError):
+        GoalSampler(draw_fn, block_size=0)
@@ -0,0 +1,214 @@
+"""Tests for the resolved accessors of `gymnasium_robotics.utils.mujoco_utils`."""
+
+import os
+from copy import deepcopy
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import gymnasium_robotics
+from gymnasium_robotics.utils import mujoco_utils
+
+gym.register_envs(gymnasium_robotics)
+
+
+def _stepped_env(env_id):
+    env = gym.make(env_id).unwrapped
+    env.reset(seed=0)
+    env.action_space.seed(0)
+    for _ in range(5):
+        env.step(env.action_space.sample())
+    return env
+
+
+def test_site_accessor():
+    """Check that the site accessor matches the name based getters for one and several sites."""
+    env = _stepped_env("FetchPickAndPlace-v4")
+    model, data = env.model, env.data
+    names = ["robot0:grip", "object0"]
+
+    for name in names:
+        site = mujoco_utils.SiteAccessor(model, env._model_names, name)
+        xpos = site.xpos(data)
+        assert np.shares_memory(xpos, data.site_xpos)
+        np.testing.assert_array_equal(
+            xpos, mujoco_utils.get_site_xpos(model, data, name)
+        )
+        np.testing.assert_array_equal(
+            site.xmat(data), mujoco_utils.get_site_xmat(model, data, name)
+        )
+        np.testing.assert_array_equal(
+            site.xvelp(model, data), mujoco_utils.get_site_xvelp(model, data, name)
+        )
+        np.testing.assert_array_equal(
+            site.xvelr(model, data), mujoco_utils.get_site_xvelr(model, data, name)
+        )
+
+    sites = mujoco_utils.SiteAccessor(model, env._model_names, names)
+    out = np.zeros((2, 3))
+    assert sites.xpos(data, out=out) is out
+    np.testing.assert_array_equal(
+        out, [mujoco_utils.get_site_xpos(model, data, name) for name in names]
+    )
+    assert sites.xmat(data).shape == (2, 3, 3)
+    np.testing.assert_allclose(
+        sites.xvelp(model, data),
+        [mujoco_utils.get_site_xvelp(model, data, name) for name in names],
+    )
+
+
+def test_joint_accessor():
+    """Check that the joint accessor reads and writes the same qpos and qvel entries as the name based functions."""
+    env = _stepped_env("HandManipulateBlock-v1")
+    model, data = env.model, env.data
+    names = ["object:joint", "robot0:WRJ1", "robot0:FFJ3"]
+
+    joints = mujoco_utils.JointAccessor(model, env._model_names, names)
+    np.testing.assert_array_equal(
+        joints.qpos(data),
+        np.concatenate(
+            [np.atleast_1d(mujoco_utils.get_joint_qpos(model, data, n)) for n in names]
+        ),
+    )
+    np.testing.assert_array_equal(
+        joints.qvel(data),
+        np.concatenate(
+            [np.atleast_1d(mujoco_utils.get_joint_qvel(model, data, n)) for n in names]
+        ),
+    )
+
+    joint = mujoco_utils.JointAccessor(model, env._model_names, "object:joint")
+    assert isinstance(joint.qpos_idx, slice)
+    qpos = joint.qpos(data)
+    qpos[:3] += 0.1
+    assert not np.array_equal(joint.qpos(data), qpos)
+    joint.set_qpos(data, qpos)
+    np.testing.assert_array_equal(
+        mujoco_utils.get_joint_qpos(model, data, "object:joint"), qpos
+    )
+
+
+def test_mocap_and_body_accessors():
+    """Check the mocap and body accessors of the Fetch gripper."""
+    env = _stepped_env("FetchReach-v4")
+    model, data = env.model, env.data
+
+    mocap = mujoco_utils.MocapAccessor(model, env._model_names, "robot0:mocap")
+    mocap.set_pos(data, [1.0, 2.0, 3.0])
+    mocap.set_quat(data, [0.0, 1.0, 0.0, 0.0])
+    np.testing.assert_array_equal(mocap.pos(data), [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(data.mocap_quat[0], [0.0, 1.0, 0.0, 0.0])
+
+    body = mujoco_utils.BodyAccessor(
+        model, env._model_names, ["robot0:gripper_link", "robot0:base_link"]
+    )
+    body_ids = [
+        env._model_names.body_name2id[name]
+        for name in ["robot0:gripper_link", "robot0:base_link"]
+    ]
+    np.testing.assert_array_equal(body.xpos(data), data.xpos[body_ids])
+    np.testing.assert_array_equal(body.xquat(data), data.xquat[body_ids])
+
+
+@pytest.mark.parametrize("env_id", ["FetchPickAndPlace-v4", "HandReach-v3"])
+def test_action_plan(env_id):
+    """Check that the compiled action plan matches `ctrl_set_action` followed by `mocap_set_action`."""
+    env = _stepped_env(env_id)
+    model = env.model
+    plan = mujoco_utils.ActionPlan(model)
+    rng = np.random.default_rng(0)
+    actions = rng.uniform(-0.1, 0.1, size=(3, model.nmocap * 7 + model.nu))
+
+    expected = [deepcopy(env.data) for _ in range(3)]
+    for data, action in zip(expected, actions):
+        mujoco_utils.ctrl_set_action(model, data, action)
+        mujoco_utils.mocap_set_action(model, data, action)
+
+    datas = [deepcopy(env.data) for _ in range(3)]
+    for data, action in zip(datas, actions):
+        plan.apply(data, action)
+    # The same actions applied relative to explicit poses of the welded bodies
+    posed_datas = [deepcopy(env.data) for _ in range(3)]
+    body_poses = np.concatenate(
+        [env.data.xpos[plan.weld_body_ids], env.data.xquat[plan.weld_body_ids]],
+        axis=1,
+    )
+    for data, action in zip(posed_datas, actions):
+        data.xpos[:] = 0.0
+        plan.apply(data, action, body_poses)
+
+    for data_1, data_2, data_3 in zip(expected, datas, posed_datas):
+        for data in (data_2, data_3):
+            np.testing.assert_array_equal(data.ctrl, data_1.ctrl)
+            np.testing.assert_array_equal(data.mocap_pos, data_1.mocap_pos)
+            np.testing.assert_array_equal(data.mocap_quat, data_1.mocap_quat)
+
+
+@pytest.mark.parametrize("env_id", ["FetchPush-v4", "HandManipulateBlock-v1"])
+def test_robot_joint_accessor(env_id):
+    """Check that the robot joint gather returns the same state as `robot_get_obs`, also into `out` buffers."""
+    env = _stepped_env(env_id)
+    robot_joints = mujoco_utils.RobotJointAccessor(env.model, env._model_names)
+    expected = mujoco_utils.robot_get_obs(
+        env.model, env.data, env._model_names.joint_names
+    )
+
+    qpos, qvel = robot_joints.get_obs(env.data)
+    np.testing.assert_array_equal(qpos, expected[0])
+    np.testing.assert_array_equal(qvel, expected[1])
+
+    out = (np.zeros_like(qpos), np.zeros_like(qvel))
+    result = robot_joints.get_obs(env.data, out=out)
+    assert result[0] is out[0] and result[1] is out[1]
+    np.testing.assert_array_equal(out[0], expected[0])
+    np.testing.assert_array_equal(out[1], expected[1])
+
+
+def test_load_model_from_path(tmp_path):
+    """Check that the cached models are independent copies, recompiled when the file changes."""
+    path = tmp_path / "box.xml"
+    path.write_text(
+        '<mujoco><worldbody><geom name="box" type="box" size="1 1 1"/></worldbody></mujoco>'
+    )
+    model_1 = mujoco_utils.load_model_from_path(str(path))
+    model_2 = mujoco_utils.load_model_from_path(str(path))
+    assert model_1 is not model_2
+    model_1.geom_size[0] = 2.0
+    np.testing.assert_array_equal(model_2.geom_size[0], 1.0)
+
+    path.write_text(
+        '<mujoco><worldbody><geom name="box" type="box" size="3.5 3.5 3.5"/></worldbody></mujoco>'
+    )
+    np.testing.assert_array_equal(
+        mujoco_utils.load_model_from_path(str(path)).geom_size[0], 3.5
+    )
+    assert len(mujoco_utils._MODEL_CACHE) <= mujoco_utils.MODEL_CACHE_MAX_SIZE
+
+
+def test_load_model_from_path_cache_is_bounded(tmp_path, monkeypatch):
+    """Check that the model cache keeps one model per file, for the most recently loaded files only."""
+    monkeypatch.setattr(mujoco_utils, "MODEL_CACHE_MAX_SIZE", 2)
+    mujoco_utils.clear_model_cache()
+    paths = []
+    for i in range(3):
+        paths.append(os.path.realpath(tmp_path / f"box_{i}.xml"))
+        with open(paths[-1], "w") as f:
+            f.write(
+                f'<mujoco><worldbody><geom type="box" size="{i + 1} 1 1"/></worldbody></mujoco>'
+            )
+
+    mujoco_utils.load_model_from_path(paths[0])
+    mujoco_utils.load_model_from_path(paths[1])
+    mujoco_utils.load_model_from_path(paths[0])
+    mujoco_utils.load_model_from_path(paths[2])
+    assert list(mujoco_utils._MODEL_CACHE) == [paths[0], paths[2]]
+
+    # A modified file replaces its stale model
+    with open(paths[2], "a") as f:
+        f.write(" ")
+    mujoco_utils.load_model_from_path(paths[2])
+    assert list(mujoco_utils._MODEL_CACHE) == [paths[0], paths[2]]
+
+    mujoco_utils.clear_model_cache()
+    assert len(mujoco_utils._MODEL_CACHE) == 0
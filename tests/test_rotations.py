@@ -0,0 +1,317 @@
+"""Tests for the rotation conversions of `gymnasium_robotics.utils.rotations`."""
+
+import numpy as np
+import pytest
+
+from gymnasium_robotics.utils import rotations
+
+
+def _eigh_mat2quat(mat):
+    """Reference conversion with the eigenvector of the largest eigenvalue of the symmetric K matrix (Bar-Itzhack)."""
+    mat = np.asarray(mat, dtype=np.float64)
+    Qxx, Qyx, Qzx = mat[..., 0, 0], mat[..., 0, 1], mat[..., 0, 2]
+    Qxy, Qyy, Qzy = mat[..., 1, 0], mat[..., 1, 1], mat[..., 1, 2]
+    Qxz, Qyz, Qzz = mat[..., 2, 0], mat[..., 2, 1], mat[..., 2, 2]
+    K = np.zeros(mat.shape[:-2] + (4, 4), dtype=np.float64)
+    K[..., 0, 0] = Qxx - Qyy - Qzz
+    K[..., 1, 0] = Qyx + Qxy
+    K[..., 1, 1] = Qyy - Qxx - Qzz
+    K[..., 2, 0] = Qzx + Qxz
+    K[..., 2, 1] = Qzy + Qyz
+    K[..., 2, 2] = Qzz - Qxx - Qyy
+    K[..., 3, 0] = Qyz - Qzy
+    K[..., 3, 1] = Qzx - Qxz
+    K[..., 3, 2] = Qxy - Qyx
+    K[..., 3, 3] = Qxx + Qyy + Qzz
+    K /= 3.0
+    q = np.empty(K.shape[:-2] + (4,))
+    for index in np.ndindex(K.shape[:-2]):
+        vals, vecs = np.linalg.eigh(K[index])
+        q[index] = vecs[[3, 0, 1, 2], np.argmax(vals)]
+        if q[index][0] < 0:
+            q[index] *= -1
+    return q
+
+
+def _random_quats(rng, n):
+    quats = rng.normal(size=(n, 4))
+    return quats / np.linalg.norm(quats, axis=-1, keepdims=True)
+
+
+def _axis_angle_quats(rng, angles):
+    axes = rng.normal(size=(len(angles), 3))
+    axes /= np.linalg.norm(axes, axis=-1, keepdims=True)
+    return np.concatenate(
+        [np.cos(angles / 2)[:, None], np.sin(angles / 2)[:, None] * axes], axis=-1
+    )
+
+
+def _assert_same_rotation(actual, expected, atol):
+    """Quaternions are compared up to their sign, which is ambiguous when w is 0."""
+    sign = np.where(np.sum(actual * expected, axis=-1, keepdims=True) < 0, -1.0, 1.0)
+    np.testing.assert_allclose(actual, sign * expected, atol=atol)
+
+
+def test_mat2quat_matches_eigh():
+    """Check the closed form against the eigenvector method on random rotations."""
+    rng = np.random.default_rng(0)
+    mats = rotations.quat2mat(_random_quats(rng, 1000))
+    quats = rotations.mat2quat(mats)
+    np.testing.assert_allclose(quats, _eigh_mat2quat(mats), atol=1e-12)
+    assert np.all(quats[:, 0] >= 0)
+    np.testing.assert_allclose(np.linalg.norm(quats, axis=-1), 1.0, atol=1e-15)
+    np.testing.assert_allclose(rotations.quat2mat(quats), mats, atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "angles",
+    [
+        np.zeros(8),
+        np.full(8, 1e-9),
+        np.full(8, np.pi),
+        np.pi - np.logspace(-12, -4, 8),
+        np.array([np.pi / 2] * 4 + [3 * np.pi / 2] * 4),
+    ],
+    ids=["identity", "tiny", "half_turn", "near_half_turn", "quarter_turns"],
+)
+def test_mat2quat_near_singular(angles):
+    """Check the rotations where w or several quaternion components vanish."""
+    rng = np.random.default_rng(1)
+    quats = _axis_angle_quats(rng, angles)
+    # Rotations about the coordinate axes make several matrix entries exactly 0
+    axis_quats = np.zeros((3 * len(angles), 4))
+    for axis in range(3):
+        axis_quats[axis::3, 0] = np.cos(angles / 2)
+        axis_quats[axis::3, axis + 1] = np.sin(angles / 2)
+    quats = np.concatenate([quats, axis_quats])
+    mats = rotations.quat2mat(quats)
+
+    actual = rotations.mat2quat(mats)
+    assert np.all(np.isfinite(actual))
+    _assert_same_rotation(actual, _eigh_mat2quat(mats), atol=1e-12)
+    _assert_same_rotation(actual, quats, atol=1e-12)
+
+
+def test_mat2quat_non_orthogonal():
+    """Check that slightly non-orthogonal matrices are still converted to close unit quaternions."""
+    rng = np.random.default_rng(2)
+    quats = _random_quats(rng, 500)
+    mats = rotations.quat2mat(quats) + rng.normal(scale=1e-7, size=(500, 3, 3))
+    actual = rotations.mat2quat(mats)
+    np.testing.assert_allclose(np.linalg.norm(actual, axis=-1), 1.0, atol=1e-15)
+    _assert_same_rotation(actual, _eigh_mat2quat(mats), atol=1e-6)
+
+
+def test_mat2quat_batch_shapes_and_out():
+    """Check single matrices, nested batches and the ``out`` argument."""
+    rng = np.random.default_rng(3)
+    mats = rotations.quat2mat(_random_quats(rng, 24)).reshape(2, 3, 4, 3, 3)
+    expected = _eigh_mat2quat(mats)
+
+    assert rotations.mat2quat(mats[0, 0, 0]).shape == (4,)
+    np.testing.assert_allclose(
+        rotations.mat2quat(mats[0, 0, 0]), expected[0, 0, 0], atol=1e-12
+    )
+    np.testing.assert_allclose(
+        rotations.mat2quat(mats[0, 0, 0].tolist()), expected[0, 0, 0], atol=1e-12
+    )
+
+    out = np.empty((2, 3, 4, 4))
+    assert rotations.mat2quat(mats, out=out) is out
+    np.testing.assert_allclose(out, expected, atol=1e-12)
+
+
+def _random_eulers(rng, n):
+    eulers = rng.uniform(-np.pi, np.pi, size=(n, 3))
+    # Gimbal lock
+    eulers[: n // 8, 1] = np.pi / 2
+    return eulers
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_dtype_and_out(dtype):
+    """Check that the conversions keep float32 and float64 inputs, and write to ``out``."""
+    rng = np.random.default_rng(4)
+    eulers = _random_eulers(rng, 64).astype(dtype)
+    quats = _random_quats(rng, 64).astype(dtype)
+    mats = rotations.quat2mat(quats)
+    conversions = [
+        (rotations.euler2mat, (eulers,), (64, 3, 3)),
+        (rotations.euler2quat, (eulers,), (64, 4)),
+        (rotations.mat2euler, (mats,), (64, 3)),
+        (rotations.mat2quat, (mats,), (64, 4)),
+        (rotations.quat2euler, (quats,), (64, 3)),
+        (rotations.quat2mat, (quats,), (64, 3, 3)),
+        (rotations.subtract_euler, (eulers, eulers[::-1]), (64, 3)),
+        (rotations.quat_conjugate, (quats,), (64, 4)),
+        (rotations.quat_mul, (quats, quats[::-1]), (64, 4)),
+        (rotations.quat_diff_angle, (quats, quats[::-1]), (64,)),
+    ]
+    atol = 1e-5 if dtype == np.float32 else 1e-12
+    for conversion, args, shape in conversions:
+        expected = conversion(*[arg.astype(np.float64) for arg in args])
+        actual = conversion(*args)
+        assert actual.dtype == dtype and actual.shape == shape, conversion.__name__
+        np.testing.assert_allclose(actual, expected, atol=atol)
+
+        out = np.empty(shape, dtype=dtype)
+        assert conversion(*args, out=out) is out
+        np.testing.assert_array_equal(out, actual)
+        # Single rotations
+        np.testing.assert_array_equal(conversion(*[arg[5] for arg in args]), actual[5])
+
+    # Integer inputs are converted to float64
+    assert rotations.euler2quat(np.zeros(3, dtype=int)).dtype == np.float64
+
+
+def test_fused_conversions():
+    """Check the fused conversions against their composition of elementary conversions."""
+    rng = np.random.default_rng(5)
+    quats = _random_quats(rng, 500)
+    quats[:100] = rotations.euler2quat(_random_eulers(rng, 100))
+    quats[0] = 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.testing.assert_array_equal(
+            rotations.quat2euler(quats),
+            rotations.mat2euler(rotations.quat2mat(quats)),
+        )
+        for quat in quats[:50]:
+            np.testing.assert_array_equal(
+                rotations.quat2euler(quat),
+                rotations.mat2euler(rotations.quat2mat(quat)),
+            )
+
+    quat_diff = rotations.quat_mul(quats, rotations.quat_conjugate(quats[::-1]))
+    np.testing.assert_array_equal(
+        rotations.quat_diff_angle(quats, quats[::-1]),
+        2 * np.arccos(np.clip(quat_diff[..., 0], -1.0, 1.0)),
+    )
+
+    # In-place quaternion product
+    q0, q1 = quats.copy(), quats[::-1].copy()
+    expected = rotations.quat_mul(q0, q1)
+    assert rotations.quat_mul(q0, q1, out=q0) is q0
+    np.testing.assert_array_equal(q0, expected)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_unit_vector(dtype):
+    """Check that `unit_vector` normalizes single vectors and batches without changing their dtype."""
+    rng = np.random.default_rng(6)
+    vectors = rng.normal(size=(10, 4)).astype(dtype)
+    expected = vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+    atol = 1e-6 if dtype == np.float32 else 1e-15
+
+    unit = rotations.unit_vector(vectors, axis=-1)
+    assert unit.dtype == dtype
+    np.testing.assert_allclose(unit, expected, atol=atol)
+    assert rotations.unit_vector(vectors[0]).dtype == dtype
+    np.testing.assert_allclose(
+        rotations.unit_vector(vectors[0]), expected[0], atol=atol
+    )
+
+    out = vectors.copy()
+    rotations.unit_vector(out, axis=-1, out=out)
+    np.testing.assert_allclose(out, expected, atol=atol)
+    assert rotations.unit_vector([3, 4]).dtype == np.float64
+
+
+def test_quat_slerp():
+    """Check the batched interpolation against the angles and endpoints of the rotations."""
+    rng = np.random.default_rng(7)
+    q0, q1 = _random_quats(rng, 1000), _random_quats(rng, 1000)
+    fractions = rng.uniform(size=1000)
+    q0_given, q1_given = q0.copy(), q1.copy()
+
+    quats = rotations.quat_slerp(q0, q1, fractions)
+    np.testing.assert_array_equal(q0, q0_given)
+    np.testing.assert_array_equal(q1, q1_given)
+    np.testing.assert_allclose(np.linalg.norm(quats, axis=-1), 1.0, atol=1e-12)
+
+    # Constant angular velocity along the shortest path
+    angle = np.pi - np.abs(np.pi - rotations.quat_diff_angle(q0, q1))
+    np.testing.assert_allclose(
+        np.abs(np.pi - np.abs(np.pi - rotations.quat_diff_angle(quats, q0))),
+        fractions * angle,
+        atol=1e-7,
+    )
+    np.testing.assert_allclose(
+        np.pi - np.abs(np.pi - rotations.quat_diff_angle(quats, q1)),
+        (1 - fractions) * angle,
+        atol=1e-7,
+    )
+    # Without the shortest path, the interpolation stays in the hemisphere of both quaternions
+    longest = rotations.quat_slerp(q0, q1, fractions, shortestpath=False)
+    np.testing.assert_allclose(
+        rotations.quat_diff_angle(longest, q0),
+        fractions * rotations.quat_diff_angle(q1, q0),
+        atol=1e-7,
+    )
+
+    np.testing.assert_allclose(rotations.quat_slerp(q0, q1, 0.0), q0, atol=1e-15)
+    np.testing.assert_allclose(rotations.quat_slerp(q0, q1, 1.0), q1, atol=1e-15)
+    # Quaternions of the same rotation
+    np.testing.assert_allclose(rotations.quat_slerp(q0, -q0, fractions), q0, atol=1e-15)
+
+    # Single pair of quaternions, with a trajectory of fractions
+    trajectory = rotations.quat_slerp(q0[0], q1[0], fractions)
+    assert trajectory.shape == (1000, 4)
+    for i in [0, 10, 999]:
+        np.testing.assert_allclose(
+            trajectory[i], rotations.quat_slerp(q0[0], q1[0], fractions[i]), atol=1e-15
+        )
+
+    out = np.empty((1000, 4), dtype=np.float32)
+    quats32 = rotations.quat_slerp(
+        q0.astype(np.float32), q1.astype(np.float32), fractions, out=out
+    )
+    assert quats32 is out
+    np.testing.assert_allclose(quats32, quats, atol=1e-5)
+
+
+def test_quat_diff_angle_ignore_z():
+    """Check the angle ignoring the Z rotation against the conversion to Euler Angles and back."""
+    rng = np.random.default_rng(8)
+    q0 = _random_quats(rng, 500)
+    q1 = _random_quats(rng, 500)
+    # Gimbal lock and rotations about Z only
+    q0[:50] = rotations.euler2quat(_random_eulers(rng, 400)[:50])
+    q1[:50] = rotations.euler2quat(np.array([0.0, 0.0, 1.0]) * rng.normal(size=(50, 1)))
+
+    euler = rotations.quat2euler(q0)
+    euler[..., 2] = rotations.quat2euler(q1)[..., 2]
+    expected = rotations.quat_diff_angle(rotations.euler2quat(euler), q1)
+
+    np.testing.assert_array_equal(
+        rotations.quat_diff_angle(q0, q1, ignore_z=True), expected
+    )
+    for i in range(100):
+        np.testing.assert_array_equal(
+            rotations.quat_diff_angle(q0[i], q1[i], ignore_z=True), expected[i]
+        )
+    # Rotations about Z only are ignored
+    z_quats = q1[:50]
+    np.testing.assert_allclose(
+        rotations.quat_diff_angle(z_quats, np.roll(z_quats, 1, axis=0), ignore_z=True),
+        0.0,
+        atol=1e-7,
+    )
+
+    angles32 = rotations.quat_diff_angle(
+        q0.astype(np.float32), q1.astype(np.float32), ignore_z=True
+    )
+    assert angles32.dtype == np.float32
+    # Euler Angles are discontinuous at the gimbal lock, which float32 does not detect
+    np.testing.assert_allclose(angles32[50:], expected[50:], atol=1e-3)
+
+
+def test_parallel_quats():
+    """Check the shared table of the quaternions of the parallel rotations."""
+    parallel_quats = rotations.get_parallel_quats()
+    assert parallel_quats is rotations.get_parallel_quats()
+    assert not parallel_quats.flags.writeable
+    np.testing.assert_array_equal(
+        parallel_quats,
+        [rotations.euler2quat(r) for r in rotations.get_parallel_rotations()],
+    )
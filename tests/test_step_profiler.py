@@ -0,0 +1,96 @@
+"""Tests for the opt-in step profiler of the robot environments."""
+
+import time
+
+import gymnasium as gym
+import numpy as np
+import pytest
+from gymnasium.utils.env_checker import data_equivalence
+
+import gymnasium_robotics
+from gymnasium_robotics.utils.step_profiler import STEP_PHASES, StepProfiler
+
+gym.register_envs(gymnasium_robotics)
+
+
+def _rollout(env, num_steps):
+    env.reset(seed=0)
+    env.action_space.seed(0)
+    return [env.step(env.action_space.sample()) for _ in range(num_steps)]
+
+
+@pytest.mark.parametrize("env_id", ["FetchPickAndPlace-v4", "HandManipulateEgg-v1"])
+def test_profiled_step_is_identical(env_id):
+    """Check that profiling the steps does not change the transitions of the environment."""
+    env = gym.make(env_id).unwrapped
+    expected = _rollout(env, 20)
+
+    profiler = env.enable_step_profiling(capacity=8)
+    assert env.step_profiler is profiler
+    assert data_equivalence(_rollout(env, 20), expected, exact=True)
+
+    env.disable_step_profiling()
+    assert env.step_profiler is None
+    assert data_equivalence(_rollout(env, 20), expected, exact=True)
+    assert profiler.num_steps == 20
+
+    # The steps of `step_many` run the same profiled phases
+    env.step_profiler = profiler
+    env.reset(seed=0)
+    env.step_many(np.zeros((0,) + env.action_space.shape))
+    env.action_space.seed(0)
+    actions = np.array([env.action_space.sample() for _ in range(5)])
+    env.step_many(actions)
+    assert profiler.num_steps == 25
+
+
+def test_step_profiler_records():
+    """Check the ring buffer, the recorded counters and the summary of the profiler."""
+    env = gym.make("FetchPickAndPlace-v4").unwrapped
+    profiler = env.enable_step_profiling(capacity=16)
+    assert profiler.summary() == {}
+    _rollout(env, 40)
+
+    records = profiler.records()
+    assert set(records) == set(STEP_PHASES) | {"ncon", "solver_iter", "warnings"}
+    for values in records.values():
+        assert values.shape == (16,)
+    for phase in STEP_PHASES:
+        assert np.all(records[phase] >= 0)
+    assert np.all(records["mujoco_step"] > 0)
+    assert records["ncon"][-1] == env.data.ncon
+    assert np.all(records["solver_iter"] >= 0)
+    assert np.all(records["warnings"] == 0)
+
+    summary = profiler.summary()
+    assert summary["warnings"] == {"total": 0}
+    for phase in STEP_PHASES:
+        assert set(summary[phase]) == {"mean", "p50", "p99", "max", "fraction"}
+    assert sum(summary[phase]["fraction"] for phase in STEP_PHASES) == pytest.approx(1)
+
+    profiler.clear()
+    assert profiler.num_steps == 0 and profiler.summary() == {}
+
+    # A step must time every phase before it is recorded
+    profiler.begin()
+    profiler.lap()
+    with pytest.raises(RuntimeError):
+        profiler.record(env.data)
+
+    with pytest.raises(ValueError):
+        StepProfiler(0)
+
+
+def test_profiled_render_is_not_timed():
+    """Check that the "human" rendering of a step is not counted in any phase."""
+    env = gym.make("FetchReach-v4").unwrapped
+    env.reset(seed=0)
+    profiler = env.enable_step_profiling(capacity=4)
+    env.render_mode = "human"
+    env.render = lambda: time.sleep(0.05)
+    for _ in range(4):
+        env.step(env.action_space.sample())
+
+    records = profiler.records()
+    assert sum(records[phase] for phase in STEP_PHASES).max() < 0.05e9
+    env.render_mode = None
@@ -0,0 +1,126 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import gymnasium_robotics
+from gymnasium_robotics.vector import MujocoBatchedRobotEnv
+
+gym.register_envs(gymnasium_robotics)
+
+ENVIRONMENT_IDS = (
+    "FetchReach-v4",
+    "FetchPush-v4",
+    "HandReach-v3",
+    "HandManipulateBlock-v1",
+    "HandManipulatePenRotate-v1",
+)
+BLOCK_SAMPLING_KWARGS = (
+    ("FetchPickAndPlace-v4", {"goal_block_size": 4, "object_block_size": 4}),
+    ("HandManipulateBlock-v1", {"goal_block_size": 4}),
+)
+RESET_STATE_POOL_KWARGS = (
+    ("HandManipulateBlock-v1", {"reset_state_pool_size": 2}),
+    (
+        "HandManipulateEgg-v1",
+        {"reset_state_pool_size": 3, "reset_state_pool_refill": "eager"},
+    ),
+)
+NUM_ENVS = 3
+SEED = 7
+
+
+@pytest.mark.parametrize(
+    "env_id, env_kwargs",
+    [(env_id, {}) for env_id in ENVIRONMENT_IDS]
+    + list(BLOCK_SAMPLING_KWARGS)
+    + list(RESET_STATE_POOL_KWARGS),
+)
+def test_batched_env_matches_independent_envs(env_id, env_kwargs):
+    """Check that every slot of the batched environment reproduces an independent environment with the same seed."""
+    batched_env = MujocoBatchedRobotEnv(
+        lambda: gym.make(env_id, **env_kwargs), num_envs=NUM_ENVS
+    )
+    envs = [gym.make(env_id, **env_kwargs).unwrapped for _ in range(NUM_ENVS)]
+
+    batched_obs, _ = batched_env.reset(seed=SEED)
+    for i, env in enumerate(envs):
+        obs, _ = env.reset(seed=SEED + i)
+        for key in obs:
+            np.testing.assert_allclose(batched_obs[key][i], obs[key])
+
+    batched_env.action_space.seed(SEED)
+    for step in range(6):
+        if step == 3:
+            # The resets without a seed, e.g. autoresets, continue the random streams of the slots
+            batched_obs, _ = batched_env.reset()
+            for i, env in enumerate(envs):
+                obs, _ = env.reset()
+                for key in obs:
+                    np.testing.assert_allclose(batched_obs[key][i], obs[key])
+        actions = batched_env.action_space.sample()
+        batched_obs, rewards, terminated, truncated, info = batched_env.step(actions)
+        for i, env in enumerate(envs):
+            obs, reward, _, _, env_info = env.step(actions[i])
+            for key in obs:
+                np.testing.assert_allclose(batched_obs[key][i], obs[key])
+            assert rewards[i] == reward
+            assert info["is_success"][i] == env_info["is_success"]
+
+    batched_env.close()
+    for env in envs:
+        env.close()
+
+
+def test_batched_env_metadata():
+    """Check that the batched environment declares its next-step autoreset."""
+    envs = MujocoBatchedRobotEnv(lambda: gym.make("FetchReach-v4"), num_envs=2)
+    assert envs.metadata["autoreset_mode"] == gym.vector.AutoresetMode.NEXT_STEP
+    assert envs.metadata["render_fps"] == envs.env.metadata["render_fps"]
+    envs.close()
+
+
+def test_batched_env_shares_model():
+    """Check that a single MjModel is used with independent MjData per slot."""
+    envs = MujocoBatchedRobotEnv(lambda: gym.make("FetchReach-v4"), num_envs=NUM_ENVS)
+    assert all(data is not envs.datas[0] for data in envs.datas[1:])
+    assert envs.env.model is envs.model
+    envs.reset(seed=SEED)
+    obs, _, _, _, _ = envs.step(envs.action_space.sample())
+    assert obs["observation"].shape == (NUM_ENVS, 10)
+    envs.close()
+
+
+def test_batched_env_reset_mask_and_autoreset():
+    """Check single slot resets and next-step autoreset after truncation."""
+    envs = MujocoBatchedRobotEnv(
+        lambda: gym.make("FetchReach-v4"), num_envs=NUM_ENVS, max_episode_steps=2
+    )
+    obs, _ = envs.reset(seed=SEED)
+    goals = obs["desired_goal"].copy()
+
+    envs.step(np.zeros(envs.action_space.shape))
+    obs, _ = envs.reset(options={"reset_mask": np.array([False, True, False])})
+    np.testing.assert_array_equal(obs["desired_goal"][0], goals[0])
+    np.testing.assert_array_equal(obs["desired_goal"][2], goals[2])
+
+    _, _, _, truncated, _ = envs.step(np.zeros(envs.action_space.shape))
+    np.testing.assert_array_equal(truncated, [True, False, True])
+    _, rewards, _, truncated, info = envs.step(np.zeros(envs.action_space.shape))
+    np.testing.assert_array_equal(info["_is_success"], [False, True, False])
+    assert rewards[0] == 0.0 and rewards[2] == 0.0
+    np.testing.assert_array_equal(truncated, [False, True, False])
+    envs.close()
+
+
+def test_batched_env_step_profiler():
+    """Check that the steps of every slot run through the profiled step phases of the template environment."""
+    envs = MujocoBatchedRobotEnv(
+        lambda: gym.make("FetchPush-v4"), num_envs=NUM_ENVS, max_episode_steps=3
+    )
+    profiler = envs.env.enable_step_profiling()
+    envs.reset(seed=SEED)
+    for _ in range(4):
+        envs.step(envs.action_space.sample())
+    # The fourth step resets the slots truncated by the third one
+    assert profiler.num_steps == 3 * NUM_ENVS
+    envs.close()
@@ -0,0 +1,72 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import gymnasium_robotics
+from gymnasium_robotics.vector import ThreadVectorEnv
+from tests.utils import assert_equals
+
+gym.register_envs(gymnasium_robotics)
+
+ENVIRONMENT_IDS = ("FetchPush-v4", "PointMaze_UMaze-v3", "AdroitHandDoor-v1")
+NUM_ENVS = 4
+SEED = 3
+
+
+@pytest.mark.parametrize("env_id", ENVIRONMENT_IDS)
+@pytest.mark.parametrize("num_workers", [1, 2, 4])
+def test_thread_vector_env_matches_sync_vector_env(env_id, num_workers):
+    """Check that the thread vector environment produces the same rollout as the sync vector environment."""
+    env_fns = [lambda: gym.make(env_id, max_episode_steps=4) for _ in range(NUM_ENVS)]
+    sync_envs = gym.vector.SyncVectorEnv(env_fns)
+    thread_envs = ThreadVectorEnv(env_fns, num_workers=num_workers)
+
+    sync_obs, _ = sync_envs.reset(seed=SEED)
+    thread_obs, _ = thread_envs.reset(seed=SEED)
+    assert_equals(sync_obs, thread_obs)
+
+    sync_envs.action_space.seed(SEED)
+    for _ in range(6):
+        actions = sync_envs.action_space.sample()
+        sync_results = sync_envs.step(actions)
+        thread_results = thread_envs.step(actions)
+        for sync_result, thread_result in zip(sync_results[:4], thread_results[:4]):
+            assert_equals(sync_result, thread_result)
+        assert thread_envs.observation_space.contains(thread_results[0])
+
+    sync_envs.close()
+    thread_envs.close()
+
+
+def test_thread_vector_env_reset_mask():
+    """Check that only the sub-environments selected by the reset mask are reset."""
+    envs = ThreadVectorEnv(
+        [lambda: gym.make("FetchReach-v4") for _ in range(NUM_ENVS)], num_workers=2
+    )
+    obs, _ = envs.reset(seed=SEED)
+    reset_mask = np.array([True, False, False, True])
+    new_obs, info = envs.reset(seed=SEED + 10, options={"reset_mask": reset_mask})
+
+    np.testing.assert_array_equal(
+        obs["desired_goal"][~reset_mask], new_obs["desired_goal"][~reset_mask]
+    )
+    assert np.all(
+        obs["desired_goal"][reset_mask] != new_obs["desired_goal"][reset_mask]
+    )
+    envs.close()
+
+
+def test_thread_vector_env_metadata():
+    """Check that the thread vector environment declares the same autoreset mode as `SyncVectorEnv`."""
+    env_fns = [lambda: gym.make("FetchReach-v4") for _ in range(2)]
+    envs = ThreadVectorEnv(env_fns)
+    sync_envs = gym.vector.SyncVectorEnv(env_fns)
+    assert envs.metadata["autoreset_mode"] == sync_envs.metadata["autoreset_mode"]
+    assert envs.metadata["autoreset_mode"] == gym.vector.AutoresetMode.NEXT_STEP
+
+    # The episode statistics wrapper reads the autoreset mode
+    envs = gym.wrappers.vector.RecordEpisodeStatistics(envs)
+    envs.reset(seed=0)
+    envs.step(envs.action_space.sample())
+    envs.close()
+    sync_envs.close()